@@ -5,11 +5,18 @@
 from __future__ import annotations
 
 from pathlib import Path
+import sys
 
 import numpy as np
 import joblib
 from sklearn.tree import DecisionTreeRegressor, _tree
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.model.tophat_image import NUM_INTERNAL, NUM_LEAVES, ModelImage  # noqa: E402
+
 # Feature order (index -> name):
 # 0 budget_10m
 # 1 marketing_5m
@@ -125,13 +132,11 @@ def serialize_tree_to_model_bytes(clf: DecisionTreeRegressor) -> bytes:
     - 8 leaves * 1 byte: [value]
     """
     tree = clf.tree_
-    num_internal = 7
-    num_leaves = 8
-    leaf_base = 7
+    features: list[int] = []
+    thresholds: list[int] = []
+    leaves: list[int] = []
 
-    data = bytearray()
-
-    for node_idx in range(num_internal):
+    for node_idx in range(NUM_INTERNAL):
         feature = int(tree.feature[node_idx])
         threshold_f = float(tree.threshold[node_idx])
         left = int(tree.children_left[node_idx])
@@ -155,22 +160,19 @@ def serialize_tree_to_model_bytes(clf: DecisionTreeRegressor) -> bytes:
                 f"left={left}, right={right}, expected {expected_left}/{expected_right}"
             )
 
-        data.extend([feature & 0x07, threshold & 0xFF])
+        features.append(feature)
+        thresholds.append(threshold)
 
-    for node_idx in range(leaf_base, leaf_base + num_leaves):
+    for node_idx in range(NUM_INTERNAL, NUM_INTERNAL + NUM_LEAVES):
         value_f = float(tree.value[node_idx, 0, 0])
         value = int(round(value_f))
         if abs(value_f - value) > 1e-6:
             raise ValueError(f"Leaf {node_idx} value is not integer-like: {value_f}")
         if not (0 <= value <= 255):
             raise ValueError(f"Leaf {node_idx} value out of range: {value}")
-        data.append(value & 0xFF)
-
-    expected_len = (num_internal * 2) + num_leaves
-    if len(data) != expected_len:
-        raise ValueError(f"Model image length {len(data)} != {expected_len}")
+        leaves.append(value)
 
-    return bytes(data)
+    return ModelImage.from_fields(features, thresholds, leaves).to_bytes()
 
 
 def write_artifacts(out_dir: Path) -> tuple[Path, Path]:
@@ -3,20 +3,47 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
+import sys
+import time
 
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import ClockCycles
+from cocotb.triggers import ClockCycles, FallingEdge
 import joblib
 import numpy as np
 
 from fixture_data import EXAMPLES, FEATURES, vectorize_u8
 from generate_golden_tree import write_artifacts
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.model.tophat_image import FEATURE_VECTOR_BYTES, MODEL_IMAGE_BYTES, ModelImage  # noqa: E402
+from tools.model.tophat_sweep import (  # noqa: E402
+    DEFAULT_CHUNK_ROWS,
+    boundary_vectors,
+    iter_chunks,
+    path_coverage,
+)
+
 CMD_MODEL = 0b00
 CMD_FEATURE = 0b01
 CMD_CTRL = 0b10
+CTRL_RUN = 0x01
+STATUS_READY = 0x08
+STATUS_PRED_VALID = 0x20
+STATUS_MODEL_LOADED = 0x40
+# Cycles from presenting `run` to the pred_valid pulse: io_intf register,
+# tree_core start, then one step per tree level.
+RUN_TO_PRED_CYCLES = 5
+
+# Sizing for the randomized regression; `make test-random` raises these.
+RANDOM_MODELS = int(os.environ.get("TOPHAT_RANDOM_MODELS", "20"))
+RANDOM_ROWS_PER_MODEL = int(os.environ.get("TOPHAT_RANDOM_ROWS_PER_MODEL", "100"))
+RANDOM_SEED = int(os.environ.get("TOPHAT_RANDOM_SEED", "2026"))
+# Boundary sweep of the golden tree: `paths` (default) or `exhaustive`.
+SWEEP_MODE = os.environ.get("TOPHAT_SWEEP_MODE", "paths")
 
 
 def _status(dut: cocotb.handle.SimHandleBase) -> dict[str, int]:
@@ -84,6 +111,61 @@ async def _run_predict(dut: cocotb.handle.SimHandleBase) -> int:
     return int(dut.uo_out.value) & 0xFF
 
 
+class _StreamDriver:
+    """Back-to-back driver for bulk regressions.
+
+    Inputs change and outputs are sampled on falling edges, so every read sees
+    values settled after the previous rising edge on any simulator. Bytes are
+    streamed one per cycle with `valid` held, which is safe while the core is
+    idle: `ready` only drops between `run` and `pred_valid`. Status is read once
+    per model load and once per prediction, at the cycle the RTL guarantees.
+    """
+
+    def __init__(self, dut: cocotb.handle.SimHandleBase):
+        self._dut = dut
+        self._fall = FallingEdge(dut.clk)
+
+    async def _cycles(self, count: int) -> None:
+        for _ in range(count):
+            await self._fall
+
+    def _sample(self, mask: int, label: str) -> int:
+        status = int(self._dut.uio_out.value)
+        if status & mask != mask:
+            raise AssertionError(f"Expected {label} (mask 0x{mask:02x}), got status 0x{status:02x}")
+        return status
+
+    async def _stream(self, cmd: int, data: bytes | list[int]) -> None:
+        dut = self._dut
+        dut.uio_in.value = ((cmd & 0x3) << 1) | 0x1
+        for value in data:
+            dut.ui_in.value = value
+            await self._fall
+        dut.uio_in.value = 0
+        dut.ui_in.value = 0
+
+    async def load_model(self, model_image: bytes) -> None:
+        await self._fall
+        self._sample(STATUS_READY, "ready before model load")
+        await self._stream(CMD_MODEL, model_image)
+        await self._fall
+        self._sample(STATUS_MODEL_LOADED, "model_loaded after streamed model")
+
+    async def predict_rows(self, rows: list[list[int]]) -> list[int]:
+        """About 13 cycles per row: 8 feature bytes, `run`, 4 cycles to pred_valid."""
+        dut = self._dut
+        await self._fall
+        self._sample(STATUS_READY, "ready before predictions")
+        predictions = []
+        for row in rows:
+            await self._stream(CMD_FEATURE, row)
+            await self._stream(CMD_CTRL, [CTRL_RUN])
+            await self._cycles(RUN_TO_PRED_CYCLES - 1)
+            self._sample(STATUS_PRED_VALID | STATUS_READY, "pred_valid")
+            predictions.append(int(dut.uo_out.value) & 0xFF)
+        return predictions
+
+
 async def _reset(dut: cocotb.handle.SimHandleBase) -> None:
     dut.ena.value = 1
     dut.ui_in.value = 0
@@ -128,3 +210,75 @@ async def test_model_load_and_predict(dut: cocotb.handle.SimHandleBase) -> None:
         assert dut_pred == golden_pred, (
             f"{case['name']}: DUT predicted {dut_pred}, golden model predicted {golden_pred}"
         )
+
+
+@cocotb.test()
+async def test_boundary_sweep_matches_golden_tree(dut: cocotb.handle.SimHandleBase) -> None:
+    clock = Clock(dut.clk, 10, unit="us")
+    cocotb.start_soon(clock.start())
+    await _reset(dut)
+
+    test_dir = Path(__file__).resolve().parent
+    if not (test_dir / "golden_tree.joblib").exists() or not (test_dir / "golden_model.bin").exists():
+        write_artifacts(test_dir)
+    clf = joblib.load(test_dir / "golden_tree.joblib")
+    model_image = (test_dir / "golden_model.bin").read_bytes()
+
+    driver = _StreamDriver(dut)
+    await driver.load_model(model_image)
+    vectors = boundary_vectors(model_image, SWEEP_MODE)
+    for chunk in iter_chunks(vectors, DEFAULT_CHUNK_ROWS):
+        golden = np.rint(clf.predict(chunk.astype(np.float64))).astype(np.uint8).tolist()
+        dut_preds = await driver.predict_rows(chunk.tolist())
+        mismatches = [idx for idx, pair in enumerate(zip(dut_preds, golden)) if pair[0] != pair[1]]
+        assert not mismatches, (
+            f"features {chunk[mismatches[0]].tolist()}: DUT predicted {dut_preds[mismatches[0]]}, "
+            f"golden model predicted {golden[mismatches[0]]} ({len(mismatches)} mismatches in chunk)"
+        )
+
+    coverage = path_coverage(model_image, vectors)
+    dut._log.info(
+        "%s sweep: %d vectors, paths covered %s, leaf hits %s",
+        SWEEP_MODE,
+        coverage["rows"],
+        coverage["paths"],
+        coverage["leaf_hits"],
+    )
+    assert not coverage["missing"], f"Reachable paths never exercised: {coverage['missing']}"
+
+
+@cocotb.test()
+async def test_random_models_match_reference(dut: cocotb.handle.SimHandleBase) -> None:
+    clock = Clock(dut.clk, 10, unit="us")
+    cocotb.start_soon(clock.start())
+    await _reset(dut)
+
+    driver = _StreamDriver(dut)
+    rng = np.random.default_rng(RANDOM_SEED)
+    start = time.perf_counter()
+    predictions = 0
+    for model_idx in range(RANDOM_MODELS):
+        # Full-range bytes on purpose: the RTL must ignore the feature index high bits.
+        model_image = rng.integers(0, 256, MODEL_IMAGE_BYTES, dtype=np.uint8).tobytes()
+        rows = rng.integers(0, 256, (RANDOM_ROWS_PER_MODEL, FEATURE_VECTOR_BYTES), dtype=np.uint8)
+        expected = ModelImage.from_bytes(model_image, validate=False).predict(rows)
+
+        await driver.load_model(model_image)
+        dut_preds = await driver.predict_rows(rows.tolist())
+        for row, dut_pred, golden_pred in zip(rows.tolist(), dut_preds, expected.tolist()):
+            assert dut_pred == golden_pred, (
+                f"model {model_idx} ({model_image.hex()}), features {row}: "
+                f"DUT predicted {dut_pred}, reference predicted {golden_pred}"
+            )
+        predictions += len(rows)
+
+    elapsed = time.perf_counter() - start
+    dut._log.info(
+        "%s: %d random predictions over %d models in %.2f s wall (%.0f predictions/s, seed %d)",
+        cocotb.SIM_NAME,
+        predictions,
+        RANDOM_MODELS,
+        elapsed,
+        predictions / elapsed,
+        RANDOM_SEED,
+    )
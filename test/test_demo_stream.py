@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import tools.demo.titanic_asic_demo as demo  # noqa: E402
+from tools.model.tophat_quantize import FeatureQuantizer  # noqa: E402
+
+
+def _passengers(rng: np.random.Generator, rows: int, first_id: int, age_scale: float) -> pd.DataFrame:
+    age = rng.normal(30, 12, rows).clip(1, 80) * age_scale
+    age[rng.random(rows) < 0.15] = np.nan
+    fare = rng.lognormal(3.0, 0.8, rows) * age_scale
+    fare[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame(
+        {
+            "PassengerId": np.arange(first_id, first_id + rows),
+            "Pclass": rng.integers(1, 4, rows),
+            "Name": ["Smith, Mr. John"] * rows,
+            "Sex": rng.choice(["male", "female"], rows),
+            "Age": age,
+            "SibSp": rng.integers(0, 3, rows),
+            "Parch": rng.integers(0, 3, rows),
+            "Ticket": ["A"] * rows,
+            "Fare": fare,
+            "Cabin": [np.nan] * rows,
+            "Embarked": rng.choice(["S", "C", "Q", None], rows),
+        }
+    )
+
+
+@pytest.fixture()
+def data_dir(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(21)
+    train = _passengers(rng, 200, 1, age_scale=1.0)
+    train.insert(1, "Survived", ((train["Sex"] == "female") ^ (rng.random(200) < 0.2)).astype(int))
+    # Test values run well past the training range, so a scaler fit on test.csv would quantize differently.
+    test = _passengers(rng, 61, 201, age_scale=1.7)
+    train.to_csv(tmp_path / "train.csv", index=False)
+    test.to_csv(tmp_path / "test.csv", index=False)
+    return tmp_path
+
+
+def _run_demo(monkeypatch: pytest.MonkeyPatch, data_dir: Path, output_dir: Path, *extra: str) -> None:
+    argv = ["titanic_asic_demo.py", "--skip-board", "--data-dir", str(data_dir), "--output-dir", str(output_dir)]
+    monkeypatch.setattr(sys, "argv", argv + list(extra))
+    demo.main()
+
+
+def test_streamed_submission_matches_whole_frame(
+    monkeypatch: pytest.MonkeyPatch, data_dir: Path, tmp_path: Path
+) -> None:
+    _run_demo(monkeypatch, data_dir, tmp_path / "whole")
+
+    quantizers: list[FeatureQuantizer] = []
+    chunk_rows: list[int] = []
+    score_chunks = demo.score_chunks
+
+    def recording_score_chunks(chunks: Iterable[pd.DataFrame], **kwargs: Any) -> Iterator[tuple[Any, ...]]:
+        quantizers.append(kwargs["quantizer"])
+        for chunk in chunks:
+            chunk_rows.append(len(chunk))
+            yield from score_chunks([chunk], **kwargs)
+
+    monkeypatch.setattr(demo, "score_chunks", recording_score_chunks)
+    _run_demo(monkeypatch, data_dir, tmp_path / "stream", "--stream", "--chunk-size", "7")
+
+    whole = (tmp_path / "whole" / "submission_asic.csv").read_bytes()
+    assert (tmp_path / "stream" / "submission_asic.csv").read_bytes() == whole
+    assert whole.count(b"\n") == 62
+
+    assert chunk_rows == [7] * 8 + [5]
+    # Streamed chunks are quantized with the scaler fit on train.csv, not on test rows.
+    train = pd.read_csv(data_dir / "train.csv")
+    train_features = demo.engineer_features(
+        train, age_fill=float(train["Age"].median()), fare_fill=float(train["Fare"].median())
+    )
+    train_fit = FeatureQuantizer.fit(train_features, demo.FEATURE_NAMES)
+    test = pd.read_csv(data_dir / "test.csv")
+    test_features = demo.engineer_features(
+        test, age_fill=float(train["Age"].median()), fare_fill=float(train["Fare"].median())
+    )
+    assert FeatureQuantizer.fit(test_features, demo.FEATURE_NAMES).to_dict() != train_fit.to_dict()
+    assert len(quantizers) == 1
+    assert quantizers[0].to_dict() == train_fit.to_dict()
+    assert FeatureQuantizer.load(tmp_path / "stream" / "feature_scaler.json").to_dict() == train_fit.to_dict()
+
+
+def test_iter_test_chunks_rejects_nonpositive_chunk_size(data_dir: Path) -> None:
+    with pytest.raises(ValueError, match="chunk_rows"):
+        next(demo.iter_test_chunks(data_dir, 0))
@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.demo.titanic_asic_demo import FEATURE_NAMES  # noqa: E402
+from tools.demo.tophat_feature_search import (  # noqa: E402
+    CANDIDATE_NAMES,
+    Candidate,
+    FeatureSearch,
+    FoldCache,
+    engineer_candidate_features,
+)
+from tools.model.tophat_quantize import FeatureQuantizer  # noqa: E402
+
+
+def _passengers(rows: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    sex = rng.choice(["male", "female"], rows)
+    pclass = rng.integers(1, 4, rows)
+    survived = ((sex == "female") ^ (rng.random(rows) < 0.2) | (pclass == 1) & (rng.random(rows) < 0.3)).astype(int)
+    age = rng.normal(30, 12, rows).clip(1, 80)
+    age[rng.random(rows) < 0.15] = np.nan
+    return pd.DataFrame(
+        {
+            "PassengerId": np.arange(1, rows + 1),
+            "Survived": survived,
+            "Pclass": pclass,
+            "Name": [f"Smith, {rng.choice(['Mr', 'Mrs', 'Miss', 'Master', 'Dr'])}. John" for _ in range(rows)],
+            "Sex": sex,
+            "Age": age,
+            "SibSp": rng.integers(0, 3, rows),
+            "Parch": rng.integers(0, 3, rows),
+            "Ticket": [str(rng.integers(100, 140)) if rng.random() < 0.7 else "PC 17599" for _ in range(rows)],
+            "Fare": rng.lognormal(3.0, 0.8, rows),
+            "Cabin": [rng.choice(["C85", "E46", "B28"]) if rng.random() < 0.3 else np.nan for _ in range(rows)],
+            "Embarked": rng.choice(["S", "C", "Q"], rows),
+        }
+    )
+
+
+def _search_inputs() -> tuple[dict[str, np.ndarray], np.ndarray]:
+    df = _passengers()
+    candidates = engineer_candidate_features(df, age_fill=28.0, fare_fill=14.0)
+    quantized = {
+        mode: FeatureQuantizer.fit(candidates, CANDIDATE_NAMES, mode=mode).transform(candidates)
+        for mode in ("minmax", "quantile")
+    }
+    return quantized, df["Survived"].to_numpy()
+
+
+def test_candidate_features_extend_demo_features() -> None:
+    candidates = engineer_candidate_features(_passengers(), age_fill=28.0, fare_fill=14.0)
+    assert list(candidates.columns) == CANDIDATE_NAMES
+    assert CANDIDATE_NAMES[: len(FEATURE_NAMES)] == FEATURE_NAMES
+    assert not candidates.isna().any().any()
+    assert set(candidates["title"].unique()) <= {0.0, 1.0, 2.0, 3.0, 4.0}
+
+
+def test_parallel_search_matches_serial_and_reuses_cached_folds(tmp_path: Path) -> None:
+    quantized, labels = _search_inputs()
+    cache_path = tmp_path / "fold_cache.json"
+
+    parallel = FeatureSearch(quantized, labels, workers=2, cache=FoldCache(cache_path))
+    parallel.random(["minmax", "quantile"], samples=6)
+    parallel.cache.save()
+    serial = FeatureSearch(quantized, labels, workers=1)
+    serial.random(["minmax", "quantile"], samples=6)
+    assert parallel.results == serial.results
+    assert parallel.cache.hits == 0 and parallel.cache.misses == 5 * len(parallel.results)
+
+    rerun = FeatureSearch(quantized, labels, workers=2, cache=FoldCache(cache_path))
+    rerun.random(["minmax", "quantile"], samples=6)
+    assert rerun.results == parallel.results
+    assert rerun.cache.misses == 0 and rerun.cache.hits == 5 * len(rerun.results)
+
+    (best, metrics), *_ = rerun.best()
+    assert len(best.columns) == 8
+    assert metrics["cv_accuracy_mean"] == max(result["cv_accuracy_mean"] for result in rerun.results.values())
+
+
+def test_greedy_fills_every_slot() -> None:
+    quantized, labels = _search_inputs()
+    search = FeatureSearch(quantized, labels, trainer="native", workers=1)
+    search.greedy(["minmax"])
+
+    sizes = {len(candidate.columns) for candidate in search.results}
+    assert sizes == set(range(1, 9))
+    # Only the full 8-column subset is a deployable pick, even if a partial one scored higher.
+    ranked = search.best(top=len(search.results))
+    assert ranked and {len(candidate.columns) for candidate, _ in ranked} == {8}
+    # A second search over the same inputs scores the final subset from the shared cache alone.
+    final = max(search.results, key=lambda candidate: len(candidate.columns))
+    again = FeatureSearch(quantized, labels, trainer="native", workers=1, cache=search.cache)
+    misses = search.cache.misses
+    assert again.evaluate([final])[final] == search.results[final]
+    assert search.cache.misses == misses
+
+
+def test_greedy_breaks_accuracy_ties_on_auc_then_added_column(monkeypatch: pytest.MonkeyPatch) -> None:
+    quantized, labels = _search_inputs()
+    search = FeatureSearch({"minmax": quantized["minmax"][:, :4]}, labels, workers=1)
+    column_auc = [0.1, 0.0, 0.3, 0.1]
+    rounds: list[list[Candidate]] = []
+
+    def fake_evaluate(candidates: Iterable[Candidate]) -> dict[Candidate, dict[str, float]]:
+        # Every subset ties on accuracy; AUC is the sum of its columns' shares.
+        rounds.append(list(candidates))
+        for candidate in rounds[-1]:
+            auc = sum(column_auc[col] for col in candidate.columns)
+            search.results[candidate] = {"cv_accuracy_mean": 0.75, "cv_roc_auc_mean": auc}
+        return search.results
+
+    monkeypatch.setattr(search, "evaluate", fake_evaluate)
+    search.greedy(["minmax"], slots=3)
+
+    # Round 1 picks column 2 on AUC. Round 2 ties 0 and 3 on AUC too, and the lower added column wins.
+    assert all(2 in candidate.columns for candidate in rounds[1])
+    assert {candidate.columns for candidate in rounds[2]} == {(0, 1, 2), (0, 2, 3)}
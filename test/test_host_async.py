@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import sys
+from typing import Any
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.host.tophat_async import AsyncJsonLineSerialTransport, AsyncTophatClient  # noqa: E402
+from tools.host.tophat_host import FEATURE_VECTOR_BYTES, MODEL_IMAGE_BYTES, ProtocolError  # noqa: E402
+
+
+class _FakeAsyncTransport:
+    def __init__(self, responses: list[dict[str, Any]], delay_s: float = 0.0):
+        self.responses = responses
+        self.requests: list[dict[str, Any]] = []
+        self._delay_s = delay_s
+
+    async def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        self.requests.append(payload)
+        await asyncio.sleep(self._delay_s)
+        if not self.responses:
+            raise AssertionError("No fake response queued")
+        return self.responses.pop(0)
+
+
+class _FakeNonBlockingSerialPort:
+    """Serial fake that never blocks: `read` returns only bytes already queued."""
+
+    def __init__(self, chunks: list[bytes]):
+        self._chunks = chunks
+        self.writes: list[bytes] = []
+        self.read_calls = 0
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._chunks[0]) if self._chunks else 0
+
+    def write(self, data: bytes | memoryview) -> int:
+        # Accept at most 8 bytes per call to exercise partial writes.
+        accepted = bytes(data[:8])
+        self.writes.append(accepted)
+        return len(accepted)
+
+    def flush(self) -> None:
+        raise AssertionError("flush() blocks until the UART drains; the async transport must not call it")
+
+    def read(self, size: int) -> bytes:
+        self.read_calls += 1
+        if not self._chunks:
+            return b""
+        head = self._chunks.pop(0)
+        if len(head) > size:
+            self._chunks.insert(0, head[size:])
+        return head[:size]
+
+    def reset_input_buffer(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class _FakeSerialModule:
+    def __init__(self, port: _FakeNonBlockingSerialPort):
+        self._port = port
+
+    def Serial(self, _port: str, _baud: int, timeout: float, write_timeout: float) -> _FakeNonBlockingSerialPort:
+        assert timeout == 0 and write_timeout == 0
+        return self._port
+
+
+def test_async_client_load_model_and_predict() -> None:
+    fake = _FakeAsyncTransport([{"ok": True}, {"ok": True, "prediction": 42}])
+    client = AsyncTophatClient(fake)
+
+    async def scenario() -> int:
+        await client.load_model(bytes(range(MODEL_IMAGE_BYTES)))
+        return await client.predict(list(range(FEATURE_VECTOR_BYTES)))
+
+    assert asyncio.run(scenario()) == 42
+    assert fake.requests == [
+        {"cmd": "load_model", "model": list(range(MODEL_IMAGE_BYTES))},
+        {"cmd": "predict", "features": list(range(FEATURE_VECTOR_BYTES))},
+    ]
+
+
+def test_async_client_raises_board_error() -> None:
+    client = AsyncTophatClient(_FakeAsyncTransport([{"ok": False, "error": "missing model"}]))
+
+    with pytest.raises(RuntimeError, match="missing model"):
+        asyncio.run(client.run())
+
+
+def test_async_client_does_not_block_event_loop() -> None:
+    client = AsyncTophatClient(_FakeAsyncTransport([{"ok": True, "prediction": 7}], delay_s=0.02))
+    ticks: list[int] = []
+
+    async def heartbeat() -> None:
+        for idx in range(5):
+            ticks.append(idx)
+            await asyncio.sleep(0.001)
+
+    async def scenario() -> int:
+        beat = asyncio.create_task(heartbeat())
+        prediction = await client.predict([0] * FEATURE_VECTOR_BYTES)
+        await beat
+        return prediction
+
+    assert asyncio.run(scenario()) == 7
+    assert ticks == [0, 1, 2, 3, 4]
+
+
+def test_async_transport_reads_split_line(monkeypatch: pytest.MonkeyPatch) -> None:
+    port = _FakeNonBlockingSerialPort([b'{"cmd":"ping"}\n{"ok":tr', b'ue,"protocol_version":1}\n'])
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(port))
+
+    async def scenario() -> dict[str, Any]:
+        async with AsyncJsonLineSerialTransport("/dev/ttyACM0", timeout_s=0.05) as transport:
+            return await transport.request({"cmd": "ping"})
+
+    assert asyncio.run(scenario()) == {"ok": True, "protocol_version": 1}
+    assert b"".join(port.writes) == b'{"cmd":"ping"}\n'
+
+
+def test_async_transport_times_out_with_only_echo(monkeypatch: pytest.MonkeyPatch) -> None:
+    port = _FakeNonBlockingSerialPort([b'{"cmd":"ping"}\n'])
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(port))
+
+    transport = AsyncJsonLineSerialTransport("/dev/ttyACM0", timeout_s=0.01)
+    with pytest.raises(ProtocolError, match="Missing boolean `ok` in response"):
+        asyncio.run(transport.request({"cmd": "ping"}))
@@ -15,6 +15,7 @@ sys.path.insert(0, str(ROOT))
 from tools.host.tophat_host import (  # noqa: E402
     FEATURE_VECTOR_BYTES,
     MODEL_IMAGE_BYTES,
+    ProtocolError,
     TophatClient,
     _build_parser,
 )
@@ -32,6 +33,16 @@ class _FakeTransport:
         return self.responses.pop(0)
 
 
+class _FakePipelinedTransport(_FakeTransport):
+    def __init__(self, responses: list[dict[str, Any]]):
+        super().__init__(responses)
+        self.batches: list[int] = []
+
+    def request_many(self, payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        self.batches.append(len(payloads))
+        return [self.request(payload) for payload in payloads]
+
+
 def test_load_model_sends_expected_payload() -> None:
     fake = _FakeTransport([{"ok": True}])
     client = TophatClient(fake)
@@ -42,6 +53,46 @@ def test_load_model_sends_expected_payload() -> None:
     assert fake.requests == [{"cmd": "load_model", "model": list(model)}]
 
 
+def test_load_model_skips_reload_of_same_image() -> None:
+    fake = _FakeTransport([{"ok": True, "cached": False}, {"ok": True, "cached": False}])
+    client = TophatClient(fake)
+    model = bytes(range(MODEL_IMAGE_BYTES))
+
+    assert client.load_model(model) is False
+    assert client.load_model(list(model)) is True
+    assert len(fake.requests) == 1
+
+    assert client.load_model(model, force=True) is False
+    assert fake.requests[-1] == {"cmd": "load_model", "model": list(model), "force": True}
+
+
+def test_load_model_cache_invalidated_by_clear_and_transport_errors() -> None:
+    class _FlakyTransport(_FakeTransport):
+        def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+            if payload["cmd"] == "run":
+                raise TimeoutError("Timeout waiting for board response")
+            return super().request(payload)
+
+    fake = _FlakyTransport([{"ok": True}] * 4)
+    client = TophatClient(fake)
+    model = bytes(range(MODEL_IMAGE_BYTES))
+
+    client.load_model(model)
+    client.clear()
+    assert client.loaded_model is None
+    client.load_model(model)
+    with pytest.raises(TimeoutError):
+        client.run()
+    client.load_model(model)
+
+    assert [req["cmd"] for req in fake.requests] == ["load_model", "clear", "load_model", "load_model"]
+
+
+def test_load_model_reports_bridge_side_cache_hit() -> None:
+    fake = _FakeTransport([{"ok": True, "cached": True}])
+    assert TophatClient(fake).load_model(bytes(MODEL_IMAGE_BYTES)) is True
+
+
 def test_predict_sends_features_and_returns_prediction() -> None:
     fake = _FakeTransport([{"ok": True, "prediction": 123}])
     client = TophatClient(fake)
@@ -53,6 +104,105 @@ def test_predict_sends_features_and_returns_prediction() -> None:
     assert fake.requests == [{"cmd": "predict", "features": features}]
 
 
+def test_predict_batch_splits_rows_into_requests() -> None:
+    fake = _FakeTransport(
+        [
+            {"ok": True, "predictions": [1, 2]},
+            {"ok": True, "predictions": [3]},
+        ]
+    )
+    client = TophatClient(fake)
+
+    rows = [[idx] * FEATURE_VECTOR_BYTES for idx in range(3)]
+    preds = client.predict_batch(rows, batch_size=2)
+
+    assert preds == [1, 2, 3]
+    assert fake.requests == [
+        {"cmd": "predict_batch", "rows": rows[:2]},
+        {"cmd": "predict_batch", "rows": rows[2:]},
+    ]
+
+
+def test_predict_batch_pipelines_chunks_when_supported() -> None:
+    fake = _FakePipelinedTransport(
+        [
+            {"ok": True, "predictions": [1, 2]},
+            {"ok": True, "predictions": [3, 4]},
+            {"ok": True, "predictions": [5]},
+        ]
+    )
+    client = TophatClient(fake)
+
+    preds = client.predict_batch([[idx] * FEATURE_VECTOR_BYTES for idx in range(5)], batch_size=2)
+
+    assert preds == [1, 2, 3, 4, 5]
+    assert fake.batches == [3]
+
+
+def test_predict_batch_rejects_short_predictions() -> None:
+    fake = _FakeTransport([{"ok": True, "predictions": [1]}])
+    client = TophatClient(fake)
+
+    with pytest.raises(RuntimeError, match="invalid `predictions`"):
+        client.predict_batch([[0] * FEATURE_VECTOR_BYTES] * 2)
+
+
+def test_predict_batch_rejects_bad_row_before_sending() -> None:
+    fake = _FakeTransport([])
+    client = TophatClient(fake)
+
+    with pytest.raises(ValueError, match=r"rows\[1\] must contain exactly 8"):
+        client.predict_batch([[0] * FEATURE_VECTOR_BYTES, [0] * 3])
+    assert fake.requests == []
+
+
+def test_upload_rows_and_run_rows_chunk_requests() -> None:
+    fake = _FakeTransport(
+        [
+            {"ok": True, "rows": 2},
+            {"ok": True, "rows": 3},
+            {"ok": True, "packed": "0102"},
+            {"ok": True, "packed": "03"},
+        ]
+    )
+    client = TophatClient(fake)
+    rows = [[idx] * FEATURE_VECTOR_BYTES for idx in range(3)]
+
+    assert client.upload_rows(rows, batch_size=2) == 3
+    assert client.run_rows(chunk_rows=2) == [1, 2, 3]
+    assert fake.requests == [
+        {"cmd": "upload_rows", "offset": 0, "rows": rows[:2]},
+        {"cmd": "upload_rows", "offset": 2, "rows": rows[2:]},
+        {"cmd": "run_rows", "start": 0, "count": 2},
+        {"cmd": "run_rows", "start": 2, "count": 1},
+    ]
+
+
+def test_run_rows_asks_bridge_for_row_count_and_checks_length() -> None:
+    fake = _FakeTransport([{"ok": True, "resident_rows": 2}, {"ok": True, "packed": "05"}])
+    client = TophatClient(fake)
+
+    with pytest.raises(ProtocolError, match="Expected 2 packed predictions"):
+        client.run_rows()
+    assert fake.requests[0] == {"cmd": "ping"}
+
+
+def test_stats_polls_bridge_counters() -> None:
+    fake = _FakeTransport([{"ok": True, "runs": 3, "requests": {"predict": 3}}])
+    client = TophatClient(fake)
+
+    assert client.stats(reset=True) == {"runs": 3, "requests": {"predict": 3}}
+    assert fake.requests == [{"cmd": "stats", "reset": True}]
+
+
+def test_bench_returns_bridge_timings() -> None:
+    fake = _FakeTransport([{"ok": True, "bytes": 64, "legacy_us_per_byte": 40.0, "fast_us_per_byte": 9.5}])
+    client = TophatClient(fake)
+
+    assert client.bench(64) == {"bytes": 64, "legacy_us_per_byte": 40.0, "fast_us_per_byte": 9.5}
+    assert fake.requests == [{"cmd": "bench", "bytes": 64}]
+
+
 def test_load_model_rejects_wrong_length() -> None:
     fake = _FakeTransport([{"ok": True}])
     client = TophatClient(fake)
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.host.tophat_host import JsonLineSerialTransport, TophatClient  # noqa: E402
+from tools.host.tophat_metrics import LatencyHistogram, TophatMetrics  # noqa: E402
+
+
+def test_histogram_percentiles_within_bucket_error() -> None:
+    histogram = LatencyHistogram(sub_bucket_bits=5)
+    for value in range(1, 10_001):
+        histogram.record(value)
+
+    assert histogram.count == 10_000
+    assert histogram.min_us == 1
+    assert histogram.max_us == 10_000
+    for percent, exact in ((50.0, 5_000), (99.0, 9_900), (100.0, 10_000)):
+        assert exact <= histogram.percentile(percent) <= exact * (1 + 1 / 32)
+
+
+def test_histogram_is_exact_for_small_values_and_clamps_large_ones() -> None:
+    histogram = LatencyHistogram(sub_bucket_bits=3, max_value_us=1_000)
+    for value in (0, 3, 15, 5_000):
+        histogram.record(value)
+
+    assert histogram.percentile(25.0) == 0
+    assert histogram.percentile(50.0) == 3
+    assert histogram.percentile(75.0) == 15
+    assert histogram.max_us == 1_000
+
+    with pytest.raises(ValueError):
+        histogram.percentile(101.0)
+
+
+class _FakeSerialPort:
+    def __init__(self, responses: list[bytes]):
+        self._responses = responses
+
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+    def flush(self) -> None:
+        return None
+
+    def readline(self) -> bytes:
+        return self._responses.pop(0) if self._responses else b""
+
+    def close(self) -> None:
+        return None
+
+
+class _FakeSerialModule:
+    def __init__(self, port: _FakeSerialPort):
+        self._port = port
+
+    def Serial(self, _port: str, _baud: int, timeout: float) -> _FakeSerialPort:
+        return self._port
+
+
+def test_transport_and_client_record_stage_snapshot(monkeypatch: pytest.MonkeyPatch) -> None:
+    responses = [b'{"cmd":"predict"}\n', b'{"ok":true,"prediction":1}\n', b'{"ok":true,"prediction":2}\n']
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(_FakeSerialPort(responses)))
+
+    metrics = TophatMetrics()
+    client = TophatClient(JsonLineSerialTransport("/dev/ttyACM0", timeout_s=0.05, metrics=metrics), metrics)
+    assert client.predict([0] * 8) == 1
+    assert client.predict([1] * 8) == 2
+
+    snapshot: dict[str, Any] = json.loads(json.dumps(metrics.snapshot()))
+    assert snapshot["unit"] == "us"
+    stages = snapshot["commands"]["predict"]
+    assert list(stages) == ["encode", "write", "read", "decode", "total", "call"]
+    for summary in stages.values():
+        assert summary["count"] == 2
+        assert summary["p50_us"] <= summary["p99_us"] <= summary["max_us"]
@@ -0,0 +1,121 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+from typing import Any
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.host.tophat_host import FEATURE_VECTOR_BYTES, MODEL_IMAGE_BYTES  # noqa: E402
+from tools.host.tophat_pool import TophatPool  # noqa: E402
+
+
+class _FakeBoardTransport:
+    """Answers like a bridge whose prediction is the first feature byte plus an offset."""
+
+    def __init__(self, port: str, offset: int, fail_after: int | None):
+        self.port = port
+        self.offset = offset
+        self.fail_after = fail_after
+        self.requests: list[dict[str, Any]] = []
+        self.closed = False
+
+    def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        self.requests.append(payload)
+        if self.fail_after is not None and len(self.requests) > self.fail_after:
+            raise TimeoutError("Timeout waiting for board response")
+
+        cmd = payload["cmd"]
+        if cmd == "ping":
+            return {"ok": True, "protocol_version": 1}
+        if cmd == "predict":
+            return {"ok": True, "prediction": payload["features"][0] + self.offset}
+        if cmd == "predict_batch":
+            return {"ok": True, "predictions": [row[0] + self.offset for row in payload["rows"]]}
+        return {"ok": True}
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _FakeFactory:
+    def __init__(self, fail_after: dict[str, list[int | None]] | None = None):
+        self._fail_after = fail_after or {}
+        self.opened: list[_FakeBoardTransport] = []
+
+    def __call__(self, port: str) -> _FakeBoardTransport:
+        schedule = self._fail_after.get(port, [])
+        fail_after = schedule.pop(0) if schedule else None
+        transport = _FakeBoardTransport(port, offset=0, fail_after=fail_after)
+        self.opened.append(transport)
+        return transport
+
+    def for_port(self, port: str) -> list[_FakeBoardTransport]:
+        return [transport for transport in self.opened if transport.port == port]
+
+
+MODEL = bytes(range(MODEL_IMAGE_BYTES))
+
+
+def test_pool_loads_model_everywhere_and_round_robins_predict() -> None:
+    factory = _FakeFactory()
+    pool = TophatPool(["a", "b"], transport_factory=factory)
+    pool.load_model(MODEL)
+
+    assert [pool.predict([idx] * FEATURE_VECTOR_BYTES) for idx in range(4)] == [0, 1, 2, 3]
+    for transport in factory.opened:
+        assert transport.requests[0] == {"cmd": "load_model", "model": list(MODEL)}
+        assert [req["cmd"] for req in transport.requests[1:]] == ["predict", "predict"]
+
+
+def test_pool_predict_batch_preserves_row_order_across_boards() -> None:
+    factory = _FakeFactory()
+    pool = TophatPool(["a", "b", "c"], transport_factory=factory)
+    pool.load_model(MODEL)
+
+    rows = [[idx] + [0] * (FEATURE_VECTOR_BYTES - 1) for idx in range(50)]
+    assert pool.predict_batch(rows, batch_size=4) == list(range(50))
+    assert sum(entry["predictions"] for entry in pool.health()) == 50
+
+
+def test_pool_restarts_board_that_times_out_and_reloads_model() -> None:
+    # First transport for "a" dies after load_model; the reopened one is fine.
+    factory = _FakeFactory({"a": [1, None]})
+    pool = TophatPool(["a"], transport_factory=factory)
+    pool.load_model(MODEL)
+
+    assert pool.predict([9] * FEATURE_VECTOR_BYTES) == 9
+
+    reopened = factory.for_port("a")[1]
+    assert factory.for_port("a")[0].closed
+    assert [req["cmd"] for req in reopened.requests] == ["clear", "load_model", "predict"]
+    health = pool.health()[0]
+    assert health["healthy"] and health["restarts"] == 1 and health["failures"] == 1
+
+
+def test_pool_drops_board_after_restarts_run_out() -> None:
+    factory = _FakeFactory({"a": [1, 0], "b": [None]})
+    pool = TophatPool(["a", "b"], transport_factory=factory, max_restarts=1)
+    pool.load_model(MODEL)
+
+    rows = [[idx] + [0] * (FEATURE_VECTOR_BYTES - 1) for idx in range(20)]
+    assert pool.predict_batch(rows, batch_size=2) == list(range(20))
+
+    health = {entry["port"]: entry for entry in pool.health()}
+    assert not health["a"]["healthy"]
+    assert "TimeoutError" in health["a"]["last_error"]
+    assert health["b"]["healthy"] and health["b"]["predictions"] == 20
+
+
+def test_pool_raises_when_no_board_is_left() -> None:
+    factory = _FakeFactory({"a": [0, 0]})
+    pool = TophatPool(["a"], transport_factory=factory, max_restarts=1)
+
+    with pytest.raises(RuntimeError, match="No healthy boards left"):
+        pool.load_model(MODEL)
@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import threading
+import time
+from typing import Any
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.host.tophat_host import FEATURE_VECTOR_BYTES, MODEL_IMAGE_BYTES, TophatClient  # noqa: E402
+from tools.host.tophat_scheduler import ModelScheduler  # noqa: E402
+
+
+class _FakeBoardTransport:
+    """Answers like a bridge whose prediction is the first feature byte plus the model's first byte."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict[str, Any]] = []
+        self.model: list[int] | None = None
+        self.fail_next = False
+        self.load_delay_s = 0.0
+
+    def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        self.requests.append(payload)
+        if self.fail_next:
+            self.fail_next = False
+            raise TimeoutError("Timeout waiting for board response")
+
+        cmd = payload["cmd"]
+        if cmd == "load_model":
+            self.model = payload["model"]
+            time.sleep(self.load_delay_s)
+        if cmd == "predict_batch":
+            assert self.model is not None
+            return {"ok": True, "predictions": [row[0] + self.model[0] for row in payload["rows"]]}
+        return {"ok": True}
+
+    def commands(self) -> list[str]:
+        return [req["cmd"] for req in self.requests]
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _model(tag: int) -> bytes:
+    return bytes([tag] * MODEL_IMAGE_BYTES)
+
+
+def _row(value: int) -> list[int]:
+    return [value] * FEATURE_VECTOR_BYTES
+
+
+def _scheduler(transport: _FakeBoardTransport, **kwargs: Any) -> ModelScheduler:
+    scheduler = ModelScheduler(TophatClient(transport), **kwargs)
+    scheduler.register_model("a", _model(100))
+    scheduler.register_model("b", _model(200))
+    return scheduler
+
+
+def test_scheduler_groups_interleaved_requests_by_model() -> None:
+    transport = _FakeBoardTransport()
+    scheduler = _scheduler(transport)
+
+    futures = [scheduler.submit("ab"[idx % 2], _row(idx)) for idx in range(8)]
+    assert scheduler.stats()["models"]["a"]["queue_depth"] == 4
+    assert scheduler.run_pending() == 8
+
+    assert [future.result() for future in futures] == [
+        (idx + (100 if idx % 2 == 0 else 200)) & 0xFF for idx in range(8)
+    ]
+    assert transport.commands() == ["load_model", "predict_batch", "load_model", "predict_batch"]
+    stats = scheduler.stats()
+    assert stats["switch_count"] == 2
+    assert stats["models"]["a"] == {"queue_depth": 0, "served": 4, "oldest_wait_s": 0.0}
+
+
+def test_scheduler_rotates_models_after_quantum() -> None:
+    transport = _FakeBoardTransport()
+    scheduler = _scheduler(transport, batch_rows=2, quantum_rows=4)
+
+    for idx in range(8):
+        scheduler.submit("a", _row(idx))
+    scheduler.submit("b", _row(0))
+    scheduler.run_pending()
+
+    loads = [req["model"][0] for req in transport.requests if req["cmd"] == "load_model"]
+    assert loads == [100, 200, 100]
+    assert [len(req["rows"]) for req in transport.requests if req["cmd"] == "predict_batch"] == [2, 2, 1, 2, 2]
+
+
+def test_scheduler_preempts_for_overdue_request() -> None:
+    transport = _FakeBoardTransport()
+    clock = _FakeClock()
+    scheduler = _scheduler(transport, batch_rows=2, quantum_rows=100, max_wait_s=0.01, clock=clock)
+
+    for idx in range(4):
+        scheduler.submit("a", _row(idx))
+    clock.now = 0.001
+    late = scheduler.submit("b", _row(1))
+
+    assert scheduler.step() == 2
+    assert not late.done()
+    clock.now = 0.5
+    scheduler.step()
+    assert late.result() == 201
+    assert scheduler.stats()["models"]["a"]["queue_depth"] == 2
+
+
+def test_scheduler_fails_batch_and_reloads_after_board_error() -> None:
+    transport = _FakeBoardTransport()
+    scheduler = _scheduler(transport)
+
+    assert scheduler.predict("a", _row(1)) == 101
+    transport.fail_next = True
+    failed = scheduler.submit("a", _row(2))
+    scheduler.run_pending()
+    with pytest.raises(TimeoutError):
+        failed.result()
+
+    assert scheduler.predict("a", _row(3)) == 103
+    assert transport.commands()[-2:] == ["load_model", "predict_batch"]
+
+
+def test_scheduler_rejects_unknown_model() -> None:
+    scheduler = _scheduler(_FakeBoardTransport())
+    with pytest.raises(KeyError):
+        scheduler.submit("missing", _row(0))
+
+
+def test_scheduler_keeps_each_batch_on_its_own_model_across_threads() -> None:
+    transport = _FakeBoardTransport()
+    # Widen the gap between load_model and predict_batch so an unserialized step would interleave.
+    transport.load_delay_s = 0.001
+    scheduler = _scheduler(transport, batch_rows=1, quantum_rows=1)
+    results: dict[str, list[int]] = {"a": [], "b": []}
+    start = threading.Barrier(2)
+
+    def worker(model_id: str) -> None:
+        start.wait()
+        for idx in range(40):
+            results[model_id].append(scheduler.predict(model_id, _row(idx)))
+
+    threads = [threading.Thread(target=worker, args=(model_id,)) for model_id in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert results["a"] == [idx + 100 for idx in range(40)]
+    assert results["b"] == [(idx + 200) & 0xFF for idx in range(40)]
+    assert scheduler.stats()["models"]["b"]["served"] == 40
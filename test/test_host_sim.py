@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.host.tophat_host import TophatClient  # noqa: E402
+from tools.host.tophat_sim import (  # noqa: E402
+    CMD_CTRL,
+    CMD_FEATURE,
+    CMD_MODEL,
+    CTRL_RUN,
+    STATUS_BUSY,
+    STATUS_ERROR_OR_MISSING_FEATURES,
+    STATUS_MODEL_LOADED,
+    STATUS_PRED_VALID,
+    STATUS_READY,
+    SimulatedTophatTransport,
+    TophatRtlModel,
+)
+from tools.model.tophat_image import ModelImage  # noqa: E402
+
+GOLDEN_MODEL = (ROOT / "test" / "golden_model.bin").read_bytes()
+
+
+def _send(rtl: TophatRtlModel, cmd: int, data: bytes) -> None:
+    for byte in data:
+        rtl.clock(byte, (cmd << 1) | 0x1)
+        rtl.clock(0, 0)
+
+
+def _random_rows(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, size=(count, 8), dtype=np.uint8)
+
+
+def test_rtl_model_status_bits_and_prediction_timing() -> None:
+    rtl = TophatRtlModel()
+    assert rtl.uio_out == STATUS_READY | STATUS_ERROR_OR_MISSING_FEATURES
+
+    _send(rtl, CMD_MODEL, GOLDEN_MODEL)
+    assert rtl.uio_out & STATUS_MODEL_LOADED
+    features = bytes([10, 200, 3, 4, 5, 6, 7, 8])
+    _send(rtl, CMD_FEATURE, features)
+    assert not rtl.uio_out & STATUS_ERROR_OR_MISSING_FEATURES
+
+    _send(rtl, CMD_CTRL, bytes([CTRL_RUN]))
+    seen = []
+    for _ in range(4):
+        seen.append(rtl.uio_out)
+        rtl.clock()
+    assert seen[0] & STATUS_BUSY
+    assert not seen[2] & STATUS_PRED_VALID
+    assert seen[3] & STATUS_PRED_VALID and seen[3] & STATUS_READY
+    # pred_valid is a one-cycle pulse; features are consumed by the run.
+    assert not rtl.uio_out & STATUS_PRED_VALID
+    assert rtl.uio_out & STATUS_ERROR_OR_MISSING_FEATURES
+    assert rtl.uo_out == ModelImage.from_bytes(GOLDEN_MODEL).predict_row(features)
+
+
+def test_rtl_model_ignores_bytes_while_busy_and_flags_early_run() -> None:
+    rtl = TophatRtlModel()
+    _send(rtl, CMD_CTRL, bytes([CTRL_RUN]))
+    rtl.clock()
+    assert rtl.error and not rtl.busy
+
+    _send(rtl, CMD_MODEL, GOLDEN_MODEL)
+    _send(rtl, CMD_FEATURE, bytes(8))
+    _send(rtl, CMD_CTRL, bytes([CTRL_RUN]))
+    assert rtl.busy
+    rtl.clock(0xFF, (CMD_FEATURE << 1) | 0x1)
+    assert not rtl.feature_byte_valid and rtl.feature_idx == 0
+
+
+@pytest.mark.parametrize("mode", ["cycle", "fast"])
+def test_simulated_transport_matches_reference_through_client(mode: str) -> None:
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+    rows = _random_rows(300)
+    expected = image.predict(rows).tolist()
+    client = TophatClient(SimulatedTophatTransport(mode))
+
+    assert client.ping()["mode"] == f"SIM_{mode.upper()}"
+    assert client.load_model(GOLDEN_MODEL) is False
+    assert client.load_model(GOLDEN_MODEL) is True
+    assert client.predict(rows[0].tolist()) == expected[0]
+    assert client.predict_batch(rows.tolist()) == expected
+    assert client.upload_rows(rows.tolist()) == len(rows)
+    assert client.run_rows(start=10, count=50) == expected[10:60]
+
+
+def test_cycle_and_fast_modes_agree_on_errors_and_ticks() -> None:
+    rows = _random_rows(5, seed=1).tolist()
+    results = {}
+    for mode in ("cycle", "fast"):
+        transport = SimulatedTophatTransport(mode)
+        early = transport.request({"cmd": "run", "id": 7})
+        # A rejected run still consumes loaded features, so the run after the model load is rejected too.
+        transport.request({"cmd": "load_features", "features": rows[0]})
+        no_model = transport.request({"cmd": "run"})
+        transport.request({"cmd": "load_model", "model": list(GOLDEN_MODEL)})
+        consumed = transport.request({"cmd": "run"})
+        batch = transport.request({"cmd": "predict_batch", "rows": rows})
+        stats = transport.request({"cmd": "stats", "reset": True})
+        results[mode] = (early, no_model, consumed, batch, stats["requests"], stats["runs"], stats["ticks"])
+        assert transport.request({"cmd": "stats"})["runs"] == 0
+
+    assert results["cycle"] == results["fast"]
+    early, no_model, consumed = results["fast"][:3]
+    assert early == {"ok": False, "error": "Run rejected (missing model/features or core error)", "id": 7}
+    assert no_model["ok"] is False and consumed["ok"] is False
+
+
+def test_simulated_transport_rejects_bad_requests() -> None:
+    transport = SimulatedTophatTransport()
+    assert transport.request({"cmd": "load_features", "features": [1, 2]})["ok"] is False
+    assert transport.request({"cmd": "predict_batch", "rows": [[0] * 8] * 129})["ok"] is False
+    assert transport.request({"cmd": "run_rows", "count": 1})["ok"] is False
+    assert transport.request({"cmd": "bogus"}) == {"ok": False, "error": "Unsupported command: bogus"}
+    with pytest.raises(ValueError, match="mode"):
+        SimulatedTophatTransport("verilog")
+
+
+def test_rtl_model_accepts_back_to_back_streaming_schedule() -> None:
+    # The schedule test/test.py's _StreamDriver relies on: one byte per cycle
+    # with valid held, then pred_valid exactly 5 cycles after `run` is presented.
+    rtl = TophatRtlModel()
+    for byte in GOLDEN_MODEL:
+        rtl.clock(byte, (CMD_MODEL << 1) | 0x1)
+    rtl.clock()
+    assert rtl.uio_out & STATUS_MODEL_LOADED
+
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+    for row in _random_rows(20, seed=3).tolist():
+        for byte in row:
+            rtl.clock(byte, (CMD_FEATURE << 1) | 0x1)
+        rtl.clock(CTRL_RUN, (CMD_CTRL << 1) | 0x1)
+        for _ in range(4):
+            rtl.clock()
+        assert rtl.uio_out & (STATUS_PRED_VALID | STATUS_READY) == STATUS_PRED_VALID | STATUS_READY
+        assert rtl.uo_out == image.predict_row(row)
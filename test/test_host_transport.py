@@ -12,7 +12,18 @@ import pytest
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from tools.host.tophat_host import JsonLineSerialTransport, ProtocolError, _decode_json_object  # noqa: E402
+from tools.host.tophat_host import (  # noqa: E402
+    FRAME_MAGIC,
+    FRAME_STATUS_ERROR,
+    FRAME_STATUS_OK,
+    BinaryFrameSerialTransport,
+    JsonLineSerialTransport,
+    ProtocolError,
+    TophatClient,
+    _build_request_frame,
+    _decode_json_object,
+    crc16_ccitt,
+)
 
 
 class _FakeSerialPort:
@@ -33,6 +44,15 @@ class _FakeSerialPort:
             return self._responses.pop(0)
         return b""
 
+    def read(self, size: int) -> bytes:
+        if not self._responses:
+            return b""
+        head = self._responses[0]
+        self._responses[0] = head[size:]
+        if not self._responses[0]:
+            self._responses.pop(0)
+        return head[:size]
+
     def reset_input_buffer(self) -> None:
         self.reset_calls += 1
 
@@ -79,3 +99,134 @@ def test_transport_times_out_with_only_echo(monkeypatch: pytest.MonkeyPatch) ->
     transport = JsonLineSerialTransport("/dev/ttyACM0", timeout_s=0.01)
     with pytest.raises(ProtocolError, match="Missing boolean `ok` in response"):
         transport.request({"cmd": "ping"})
+
+
+def _response_frame(status: int, body: bytes) -> bytes:
+    header = bytes([status, len(body) & 0xFF, len(body) >> 8])
+    crc = crc16_ccitt(header + body)
+    return bytes([FRAME_MAGIC]) + header + body + bytes([crc & 0xFF, crc >> 8])
+
+
+def test_crc16_ccitt_check_value() -> None:
+    assert crc16_ccitt(b"123456789") == 0x29B1
+
+
+def test_request_frame_escapes_ctrl_c() -> None:
+    frame = _build_request_frame(0x04, bytes([0x03, 0x7D, 0x10]))
+    assert frame[0] == FRAME_MAGIC
+    assert 0x03 not in frame
+    # opcode, length=3 (escaped), 0x00, then the escaped payload bytes.
+    assert frame[1:10] == bytes([0x04, 0x7D, 0x23, 0x00, 0x7D, 0x23, 0x7D, 0x5D, 0x10])
+
+
+def test_binary_transport_predict_through_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    port = _FakeSerialPort([b"noise", _response_frame(FRAME_STATUS_OK, bytes([42]))])
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(port))
+
+    client = TophatClient(BinaryFrameSerialTransport("/dev/ttyACM0", timeout_s=0.05))
+    features = [4, 6, 10, 12, 15, 20, 10, 18]
+
+    assert client.predict(features) == 42
+    assert port.writes == [_build_request_frame(0x06, bytes(features))]
+
+
+def test_binary_transport_uses_fewer_bytes_per_prediction(monkeypatch: pytest.MonkeyPatch) -> None:
+    features = [200, 6, 110, 12, 155, 20, 10, 255]
+
+    json_response = b'{"ok":true,"prediction":140}\n'
+    json_port = _FakeSerialPort([json_response])
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(json_port))
+    assert TophatClient(JsonLineSerialTransport("/dev/ttyACM0", timeout_s=0.05)).predict(features) == 140
+    json_bytes = sum(len(w) for w in json_port.writes) + len(json_response)
+
+    frame_response = _response_frame(FRAME_STATUS_OK, bytes([140]))
+    frame_port = _FakeSerialPort([frame_response])
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(frame_port))
+    assert TophatClient(BinaryFrameSerialTransport("/dev/ttyACM0", timeout_s=0.05)).predict(features) == 140
+    frame_bytes = sum(len(w) for w in frame_port.writes) + len(frame_response)
+
+    assert frame_bytes * 3 < json_bytes
+
+
+def test_binary_transport_maps_error_frame(monkeypatch: pytest.MonkeyPatch) -> None:
+    port = _FakeSerialPort([_response_frame(FRAME_STATUS_ERROR, b"Timeout waiting for ready")])
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(port))
+
+    client = TophatClient(BinaryFrameSerialTransport("/dev/ttyACM0", timeout_s=0.05))
+    with pytest.raises(RuntimeError, match="Timeout waiting for ready"):
+        client.clear()
+
+
+def test_binary_transport_rejects_bad_crc(monkeypatch: pytest.MonkeyPatch) -> None:
+    frame = bytearray(_response_frame(FRAME_STATUS_OK, bytes([7])))
+    frame[-1] ^= 0xFF
+    port = _FakeSerialPort([bytes(frame)])
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(port))
+
+    transport = BinaryFrameSerialTransport("/dev/ttyACM0", timeout_s=0.05)
+    with pytest.raises(ProtocolError, match="CRC mismatch"):
+        transport.request({"cmd": "run"})
+
+
+def test_binary_transport_resident_row_commands(monkeypatch: pytest.MonkeyPatch) -> None:
+    port = _FakeSerialPort(
+        [_response_frame(FRAME_STATUS_OK, bytes([2, 0])), _response_frame(FRAME_STATUS_OK, bytes([9, 8]))]
+    )
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(port))
+
+    client = TophatClient(BinaryFrameSerialTransport("/dev/ttyACM0", timeout_s=0.05))
+    rows = [[1] * 8, [2] * 8]
+    assert client.upload_rows(rows) == 2
+    assert client.run_rows() == [9, 8]
+    assert port.writes == [
+        _build_request_frame(0x08, bytes([0, 0]) + bytes(rows[0]) + bytes(rows[1])),
+        _build_request_frame(0x09, bytes([0, 0, 2, 0])),
+    ]
+
+
+class _EventLogSerialPort(_FakeSerialPort):
+    def __init__(self, responses: list[bytes]):
+        super().__init__(responses)
+        self.events: list[str] = []
+
+    def write(self, data: bytes) -> int:
+        self.events.append("write")
+        return super().write(data)
+
+    def readline(self) -> bytes:
+        self.events.append("read")
+        return super().readline()
+
+
+def test_request_many_matches_responses_by_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    port = _EventLogSerialPort(
+        [
+            b'{"cmd":"predict","id":1}\n',
+            b'{"ok":true,"prediction":20,"id":2}\n',
+            b'{"ok":true,"prediction":10,"id":1}\n',
+            b'{"ok":false,"error":"boom","id":3}\n',
+        ]
+    )
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(port))
+
+    transport = JsonLineSerialTransport("/dev/ttyACM0", timeout_s=0.05, pipeline_window=2)
+    responses = transport.request_many([{"cmd": "run"}, {"cmd": "run"}, {"cmd": "run"}])
+
+    assert responses == [
+        {"ok": True, "prediction": 10},
+        {"ok": True, "prediction": 20},
+        {"ok": False, "error": "boom"},
+    ]
+    assert port.writes[0] == b'{"cmd":"run","id":1}\n'
+    # Never more than `pipeline_window` requests in flight.
+    assert port.events[:3] == ["write", "write", "read"]
+    assert port.events.index("write", 2) > port.events.index("read")
+
+
+def test_request_many_ignores_stale_ids_and_times_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    port = _FakeSerialPort([b'{"ok":true,"id":99}\n'])
+    monkeypatch.setitem(sys.modules, "serial", _FakeSerialModule(port))
+
+    transport = JsonLineSerialTransport("/dev/ttyACM0", timeout_s=0.01)
+    with pytest.raises(TimeoutError, match="1 in flight"):
+        transport.request_many([{"cmd": "clear"}])
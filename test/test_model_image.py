@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fixture_data import EXAMPLES, vectorize_u8  # noqa: E402
+from tools.host.tophat_host import TophatClient  # noqa: E402
+from tools.model.tophat_image import MODEL_IMAGE_BYTES, ModelImage  # noqa: E402
+
+GOLDEN_MODEL = (Path(__file__).resolve().parent / "golden_model.bin").read_bytes()
+
+
+def test_model_image_fields_match_documented_layout() -> None:
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+
+    assert image.node_features.tolist() == [2, 0, 7, 4, 1, 6, 3]
+    assert image.node_thresholds.tolist() == [24, 8, 35, 20, 20, 40, 28]
+    assert image.leaf_values.tolist() == [8, 18, 25, 45, 55, 85, 95, 140]
+    assert image.to_bytes() == GOLDEN_MODEL
+    assert image == GOLDEN_MODEL
+
+
+def test_model_image_is_a_view_not_a_copy() -> None:
+    data = bytearray(GOLDEN_MODEL)
+    image = ModelImage.from_bytes(data)
+
+    data[15] = 99
+    assert image.leaf_values[1] == 99
+    with pytest.raises(TypeError):
+        image.buffer[0] = 1  # type: ignore[index]
+
+
+def test_model_image_from_fields_round_trips() -> None:
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+    rebuilt = ModelImage.from_fields(image.node_features, image.node_thresholds, image.leaf_values)
+    assert rebuilt == image
+    assert hash(rebuilt) == hash(image)
+
+
+def test_model_image_validation() -> None:
+    with pytest.raises(ValueError, match=f"exactly {MODEL_IMAGE_BYTES} bytes"):
+        ModelImage.from_bytes(GOLDEN_MODEL[:-1])
+    with pytest.raises(ValueError, match="node 0 feature 9 out of range"):
+        ModelImage.from_bytes(bytes([9]) + GOLDEN_MODEL[1:])
+    with pytest.raises(ValueError, match="0..255"):
+        ModelImage.from_fields([0] * 7, [256] + [0] * 6, [0] * 8)
+
+    # Hardware only reads the low 3 bits, so unchecked images still evaluate.
+    ModelImage.from_bytes(bytes([9]) + GOLDEN_MODEL[1:], validate=False)
+
+
+def test_model_image_emulators_match_fixtures() -> None:
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+    rows = np.array([vectorize_u8(case["features"]) for case in EXAMPLES], dtype=np.uint8)
+    expected = [case["expected"] for case in EXAMPLES]
+
+    assert [image.predict_row(row) for row in rows.tolist()] == expected
+    assert image.predict(rows).tolist() == expected
+    assert image.compile().predict(rows).tolist() == expected
+
+
+def test_client_accepts_model_image() -> None:
+    class _Recorder:
+        def __init__(self) -> None:
+            self.payloads: list[dict] = []
+
+        def request(self, payload: dict) -> dict:
+            self.payloads.append(payload)
+            return {"ok": True}
+
+    recorder = _Recorder()
+    TophatClient(recorder).load_model(ModelImage.from_bytes(GOLDEN_MODEL))
+    assert recorder.payloads == [{"cmd": "load_model", "model": list(GOLDEN_MODEL)}]
@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.model.tophat_quantize import FeatureQuantizer  # noqa: E402
+
+NAMES = [f"f{idx}" for idx in range(8)]
+
+
+def _per_column_quantize(matrix: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    # The demo's original column-at-a-time formula.
+    out = np.zeros(matrix.shape, dtype=np.uint8)
+    for idx in range(matrix.shape[1]):
+        if hi[idx] > lo[idx]:
+            col = matrix[:, idx]
+            out[:, idx] = np.round((col - lo[idx]) * 255.0 / (hi[idx] - lo[idx])).clip(0, 255).astype(np.uint8)
+    return out
+
+
+def _sample_matrix(rows: int = 5000) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    matrix = rng.normal(30.0, 20.0, size=(rows, 8))
+    matrix[:, 1] = rng.integers(0, 2, rows)  # binary
+    matrix[:, 3] = 4.0  # constant
+    matrix[:, 5] = rng.integers(0, 512, rows) / 2.0  # lands exactly on .5 rounding ties
+    return matrix
+
+
+def test_fit_and_transform_match_per_column_formula() -> None:
+    matrix = _sample_matrix()
+    quantizer = FeatureQuantizer.fit(matrix, NAMES)
+
+    np.testing.assert_array_equal(quantizer.minimum, matrix.min(axis=0))
+    np.testing.assert_array_equal(quantizer.maximum, matrix.max(axis=0))
+    expected = _per_column_quantize(matrix, matrix.min(axis=0), matrix.max(axis=0))
+    np.testing.assert_array_equal(quantizer.transform(matrix, block_rows=777), expected)
+
+    # Out-of-range values clip instead of wrapping.
+    assert quantizer.transform(matrix.min(axis=0, keepdims=True) - 100.0).tolist() == [[0] * 8]
+    assert quantizer.transform(matrix.max(axis=0, keepdims=True) + 100.0)[0, 0] == 255
+
+
+@pytest.mark.parametrize("mode", ["minmax", "quantile"])
+def test_missing_values_are_ignored_by_fit_and_quantize_to_zero(mode: str) -> None:
+    matrix = _sample_matrix(400)
+    holes = matrix.copy()
+    holes[::7, 0] = np.nan
+    holes[::5, 2] = np.nan
+    quantizer = FeatureQuantizer.fit(holes, NAMES, mode=mode)
+    assert quantizer.minimum[0] == np.nanmin(holes[:, 0]) and quantizer.maximum[2] == np.nanmax(holes[:, 2])
+
+    codes = quantizer.transform(holes, block_rows=64)
+    assert not codes[::7, 0].any() and not codes[::5, 2].any()
+    present = ~np.isnan(holes)
+    np.testing.assert_array_equal(codes[present], quantizer.transform(np.nan_to_num(holes, nan=-1e9))[present])
+
+
+def test_transform_writes_into_preallocated_buffer_and_accepts_dataframes() -> None:
+    matrix = _sample_matrix(300)
+    quantizer = FeatureQuantizer.fit(matrix, NAMES)
+    frame = pd.DataFrame(matrix, columns=NAMES)[NAMES[::-1]]
+
+    out = np.empty((300, 8), dtype=np.uint8)
+    assert quantizer.transform(frame, out=out) is out
+    np.testing.assert_array_equal(out, quantizer.transform(matrix))
+
+    with pytest.raises(ValueError, match="C-contiguous uint8"):
+        quantizer.transform(matrix, out=np.empty((8, 300), dtype=np.uint8).T)
+    with pytest.raises(ValueError, match="shape"):
+        quantizer.transform(matrix[:, :7])
+
+
+def test_scaler_json_round_trip(tmp_path: Path) -> None:
+    quantizer = FeatureQuantizer.fit(_sample_matrix(100), NAMES)
+    path = tmp_path / "feature_scaler.json"
+    quantizer.save(path)
+
+    assert list(quantizer.to_dict()["f0"]) == ["minimum", "maximum"]
+    loaded = FeatureQuantizer.load(path)
+    assert loaded.feature_names == tuple(NAMES)
+    matrix = _sample_matrix(50)
+    np.testing.assert_array_equal(loaded.transform(matrix), quantizer.transform(matrix))
+
+
+def test_quantile_mode_spreads_skewed_columns_and_keeps_distinct_values() -> None:
+    rng = np.random.default_rng(11)
+    matrix = _sample_matrix(4000)
+    matrix[:, 0] = rng.lognormal(2.5, 1.2, 4000)  # fare-like skew
+    matrix[:, 6] = rng.integers(0, 40, 4000) * 1.5
+    minmax = FeatureQuantizer.fit(matrix, NAMES)
+    quantile = FeatureQuantizer.fit(matrix, NAMES, mode="quantile")
+    assert quantile.mode == "quantile"
+
+    skewed_minmax = minmax.transform(matrix)[:, 0]
+    skewed_quantile = quantile.transform(matrix)[:, 0]
+    assert np.count_nonzero(skewed_minmax < 16) > 0.8 * len(matrix)
+    assert len(np.unique(skewed_quantile)) > 4 * len(np.unique(skewed_minmax[skewed_minmax < 16]))
+    # Codes stay monotone in the raw value.
+    order = np.argsort(matrix[:, 0], kind="stable")
+    assert np.all(np.diff(skewed_quantile[order].astype(int)) >= 0)
+
+    # Few distinct values: one code each, so every split a trainer could pick survives.
+    codes = quantile.transform(matrix)
+    assert sorted(set(codes[:, 1].tolist())) == [0, 1]
+    assert sorted(set(codes[:, 6].tolist())) == list(range(len(np.unique(matrix[:, 6]))))
+
+
+def test_quantile_breakpoints_round_trip_and_validate(tmp_path: Path) -> None:
+    matrix = _sample_matrix(500)
+    quantizer = FeatureQuantizer.fit(matrix, NAMES, mode="quantile")
+    path = tmp_path / "feature_scaler.json"
+    quantizer.save(path)
+
+    loaded = FeatureQuantizer.load(path)
+    assert loaded.mode == "quantile"
+    np.testing.assert_array_equal(loaded.transform(matrix), quantizer.transform(matrix))
+
+    with pytest.raises(ValueError, match="strictly increasing"):
+        FeatureQuantizer(["a"], [0.0], [1.0], [[0.5, 0.5]])
+    with pytest.raises(ValueError, match="mode"):
+        FeatureQuantizer.fit(matrix, NAMES, mode="log")
@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fixture_data import EXAMPLES, vectorize_u8  # noqa: E402
+from tools.model.tophat_reference import (  # noqa: E402
+    compile_model,
+    leaf_indices,
+    predict_model_batch,
+    predict_model_rowwise,
+)
+
+GOLDEN_MODEL = (Path(__file__).resolve().parent / "golden_model.bin").read_bytes()
+
+
+def test_batch_reference_matches_fixture_expectations() -> None:
+    rows = np.array([vectorize_u8(case["features"]) for case in EXAMPLES], dtype=np.uint8)
+    expected = [case["expected"] for case in EXAMPLES]
+
+    assert predict_model_batch(GOLDEN_MODEL, rows).tolist() == expected
+    assert leaf_indices(GOLDEN_MODEL, rows).tolist() == list(range(8))
+
+
+def test_batch_reference_matches_rowwise_on_random_models() -> None:
+    rng = np.random.default_rng(1234)
+    for _ in range(20):
+        model = rng.integers(0, 256, 22, dtype=np.uint8).tobytes()
+        rows = rng.integers(0, 256, (500, 8), dtype=np.uint8)
+        assert np.array_equal(predict_model_batch(model, rows), predict_model_rowwise(model, rows))
+
+
+def test_threshold_equal_goes_left_and_feature_uses_low_three_bits() -> None:
+    # Root reads feature 0x0A & 7 == 2; every lower node and leaf is distinct.
+    model = bytes([0x0A, 100] + [0, 255] * 6 + list(range(10, 18)))
+    rows = np.zeros((2, 8), dtype=np.uint8)
+    rows[0, 2] = 100
+    rows[1, 2] = 101
+
+    assert predict_model_batch(model, rows).tolist() == [10, 14]
+
+
+def test_batch_reference_rejects_non_uint8_input() -> None:
+    with pytest.raises(ValueError, match="uint8"):
+        predict_model_batch(GOLDEN_MODEL, np.zeros((1, 8), dtype=np.int64))
+
+
+def test_compiled_model_matches_batch_reference() -> None:
+    rng = np.random.default_rng(99)
+    models = [GOLDEN_MODEL] + [rng.integers(0, 256, 22, dtype=np.uint8).tobytes() for _ in range(20)]
+    for model in models:
+        rows = rng.integers(0, 256, (2000, 8), dtype=np.uint8)
+        compiled = compile_model(model)
+        expected = predict_model_batch(model, rows)
+        assert np.array_equal(compiled.predict(rows), expected)
+        assert [compiled.predict_row(row.tolist()) for row in rows[:50]] == expected[:50].tolist()
+
+
+def test_compiled_model_reads_only_used_features() -> None:
+    compiled = compile_model(GOLDEN_MODEL)
+    # The golden tree never reads feature 5 (family_friendliness).
+    assert compiled.used_features == (0, 1, 2, 3, 4, 6, 7)
+    assert not compiled.feature_masks[5].any()
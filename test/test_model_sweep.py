@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.model.tophat_image import ModelImage  # noqa: E402
+from tools.model.tophat_sweep import (  # noqa: E402
+    boundary_values,
+    boundary_vectors,
+    iter_chunks,
+    path_coverage,
+    reachable_leaves,
+)
+
+GOLDEN_MODEL = (ROOT / "test" / "golden_model.bin").read_bytes()
+
+
+@pytest.mark.parametrize("mode", ["paths", "exhaustive"])
+def test_golden_tree_matches_image_on_boundary_sweep(mode: str) -> None:
+    clf = joblib.load(ROOT / "test" / "golden_tree.joblib")
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+    vectors = boundary_vectors(GOLDEN_MODEL, mode)
+
+    for chunk in iter_chunks(vectors, 1000):
+        golden = np.rint(clf.predict(chunk.astype(np.float64))).astype(np.uint8)
+        np.testing.assert_array_equal(image.predict(chunk), golden)
+
+    coverage = path_coverage(GOLDEN_MODEL, vectors)
+    assert coverage["missing"] == []
+    assert coverage["paths"] == "8/8"
+
+
+def test_boundary_values_include_thresholds_and_extremes() -> None:
+    # Root node of the golden tree: franchise_strength (feature 2) <= 24.
+    assert boundary_values(GOLDEN_MODEL, 2).tolist() == [0, 23, 24, 25, 255]
+    # Unused feature: extremes only.
+    assert boundary_values(GOLDEN_MODEL, 5).tolist() == [0, 255]
+
+
+def test_contradictory_paths_are_unreachable_and_not_reported_missing() -> None:
+    # Root f0 <= 10, then node 1 asks f0 <= 20: its right branch can never be taken.
+    model = bytes([0, 10, 0, 20, 1, 1, 0, 5, 0, 5, 0, 5, 0, 5]) + bytes(range(8))
+    assert reachable_leaves(model).tolist() == [True, True, False, False, False, True, False, True]
+
+    coverage = path_coverage(model, boundary_vectors(model))
+    assert coverage["missing"] == []
+    assert coverage["paths"] == "4/4"
+
+
+def test_exhaustive_sweep_respects_max_vectors() -> None:
+    with pytest.raises(ValueError, match="max_vectors"):
+        boundary_vectors(GOLDEN_MODEL, "exhaustive", max_vectors=1000)
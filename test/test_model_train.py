@@ -0,0 +1,138 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.demo.titanic_asic_demo import serialize_compact_tree  # noqa: E402
+from tools.model.tophat_image import ModelImage  # noqa: E402
+from tools.model.tophat_reference import leaf_indices  # noqa: E402
+from tools.model.tophat_train import fit_native_tree  # noqa: E402
+
+
+def _noisy_dataset(seed: int, rows: int = 3000) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    features = rng.integers(0, 256, (rows, 8), dtype=np.uint8)
+    labels = ((features[:, 1] + rng.normal(0, 40, rows) > 128) ^ (features[:, 4] > 200)).astype(int)
+    return features, labels
+
+
+def _tie_heavy_dataset(seed: int, rows: int = 120) -> tuple[np.ndarray, np.ndarray]:
+    # Few distinct byte values, and column 5 duplicates column 2: many splits tie exactly.
+    rng = np.random.default_rng(seed)
+    features = rng.integers(0, 4, (rows, 8), dtype=np.uint8)
+    features[:, 5] = features[:, 2]
+    labels = ((features[:, 2].astype(int) + features[:, 6] + rng.integers(0, 3, rows)) > 4).astype(int)
+    return features, labels
+
+
+def _gini(labels: np.ndarray) -> float:
+    if labels.size == 0:
+        return 0.0
+    fractions = np.bincount(labels, minlength=2) / labels.size
+    return float(labels.size * (1.0 - (fractions * fractions).sum()))
+
+
+def _leaf_gini(model_bytes: bytes, features: np.ndarray, labels: np.ndarray) -> float:
+    leaves = leaf_indices(model_bytes, features)
+    return sum(_gini(labels[leaves == leaf]) for leaf in range(8)) / labels.size
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_native_tree_matches_serialized_sklearn_tree(seed: int) -> None:
+    # Wide-range random features: no equal-Gini ties, so tie-breaking never comes into play.
+    features, labels = _noisy_dataset(seed)
+    clf = DecisionTreeClassifier(max_depth=3, random_state=seed).fit(features, labels)
+
+    assert fit_native_tree(features, labels).model_bytes == serialize_compact_tree(clf)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_tied_splits_take_lowest_feature_and_threshold(seed: int) -> None:
+    features, labels = _tie_heavy_dataset(seed)
+    image = ModelImage.from_bytes(fit_native_tree(features, labels).model_bytes)
+    node_features = np.array(image.node_features, dtype=np.intp)
+    node_thresholds = np.array(image.node_thresholds, dtype=np.intp)
+
+    node = np.zeros(len(labels), dtype=np.intp)
+    for depth in range(3):
+        for heap in range((1 << depth) - 1, (2 << depth) - 1):
+            rows = node == heap
+            x, y = features[rows], labels[rows]
+            cuts = {
+                (feature, threshold): _gini(y[x[:, feature] <= threshold]) + _gini(y[x[:, feature] > threshold])
+                for feature in range(8)
+                for threshold in range(255)
+                if 0 < np.count_nonzero(x[:, feature] <= threshold) < len(y)
+            }
+            feature, threshold = int(node_features[heap]), int(node_thresholds[heap])
+            if threshold == 255:
+                continue
+            best = min(cuts.values())
+            assert cuts[(feature, threshold)] == pytest.approx(best)
+            # Lowest tied feature, and the lowest cut on it (up to the midpoint placement of the threshold).
+            tied = [cut for cut, score in cuts.items() if score == pytest.approx(best)]
+            assert feature == min(cut[0] for cut in tied)
+            lowest = min(cut[1] for cut in tied if cut[0] == feature)
+            np.testing.assert_array_equal(x[:, feature] <= threshold, x[:, feature] <= lowest)
+        values = features[np.arange(len(labels)), node_features[node]]
+        node = (node * 2) + 1 + (values > node_thresholds[node])
+
+    assert 5 not in node_features.tolist()  # the duplicate of column 2 never wins a tie
+
+
+def test_tie_breaking_differs_from_sklearn_without_losing_purity() -> None:
+    features, labels = _tie_heavy_dataset(0)
+    model_bytes = fit_native_tree(features, labels).model_bytes
+
+    differing = 0
+    for random_state in range(10):
+        clf = DecisionTreeClassifier(max_depth=3, random_state=random_state).fit(features, labels)
+        sklearn_bytes = serialize_compact_tree(clf)
+        differing += sklearn_bytes != model_bytes
+        assert _leaf_gini(model_bytes, features, labels) <= _leaf_gini(sklearn_bytes, features, labels) + 1e-12
+    assert differing > 0
+
+
+def test_native_tree_is_exact_on_its_training_data() -> None:
+    features, labels = _noisy_dataset(11)
+    tree = fit_native_tree(features, labels)
+    image = ModelImage.from_bytes(tree.model_bytes)
+
+    leaves = leaf_indices(tree.model_bytes, features)
+    for leaf in range(8):
+        hits = labels[leaves == leaf]
+        if hits.size:
+            assert np.bincount(hits, minlength=2).tolist() == tree.leaf_counts[leaf].tolist()
+    expected = tree.classes[np.argmax(tree.leaf_counts, axis=1)][leaves]
+    np.testing.assert_array_equal(image.predict(features), expected)
+    np.testing.assert_allclose(tree.predict_proba(features).sum(axis=1), 1.0)
+
+
+def test_pure_or_unsplittable_nodes_are_padded() -> None:
+    features = np.random.default_rng(3).integers(0, 256, (50, 8), dtype=np.uint8)
+    image = ModelImage.from_bytes(fit_native_tree(features, np.full(50, 7)).model_bytes)
+    assert list(image.node_thresholds) == [255] * 7
+    assert list(image.leaf_values) == [7] * 8
+
+    # Identical rows with mixed labels cannot be split: majority class everywhere.
+    same = np.zeros((5, 8), dtype=np.uint8)
+    image = ModelImage.from_bytes(fit_native_tree(same, np.array([0, 1, 1, 0, 1])).model_bytes)
+    assert list(image.leaf_values) == [1] * 8
+
+
+def test_labels_must_fit_leaf_bytes() -> None:
+    features = np.zeros((2, 8), dtype=np.uint8)
+    with pytest.raises(ValueError, match="0..255"):
+        fit_native_tree(features, np.array([0, 300]))
+    with pytest.raises(ValueError, match="one label per row"):
+        fit_native_tree(features, np.array([0]))
@@ -0,0 +1,340 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Run tools/rp2040/main.py on CPython against a fake DemoBoard."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+from pathlib import Path
+import sys
+import time
+import types
+from typing import Any, Callable
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.model.tophat_image import ModelImage  # noqa: E402
+
+BRIDGE_PATH = ROOT / "tools" / "rp2040" / "main.py"
+GOLDEN_MODEL = (ROOT / "test" / "golden_model.bin").read_bytes()
+
+
+class _Pin:
+    def __init__(self, value: int = 0):
+        self.value = value
+
+
+class _ReadPin:
+    def __init__(self, read: Callable[[], int]):
+        self._read = read
+
+    @property
+    def value(self) -> int:
+        return self._read()
+
+
+class _FakeDemoBoard:
+    """Behavioural TOPHAT behind the ttboard pin API.
+
+    Inputs are registered for one cycle like tophat_io_intf.v. Model bytes fill
+    the image at a wrapping index like tophat_model_loader.v: byte 0 clears
+    model_loaded and byte 21 sets it, so reloads overwrite the old image. A run
+    takes three cycles and pulses pred_valid for one. Every clock edge appends
+    the driven (ui_in, uio_in) pair to `trace`.
+    """
+
+    def __init__(self) -> None:
+        self.mode = 1
+        self.mode_str = "ASIC_RP_CONTROL"
+        self.shuttle = types.SimpleNamespace(enabled="tt_um_pgfarley_tophat_top")
+        self.ui_in = _Pin()
+        self.uio_in = _Pin()
+        self.uio_oe_pico = _Pin()
+        self.rst_n = _Pin(1)
+        self.uio_out = _ReadPin(self._uio_out)
+        self.uo_out = _ReadPin(lambda: self.pred_value)
+        self.trace: list[tuple[int, int]] = []
+        self.cycles = 0
+        self.run_cycles = 3
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._in_q = (0, 0)
+        self.model = [0] * 22
+        self.model_byte_idx = 0
+        self.model_loaded = False
+        self.features: list[int] = []
+        self.features_loaded = False
+        self.busy = 0
+        self.pred_valid = False
+        self.pred_value = 0
+        self.error = False
+
+    def _uio_out(self) -> int:
+        status = 0x08 if not self.busy else 0x10
+        status |= 0x20 if self.pred_valid else 0
+        status |= 0x40 if self.model_loaded else 0
+        status |= 0x80 if (self.error or not self.features_loaded) else 0
+        return status
+
+    def reset_project(self, asserted: bool) -> None:
+        if asserted:
+            self._reset_state()
+
+    def clock_project_once(self) -> None:
+        self.cycles += 1
+        self.trace.append((self.ui_in.value, self.uio_in.value))
+        data, uio = self._in_q
+        self._in_q = (self.ui_in.value & 0xFF, self.uio_in.value & 0x07)
+
+        self.pred_valid = False
+        if self.busy:
+            self.busy -= 1
+            if not self.busy:
+                image = ModelImage.from_bytes(bytes(self.model), validate=False)
+                self.pred_value = image.predict_row(bytes(self.features))
+                self.pred_valid = True
+
+        if not uio & 0x1:
+            return
+        cmd = (uio >> 1) & 0x3
+        if cmd == 0:
+            if self.model_byte_idx == 0:
+                self.model_loaded = False
+            self.model[self.model_byte_idx] = data
+            self.model_byte_idx = (self.model_byte_idx + 1) % 22
+            self.model_loaded = self.model_byte_idx == 0
+        elif cmd == 1 and not self.busy:
+            if len(self.features) == 8:
+                self.features = []
+            self.features.append(data)
+            self.features_loaded = len(self.features) == 8
+        elif cmd == 2 and data & 0x02:
+            self._reset_state()
+        elif cmd == 2 and data & 0x01:
+            if self.model_loaded and self.features_loaded:
+                self.busy = self.run_cycles
+                self.features_loaded = False
+                self.error = False
+            else:
+                self.error = True
+
+
+@pytest.fixture
+def bridge_module(monkeypatch: pytest.MonkeyPatch) -> Any:
+    board = _FakeDemoBoard()
+    now_us = [0]
+
+    def ticks_us() -> int:
+        now_us[0] += 1
+        return now_us[0]
+
+    monkeypatch.setattr(time, "ticks_us", ticks_us, raising=False)
+    monkeypatch.setattr(time, "ticks_ms", lambda: ticks_us() // 1000, raising=False)
+    monkeypatch.setattr(time, "ticks_add", lambda ticks, delta: ticks + delta, raising=False)
+    monkeypatch.setattr(time, "ticks_diff", lambda end, start: end - start, raising=False)
+    monkeypatch.setattr(time, "sleep_ms", lambda ms: None, raising=False)
+    monkeypatch.setattr(time, "sleep_us", lambda us: None, raising=False)
+
+    fake_modules = {
+        "ttboard": types.ModuleType("ttboard"),
+        "ttboard.boot": types.ModuleType("ttboard.boot"),
+        "ttboard.boot.demoboard_detect": types.SimpleNamespace(
+            DemoboardDetect=types.SimpleNamespace(probe=lambda: None)
+        ),
+        "ttboard.demoboard": types.SimpleNamespace(DemoBoard=types.SimpleNamespace(get=lambda: board)),
+        "ttboard.mode": types.SimpleNamespace(RPMode=types.SimpleNamespace(ASIC_RP_CONTROL=1)),
+        # CPython has no native emitter; an identity decorator still runs the
+        # streaming engine source through the same code path.
+        "micropython": types.SimpleNamespace(native=lambda fn: fn),
+    }
+    for name, module in fake_modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+
+    spec = importlib.util.spec_from_file_location("tophat_rp2040_bridge", BRIDGE_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.fake_board = board
+    return module
+
+
+ROWS = [[idx, 7 - idx, 3, 5, idx & 3, 1, 6, idx] for idx in range(8)]
+
+
+def _predict_session(module: Any, engine: str) -> tuple[list[int], list[tuple[int, int]]]:
+    module.fake_board.trace.clear()
+    module.fake_board._reset_state()
+    bridge = module.TophatBridge()
+    assert bridge.ready(), bridge.init_error()
+    bridge.fast_io = engine != "per_byte"
+    if engine != "native":
+        bridge.stream_engine = None
+    assert bridge.io_engine() == engine
+
+    bridge.load_model(list(GOLDEN_MODEL))
+    predictions = bridge.predict_batch(ROWS)
+    return predictions, list(module.fake_board.trace)
+
+
+def test_io_engines_drive_identical_pin_traces(bridge_module: Any) -> None:
+    assert bridge_module._STREAM_ENGINE is not None
+
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+    expected = [image.predict_row(bytes(row)) for row in ROWS]
+    results = {engine: _predict_session(bridge_module, engine) for engine in ("per_byte", "burst", "native")}
+
+    for predictions, _ in results.values():
+        assert predictions == expected
+    assert results["native"][1] == results["burst"][1] == results["per_byte"][1]
+
+
+def test_forced_and_different_model_reloads_replace_the_image(bridge_module: Any) -> None:
+    board = bridge_module.fake_board
+    bridge = bridge_module.TophatBridge()
+    golden_leaves = list(GOLDEN_MODEL[14:])
+    constant = GOLDEN_MODEL[:14] + bytes([0x5A] * 8)
+
+    assert bridge.load_model(list(GOLDEN_MODEL)) is False
+    assert board.model[14:] == golden_leaves
+    # A different image reloads over the resident one; model_loaded drops on its first byte.
+    assert bridge.load_model(list(constant)) is False
+    assert board.model == list(constant) and board.model_loaded
+    assert set(bridge.predict_batch(ROWS)) == {0x5A}
+
+    # force=True resends even when the bridge believes the image is resident.
+    board.model[14:] = [0] * 8
+    assert bridge.load_model(list(constant), force=True) is False
+    assert board.model[14:] == [0x5A] * 8
+    assert bridge.load_model(list(GOLDEN_MODEL), force=True) is False
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+    assert bridge.predict_batch(ROWS) == [image.predict_row(bytes(row)) for row in ROWS]
+
+
+def test_load_model_cache_and_bench_command(bridge_module: Any) -> None:
+    bridge = bridge_module.TophatBridge()
+    assert bridge.load_model(list(GOLDEN_MODEL)) is False
+    assert bridge.load_model(list(GOLDEN_MODEL)) is True
+
+    resp = bridge_module._handle_request(bridge, {"cmd": "bench", "bytes": 10, "id": 3})
+    assert resp["ok"] is True and resp["id"] == 3
+    assert resp["bytes"] == 16
+    assert resp["engine"] == "native"
+    assert resp["legacy_us_per_byte"] > 0 and resp["fast_us_per_byte"] > 0
+    assert len(bridge_module.fake_board.features) == 8
+
+    with pytest.raises(ValueError):
+        bridge_module._handle_request(bridge, {"cmd": "bench", "bytes": 0})
+
+
+def test_stream_engine_falls_back_without_micropython(
+    bridge_module: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delitem(sys.modules, "micropython")
+    assert bridge_module._compile_stream_engine() is None
+
+
+def test_run_without_features_is_rejected(bridge_module: Any) -> None:
+    bridge = bridge_module.TophatBridge()
+    bridge.load_model(list(GOLDEN_MODEL))
+    with pytest.raises(RuntimeError, match="Run rejected"):
+        bridge.run()
+
+
+def test_upload_rows_then_run_rows_returns_packed_predictions(bridge_module: Any) -> None:
+    bridge = bridge_module.TophatBridge()
+    bridge.load_model(list(GOLDEN_MODEL))
+    image = ModelImage.from_bytes(GOLDEN_MODEL)
+
+    handle = bridge_module._handle_request
+    assert handle(bridge, {"cmd": "upload_rows", "rows": ROWS[:5]}) == {"ok": True, "rows": 5}
+    assert handle(bridge, {"cmd": "upload_rows", "offset": 5, "rows": ROWS[5:]}) == {"ok": True, "rows": 8}
+
+    resp = handle(bridge, {"cmd": "run_rows", "start": 2, "count": 4})
+    assert bytes.fromhex(resp["packed"]) == bytes(image.predict_row(bytes(row)) for row in ROWS[2:6])
+    resp = handle(bridge, {"cmd": "run_rows"})
+    assert bytes.fromhex(resp["packed"]) == bytes(image.predict_row(bytes(row)) for row in ROWS)
+
+    with pytest.raises(ValueError, match="out of range"):
+        handle(bridge, {"cmd": "run_rows", "start": 6, "count": 3})
+    with pytest.raises(ValueError, match="offset"):
+        handle(bridge, {"cmd": "upload_rows", "offset": 9, "rows": ROWS[:1]})
+
+
+def test_resident_row_frames_round_trip(bridge_module: Any) -> None:
+    upload = bridge_module._frame_to_request(0x08, bytes([3, 0]) + bytes(range(16)))
+    assert upload == {"cmd": "upload_rows", "offset": 3, "rows": [list(range(8)), list(range(8, 16))]}
+    assert bridge_module._frame_to_request(0x09, bytes([1, 0, 0xFF, 0xFF])) == {"cmd": "run_rows", "start": 1}
+    assert bridge_module._frame_to_request(0x09, bytes([1, 0, 2, 0])) == {
+        "cmd": "run_rows",
+        "start": 1,
+        "count": 2,
+    }
+
+    assert bridge_module._response_to_frame_body("upload_rows", {"ok": True, "rows": 300}) == bytes([44, 1])
+    assert bridge_module._response_to_frame_body("run_rows", {"ok": True, "packed": "0a0b"}) == b"\x0a\x0b"
+
+
+def test_stats_count_requests_ticks_and_failures(bridge_module: Any) -> None:
+    bridge = bridge_module.TophatBridge()
+    handle = bridge_module._handle_request
+    handle(bridge, {"cmd": "load_model", "model": list(GOLDEN_MODEL)})
+    handle(bridge, {"cmd": "predict_batch", "rows": ROWS[:3]})
+    with pytest.raises(ValueError):
+        handle(bridge, {"cmd": "predict", "features": [1, 2]})
+
+    stats = handle(bridge, {"cmd": "stats", "reset": True})
+    assert stats["requests"] == {"load_model": 1, "predict_batch": 1, "predict": 1}
+    assert stats["errors"] == 1
+    assert stats["runs"] == 3
+    # Two cycles to clock `run` in, three more until pred_valid is visible.
+    assert stats["run_ticks_max"] == 5
+    assert stats["ticks"] >= 2 * (22 + 3 * 9) + stats["run_ticks"] - 2 * 3
+    assert set(stats["stage_us"]) == {"send", "wait", "run"}
+
+    after = handle(bridge, {"cmd": "stats"})
+    assert after["requests"] == {"stats": 1} and after["runs"] == 0
+
+
+def test_stats_frame_carries_json_and_reset_flag(bridge_module: Any) -> None:
+    assert bridge_module._frame_to_request(0x0A, b"\x01") == {"cmd": "stats", "reset": True}
+    body = bridge_module._response_to_frame_body("stats", {"ok": True, "runs": 4})
+    assert json.loads(body) == {"ok": True, "runs": 4}
+
+
+def test_exact_timing_matches_polling_trace_and_reports_run_time(bridge_module: Any) -> None:
+    bridge = bridge_module.TophatBridge()
+    handle = bridge_module._handle_request
+    handle(bridge, {"cmd": "load_model", "model": list(GOLDEN_MODEL)})
+
+    traces = {}
+    for exact in (True, False):
+        bridge.exact_timing = exact
+        handle(bridge, {"cmd": "load_features", "features": ROWS[1]})
+        bridge_module.fake_board.trace.clear()
+        resp = handle(bridge, {"cmd": "run"})
+        assert resp["timing"] == ("exact" if exact else "poll")
+        assert resp["run_us"] > 0
+        traces[exact] = list(bridge_module.fake_board.trace)
+
+    assert traces[True] == traces[False]
+    assert bridge.stats.exact_misses == 0
+
+    bench = handle(bridge, {"cmd": "bench", "bytes": 8})
+    assert {"run_poll_us", "run_exact_us", "run_saved_us"} <= set(bench)
+
+
+def test_exact_timing_falls_back_to_polling_when_core_is_slower(bridge_module: Any) -> None:
+    bridge_module.fake_board.run_cycles = 6
+    bridge = bridge_module.TophatBridge()
+    bridge.load_model(list(GOLDEN_MODEL))
+
+    assert bridge.predict(ROWS[2]) == ModelImage.from_bytes(GOLDEN_MODEL).predict_row(bytes(ROWS[2]))
+    assert bridge.last_run_timing == "poll"
+    assert bridge.stats.exact_misses == 1
+    assert bridge.stats.run_ticks_max == 8
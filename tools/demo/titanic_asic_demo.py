@@ -5,18 +5,20 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import csv
+import functools
 import json
 import subprocess
 import sys
 import zipfile
-from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
 import numpy as np
 import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
 from sklearn.model_selection import StratifiedKFold, cross_val_score
 from sklearn.tree import DecisionTreeClassifier
 
@@ -24,17 +26,24 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from tools.host.tophat_host import (  # noqa: E402
+from tools.host.tophat_host import DEFAULT_BATCH_ROWS, JsonLineSerialTransport  # noqa: E402
+from tools.host.tophat_metrics import TophatMetrics  # noqa: E402
+from tools.host.tophat_pool import TophatPool  # noqa: E402
+from tools.model.tophat_image import (  # noqa: E402
     FEATURE_VECTOR_BYTES,
-    MODEL_IMAGE_BYTES,
-    JsonLineSerialTransport,
-    TophatClient,
+    NUM_INTERNAL,
+    NUM_LEAVES,
+    TREE_DEPTH,
+    ModelImage,
 )
+from tools.model.tophat_quantize import QUANTIZATION_MODES, FeatureQuantizer  # noqa: E402
+from tools.model.tophat_train import NativeTree, fit_native_tree  # noqa: E402
 
 COMPETITION = "titanic"
-TREE_DEPTH = 3
-NUM_INTERNAL = (1 << TREE_DEPTH) - 1
-NUM_LEAVES = 1 << TREE_DEPTH
+TRAINERS = ("sklearn", "native")
+DEFAULT_STREAM_CHUNK_ROWS = 50_000
+# Raw test.csv columns the feature pipeline reads; --stream loads only these.
+TEST_COLUMNS = ["PassengerId", "Pclass", "Sex", "Age", "SibSp", "Parch", "Fare", "Embarked"]
 
 FEATURE_NAMES = [
     "pclass",
@@ -48,12 +57,6 @@ FEATURE_NAMES = [
 ]
 
 
-@dataclass(frozen=True)
-class ScaleStats:
-    minimum: float
-    maximum: float
-
-
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Train a depth-3/8-feature Titanic model and run Kaggle inference on TOPHAT ASIC.",
@@ -72,7 +75,11 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--port",
-        help="Serial port for RP2040 bridge (for example /dev/ttyACM0). Required unless --skip-board.",
+        action="append",
+        help=(
+            "Serial port for RP2040 bridge (for example /dev/ttyACM0). Required unless --skip-board. "
+            "Repeat to spread predictions across several boards."
+        ),
     )
     parser.add_argument(
         "--download",
@@ -94,6 +101,38 @@ def parse_args() -> argparse.Namespace:
         default="TOPHAT ASIC depth-3 demo",
         help="Message used for Kaggle submission when --submit is set.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Score test.csv in chunks (features, quantization, inference, submission rows) "
+            "so memory stays flat for large files."
+        ),
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_STREAM_CHUNK_ROWS,
+        help=f"Rows per test.csv chunk with --stream (default: {DEFAULT_STREAM_CHUNK_ROWS}).",
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=QUANTIZATION_MODES,
+        default="minmax",
+        help=(
+            "Feature-to-uint8 mapping: minmax linear scaling, or quantile breakpoints "
+            "(default: minmax). The report compares CV accuracy for both."
+        ),
+    )
+    parser.add_argument(
+        "--trainer",
+        choices=TRAINERS,
+        default="sklearn",
+        help=(
+            "Tree trainer: sklearn DecisionTreeClassifier serialized to 22 bytes, or the native "
+            "uint8 histogram trainer that emits the 22-byte image directly (default: sklearn)."
+        ),
+    )
     parser.add_argument(
         "--seed",
         type=int,
@@ -120,7 +159,7 @@ def maybe_download_data(data_dir: Path) -> None:
         archive.extractall(data_dir)
 
 
-def load_data(data_dir: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
+def _data_paths(data_dir: Path) -> tuple[Path, Path]:
     train_path = data_dir / "train.csv"
     test_path = data_dir / "test.csv"
 
@@ -129,13 +168,29 @@ def load_data(data_dir: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
             f"Missing {train_path} or {test_path}. "
             "Use --download or place Kaggle CSV files in --data-dir."
         )
+    return train_path, test_path
+
 
+def load_train_data(data_dir: Path) -> pd.DataFrame:
+    train_path, _ = _data_paths(data_dir)
     train_df = pd.read_csv(train_path)
-    test_df = pd.read_csv(test_path)
     if "Survived" not in train_df.columns:
         raise ValueError("train.csv missing Survived column")
+    return train_df
 
-    return train_df, test_df
+
+def load_data(data_dir: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
+    _, test_path = _data_paths(data_dir)
+    return load_train_data(data_dir), pd.read_csv(test_path)
+
+
+def iter_test_chunks(data_dir: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield test.csv `chunk_rows` rows at a time, reading only `TEST_COLUMNS`."""
+    if chunk_rows <= 0:
+        raise ValueError(f"chunk_rows must be positive (got {chunk_rows})")
+    _, test_path = _data_paths(data_dir)
+    with pd.read_csv(test_path, usecols=TEST_COLUMNS, chunksize=chunk_rows) as reader:
+        yield from reader
 
 
 def engineer_features(
@@ -162,45 +217,73 @@ def engineer_features(
     )[FEATURE_NAMES]
 
 
-def fit_quantize_stats(train_features: pd.DataFrame) -> dict[str, ScaleStats]:
-    stats: dict[str, ScaleStats] = {}
-    for name in FEATURE_NAMES:
-        stats[name] = ScaleStats(
-            minimum=float(train_features[name].min()),
-            maximum=float(train_features[name].max()),
-        )
-    return stats
+def fit_quantize_stats(train_features: pd.DataFrame, mode: str = "minmax") -> FeatureQuantizer:
+    return FeatureQuantizer.fit(train_features, FEATURE_NAMES, mode=mode)
 
 
-def quantize_features(features: pd.DataFrame, stats: dict[str, ScaleStats]) -> np.ndarray:
-    out = np.zeros((features.shape[0], FEATURE_VECTOR_BYTES), dtype=np.uint8)
-    for idx, name in enumerate(FEATURE_NAMES):
-        col = features[name].to_numpy(dtype=np.float64, copy=True)
-        lo = stats[name].minimum
-        hi = stats[name].maximum
-        if hi <= lo:
-            q = np.zeros_like(col, dtype=np.uint8)
-        else:
-            q = np.round((col - lo) * 255.0 / (hi - lo)).clip(0, 255).astype(np.uint8)
-        out[:, idx] = q
-    return out
+def quantize_features(features: pd.DataFrame, quantizer: FeatureQuantizer) -> np.ndarray:
+    return quantizer.transform(features)
 
 
 def train_tree(train_u8: np.ndarray, y: pd.Series, seed: int) -> tuple[DecisionTreeClassifier, dict[str, float]]:
     model = DecisionTreeClassifier(max_depth=TREE_DEPTH, random_state=seed)
     model.fit(train_u8, y.to_numpy(dtype=int))
+    return model, cross_validate_tree(train_u8, y, seed)
 
+
+def train_native_tree(train_u8: np.ndarray, y: pd.Series, seed: int) -> tuple[NativeTree, dict[str, float]]:
+    tree = fit_native_tree(train_u8, y.to_numpy(dtype=int))
+    return tree, cross_validate_tree(train_u8, y, seed, trainer="native")
+
+
+def cross_validate_tree(train_u8: np.ndarray, y: pd.Series, seed: int, trainer: str = "sklearn") -> dict[str, float]:
     cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=seed)
-    cv_accuracy = cross_val_score(model, train_u8, y, cv=cv, scoring="accuracy")
-    cv_auc = cross_val_score(model, train_u8, y, cv=cv, scoring="roc_auc")
+    if trainer == "native":
+        labels = y.to_numpy(dtype=int)
+        fold_accuracy = []
+        fold_auc = []
+        for train_idx, test_idx in cv.split(train_u8, labels):
+            tree = fit_native_tree(train_u8[train_idx], labels[train_idx])
+            fold_accuracy.append(accuracy_score(labels[test_idx], tree.predict(train_u8[test_idx])))
+            proba = tree.predict_proba(train_u8[test_idx])
+            fold_auc.append(roc_auc_score(labels[test_idx], proba[:, list(tree.classes).index(1)]))
+        cv_accuracy = np.array(fold_accuracy)
+        cv_auc = np.array(fold_auc)
+    else:
+        model = DecisionTreeClassifier(max_depth=TREE_DEPTH, random_state=seed)
+        cv_accuracy = cross_val_score(model, train_u8, y, cv=cv, scoring="accuracy")
+        cv_auc = cross_val_score(model, train_u8, y, cv=cv, scoring="roc_auc")
 
-    metrics = {
+    return {
         "cv_accuracy_mean": float(cv_accuracy.mean()),
         "cv_accuracy_std": float(cv_accuracy.std()),
         "cv_roc_auc_mean": float(cv_auc.mean()),
         "cv_roc_auc_std": float(cv_auc.std()),
     }
-    return model, metrics
+
+
+def compare_quantization(
+    train_features: pd.DataFrame,
+    y: pd.Series,
+    seed: int,
+    selected: str,
+    selected_metrics: dict[str, float],
+    trainer: str = "sklearn",
+) -> dict[str, Any]:
+    """CV metrics under every quantization mode, plus each mode's accuracy change vs minmax."""
+    by_mode = {selected: selected_metrics}
+    for mode in QUANTIZATION_MODES:
+        if mode not in by_mode:
+            quantizer = fit_quantize_stats(train_features, mode)
+            by_mode[mode] = cross_validate_tree(quantize_features(train_features, quantizer), y, seed, trainer)
+    baseline = by_mode["minmax"]["cv_accuracy_mean"]
+    return {
+        "mode": selected,
+        "cv_by_mode": by_mode,
+        "cv_accuracy_change_vs_minmax": {
+            mode: metrics["cv_accuracy_mean"] - baseline for mode, metrics in by_mode.items()
+        },
+    }
 
 
 def _is_leaf(tree, node_idx: int) -> bool:
@@ -248,71 +331,143 @@ def serialize_compact_tree(model: DecisionTreeClassifier) -> bytes:
 
     fill(0, 0, 0)
 
-    image = bytearray()
-    for idx in range(NUM_INTERNAL):
-        image.extend([int(node_feature[idx]), int(node_threshold[idx])])
-    for idx in range(NUM_LEAVES):
-        image.append(int(leaf_values[idx]))
-
-    if len(image) != MODEL_IMAGE_BYTES:
-        raise ValueError(f"Serialized model length {len(image)} != expected {MODEL_IMAGE_BYTES}")
-
-    return bytes(image)
+    return ModelImage.from_fields(node_feature, node_threshold, leaf_values).to_bytes()
 
 
 def predict_compact_model(model_bytes: bytes, features_u8: np.ndarray) -> np.ndarray:
-    if len(model_bytes) != MODEL_IMAGE_BYTES:
-        raise ValueError(f"model_bytes must be {MODEL_IMAGE_BYTES} bytes")
+    return ModelImage.from_bytes(model_bytes).predict(np.ascontiguousarray(features_u8, dtype=np.uint8))
+
+
+@contextlib.contextmanager
+def open_board_pool(
+    ports: list[str], model_bytes: bytes, metrics: TophatMetrics
+) -> Iterator[tuple[TophatPool, dict[str, Any]]]:
+    """Yield a pool with `model_bytes` loaded on every board, plus the boards' pings."""
+    factory = functools.partial(JsonLineSerialTransport, metrics=metrics)
+    with TophatPool(ports, transport_factory=factory, metrics=metrics) as pool:
+        ping = pool.ping()
+        for port, board_ping in ping.items():
+            init_error = board_ping.get("init_error")
+            if isinstance(init_error, str) and init_error:
+                raise RuntimeError(f"RP2040 bridge on {port} reported init_error: {init_error}")
+        pool.clear()
+        pool.load_model(model_bytes)
+        yield pool, ping
+
+
+def _board_step_rows(num_boards: int) -> int:
+    # Each report step hands every board a few chunks to work on in parallel.
+    return DEFAULT_BATCH_ROWS * 4 * num_boards
+
+
+def predict_with_board(
+    ports: list[str], model_bytes: bytes, features_u8: np.ndarray
+) -> tuple[list[int], dict[str, Any], list[dict[str, Any]], dict[str, Any]]:
+    metrics = TophatMetrics()
+    with open_board_pool(ports, model_bytes, metrics) as (pool, ping):
+        preds: list[int] = []
+        total = features_u8.shape[0]
+        step = _board_step_rows(len(ports))
+        for start in range(0, total, step):
+            chunk = features_u8[start : start + step]
+            preds.extend(pool.predict_batch(chunk.tolist()))
+            print(f"[board] predicted {len(preds)}/{total}")
 
-    node_feature = np.frombuffer(model_bytes[: NUM_INTERNAL * 2 : 2], dtype=np.uint8)
-    node_threshold = np.frombuffer(model_bytes[1 : NUM_INTERNAL * 2 : 2], dtype=np.uint8)
-    leaf_values = np.frombuffer(model_bytes[NUM_INTERNAL * 2 :], dtype=np.uint8)
+        health = pool.health()
 
-    preds = np.zeros(features_u8.shape[0], dtype=np.uint8)
+    return preds, ping, health, metrics.snapshot()
 
-    for row_idx, row in enumerate(features_u8):
-        node = 0
-        for depth in range(TREE_DEPTH):
-            feat_idx = int(node_feature[node])
-            threshold = int(node_threshold[node])
-            branch_right = 1 if int(row[feat_idx]) > threshold else 0
-            child = (node * 2) + 1 + branch_right
 
-            if depth == (TREE_DEPTH - 1):
-                preds[row_idx] = leaf_values[child - NUM_INTERNAL]
-            else:
-                node = child
+def score_chunks(
+    chunks: Iterable[pd.DataFrame],
+    *,
+    age_fill: float,
+    fare_fill: float,
+    quantizer: FeatureQuantizer,
+    model_bytes: bytes,
+    predict_fn: Callable[[np.ndarray], np.ndarray] | None = None,
+) -> Iterator[tuple[np.ndarray, np.ndarray, int]]:
+    """Yield `(passenger_ids, predictions, mismatches)` per raw test chunk.
+
+    `predict_fn` runs inference (the board); without it the software model's
+    predictions are used. `mismatches` counts rows where the two disagree.
+    """
+    for chunk in chunks:
+        features = engineer_features(chunk, age_fill=age_fill, fare_fill=fare_fill)
+        features_u8 = quantize_features(features, quantizer)
+        sw_preds = predict_compact_model(model_bytes, features_u8)
+        preds = sw_preds if predict_fn is None else np.asarray(predict_fn(features_u8), dtype=np.uint8)
+        yield chunk["PassengerId"].to_numpy(), preds, int(np.count_nonzero(preds != sw_preds))
+
+
+def write_submission_chunks(chunks: Iterable[tuple[Any, np.ndarray]], path: Path) -> int:
+    """Write `(passenger_ids, predictions)` chunks as they arrive; return the row count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    with path.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["PassengerId", "Survived"])
+        for passenger_ids, predictions in chunks:
+            pids = np.asarray(passenger_ids).astype(int).tolist()
+            writer.writerows(zip(pids, predictions.astype(int).tolist(), strict=True))
+            rows += len(pids)
+    return rows
 
-    return preds
 
+def write_submission(passenger_ids: pd.Series, predictions: np.ndarray, path: Path) -> None:
+    write_submission_chunks([(passenger_ids, predictions)], path)
 
-def predict_with_board(port: str, model_bytes: bytes, features_u8: np.ndarray) -> tuple[list[int], dict[str, Any]]:
-    with JsonLineSerialTransport(port) as transport:
-        client = TophatClient(transport)
-        ping = client.ping()
-        init_error = ping.get("init_error")
-        if isinstance(init_error, str) and init_error:
-            raise RuntimeError(f"RP2040 bridge reported init_error: {init_error}")
-        client.clear()
-        client.load_model(model_bytes)
 
-        preds: list[int] = []
-        total = features_u8.shape[0]
-        for idx, row in enumerate(features_u8):
-            preds.append(int(client.predict(row.tolist())))
-            if (idx + 1) % 50 == 0 or (idx + 1) == total:
-                print(f"[board] predicted {idx + 1}/{total}")
+def stream_submission(
+    args: argparse.Namespace,
+    *,
+    age_fill: float,
+    fare_fill: float,
+    quantizer: FeatureQuantizer,
+    model_bytes: bytes,
+    submission_path: Path,
+) -> dict[str, Any]:
+    """Score test.csv chunk by chunk straight into `submission_path`."""
+    totals = {"rows": 0, "chunks": 0, "mismatches": 0}
+
+    def scored(predict_fn: Callable[[np.ndarray], np.ndarray] | None) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        for passenger_ids, preds, mismatches in score_chunks(
+            iter_test_chunks(args.data_dir, args.chunk_size),
+            age_fill=age_fill,
+            fare_fill=fare_fill,
+            quantizer=quantizer,
+            model_bytes=model_bytes,
+            predict_fn=predict_fn,
+        ):
+            totals["rows"] += len(passenger_ids)
+            totals["chunks"] += 1
+            totals["mismatches"] += mismatches
+            print(f"[stream] scored {totals['rows']} rows in {totals['chunks']} chunks")
+            yield passenger_ids, preds
+
+    result: dict[str, Any] = {"ping": None, "health": None, "latency": None}
+    if args.skip_board:
+        print("[board] skipped; streaming software-only submission")
+        write_submission_chunks(scored(None), submission_path)
+    else:
+        print(f"[board] streaming predictions via {', '.join(args.port)}")
+        metrics = TophatMetrics()
+        with open_board_pool(args.port, model_bytes, metrics) as (pool, ping):
+            step = _board_step_rows(len(args.port))
 
-    return preds, ping
+            def predict_on_board(features_u8: np.ndarray) -> np.ndarray:
+                preds: list[int] = []
+                for start in range(0, features_u8.shape[0], step):
+                    preds.extend(pool.predict_batch(features_u8[start : start + step].tolist()))
+                return np.array(preds, dtype=np.uint8)
 
+            write_submission_chunks(scored(predict_on_board), submission_path)
+            result.update(ping=ping, health=pool.health())
+        result["latency"] = metrics.snapshot()
+        print(f"[board] software vs board mismatches: {totals['mismatches']}")
 
-def write_submission(passenger_ids: pd.Series, predictions: np.ndarray, path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="") as handle:
-        writer = csv.writer(handle)
-        writer.writerow(["PassengerId", "Survived"])
-        for pid, pred in zip(passenger_ids.astype(int), predictions.astype(int), strict=True):
-            writer.writerow([int(pid), int(pred)])
+    result.update(totals)
+    return result
 
 
 def submit_to_kaggle(submission_csv: Path, message: str) -> dict[str, str]:
@@ -347,22 +502,33 @@ def main() -> None:
         print(f"[data] downloading Kaggle {COMPETITION} CSVs into {args.data_dir}")
         maybe_download_data(args.data_dir)
 
-    train_df, test_df = load_data(args.data_dir)
+    test_df: pd.DataFrame | None = None
+    if args.stream:
+        train_df = load_train_data(args.data_dir)
+    else:
+        train_df, test_df = load_data(args.data_dir)
 
     age_median = float(train_df["Age"].median())
     fare_median = float(train_df["Fare"].median())
 
     train_features = engineer_features(train_df, age_fill=age_median, fare_fill=fare_median)
-    test_features = engineer_features(test_df, age_fill=age_median, fare_fill=fare_median)
     y = train_df["Survived"].astype(int)
 
-    stats = fit_quantize_stats(train_features)
-    train_u8 = quantize_features(train_features, stats)
-    test_u8 = quantize_features(test_features, stats)
+    quantizer = fit_quantize_stats(train_features, args.quantization)
+    train_u8 = quantize_features(train_features, quantizer)
 
-    model, metrics = train_tree(train_u8, y, args.seed)
-    model_bytes = serialize_compact_tree(model)
-    sw_preds = predict_compact_model(model_bytes, test_u8)
+    if args.trainer == "native":
+        native_tree, metrics = train_native_tree(train_u8, y, args.seed)
+        model_bytes = native_tree.model_bytes
+    else:
+        model, metrics = train_tree(train_u8, y, args.seed)
+        model_bytes = serialize_compact_tree(model)
+    quantization = compare_quantization(
+        train_features, y, args.seed, args.quantization, metrics, trainer=args.trainer
+    )
+    for mode, change in quantization["cv_accuracy_change_vs_minmax"].items():
+        accuracy = quantization["cv_by_mode"][mode]["cv_accuracy_mean"]
+        print(f"[quantize] {mode}: cv accuracy {accuracy:.4f} ({change:+.4f} vs minmax)")
 
     args.output_dir.mkdir(parents=True, exist_ok=True)
     model_path = args.output_dir / "titanic_model_22b.bin"
@@ -371,26 +537,49 @@ def main() -> None:
     report_path = args.output_dir / "demo_report.json"
 
     model_path.write_bytes(model_bytes)
-    scaler_payload = {name: asdict(stats[name]) for name in FEATURE_NAMES}
-    scaler_path.write_text(json.dumps(scaler_payload, indent=2))
+    quantizer.save(scaler_path)
 
     board_ping: dict[str, Any] | None = None
+    board_health: list[dict[str, Any]] | None = None
+    board_latency: dict[str, Any] | None = None
     board_preds_np: np.ndarray | None = None
     mismatch_count: int | None = None
-
-    if args.skip_board:
-        print("[board] skipped; writing software-only submission")
-        board_preds_np = sw_preds
-        mismatch_count = 0
+    streaming: dict[str, Any] | None = None
+
+    if test_df is None:
+        streamed = stream_submission(
+            args,
+            age_fill=age_median,
+            fare_fill=fare_median,
+            quantizer=quantizer,
+            model_bytes=model_bytes,
+            submission_path=submission_path,
+        )
+        board_ping, board_health, board_latency = streamed["ping"], streamed["health"], streamed["latency"]
+        mismatch_count = streamed["mismatches"]
+        test_rows = streamed["rows"]
+        streaming = {"chunk_size": args.chunk_size, "chunks": streamed["chunks"]}
     else:
-        print(f"[board] running {test_u8.shape[0]} predictions via {args.port}")
-        board_preds, board_ping = predict_with_board(args.port, model_bytes, test_u8)
-        board_preds_np = np.array(board_preds, dtype=np.uint8)
-        mismatch_count = int(np.count_nonzero(board_preds_np != sw_preds))
-        print(f"[board] software vs board mismatches: {mismatch_count}")
+        test_features = engineer_features(test_df, age_fill=age_median, fare_fill=fare_median)
+        test_u8 = quantize_features(test_features, quantizer)
+        sw_preds = predict_compact_model(model_bytes, test_u8)
+        test_rows = int(test_df.shape[0])
+
+        if args.skip_board:
+            print("[board] skipped; writing software-only submission")
+            board_preds_np = sw_preds
+            mismatch_count = 0
+        else:
+            print(f"[board] running {test_u8.shape[0]} predictions via {', '.join(args.port)}")
+            board_preds, board_ping, board_health, board_latency = predict_with_board(
+                args.port, model_bytes, test_u8
+            )
+            board_preds_np = np.array(board_preds, dtype=np.uint8)
+            mismatch_count = int(np.count_nonzero(board_preds_np != sw_preds))
+            print(f"[board] software vs board mismatches: {mismatch_count}")
 
-    assert board_preds_np is not None
-    write_submission(test_df["PassengerId"], board_preds_np, submission_path)
+        assert board_preds_np is not None
+        write_submission(test_df["PassengerId"], board_preds_np, submission_path)
 
     kaggle_submit: dict[str, str] | None = None
     if args.submit:
@@ -408,10 +597,13 @@ def main() -> None:
         "output_dir": str(args.output_dir),
         "rows": {
             "train": int(train_df.shape[0]),
-            "test": int(test_df.shape[0]),
+            "test": test_rows,
         },
+        "streaming": streaming,
         "feature_names": FEATURE_NAMES,
+        "trainer": args.trainer,
         "metrics": metrics,
+        "quantization": quantization,
         "artifacts": {
             "model_bytes": str(model_path),
             "feature_scaler": str(scaler_path),
@@ -422,6 +614,8 @@ def main() -> None:
             "used": not args.skip_board,
             "port": args.port,
             "ping": board_ping,
+            "health": board_health,
+            "latency": board_latency,
             "software_vs_board_mismatch_count": mismatch_count,
         },
         "kaggle_submit": kaggle_submit,
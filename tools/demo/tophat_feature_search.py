@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Search which candidate columns fill the TOPHAT's 8 feature slots.
+
+Builds every candidate column from the Titanic training CSV and quantizes it
+once per quantization mode. Each (mode, 8-column subset) is scored with the
+demo's 5-fold `StratifiedKFold` CV. Evaluations run on a
+`ProcessPoolExecutor`. Workers read the quantized columns, labels and fold
+assignment from `multiprocessing.shared_memory` blocks rather than pickled
+copies.
+
+Per-fold scores are cached by a digest of the exact bytes they were computed
+from: columns, labels, folds, trainer and seed. Repeated subsets within a run
+are free. With `--cache`, re-runs skip every fold they have already scored.
+
+Strategies:
+
+- `greedy`: forward selection, adding the candidate that raises CV accuracy
+  most until all 8 slots are filled.
+- `random`: `--samples` random 8-column subsets.
+
+Both also score the demo's hand-picked `FEATURE_NAMES`. The best subset is
+retrained on all rows and written as `titanic_model_22b.bin` plus its
+`feature_scaler.json` (slot order = scaler order), with a leaderboard in
+`search_report.json`.
+
+Usage: python tools/demo/tophat_feature_search.py --data-dir ../titanic-xgboost/data/raw
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import json
+from multiprocessing import shared_memory
+import os
+from pathlib import Path
+import sys
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.demo.titanic_asic_demo import (  # noqa: E402
+    FEATURE_NAMES,
+    TRAINERS,
+    engineer_features,
+    load_train_data,
+    serialize_compact_tree,
+)
+from tools.model.tophat_image import FEATURE_VECTOR_BYTES, TREE_DEPTH  # noqa: E402
+from tools.model.tophat_quantize import QUANTIZATION_MODES, FeatureQuantizer  # noqa: E402
+from tools.model.tophat_train import fit_native_tree  # noqa: E402
+
+SEARCH_STRATEGIES = ("greedy", "random")
+CV_FOLDS = 5
+DEFAULT_RANDOM_SAMPLES = 200
+DEFAULT_TOP = 10
+CACHE_VERSION = 1
+
+EXTRA_CANDIDATES = [
+    "family_size",
+    "fare_per_person",
+    "log_fare",
+    "age_missing",
+    "is_child",
+    "pclass_sex",
+    "title",
+    "name_length",
+    "cabin_known",
+    "cabin_deck",
+    "ticket_numeric",
+]
+CANDIDATE_NAMES = FEATURE_NAMES + EXTRA_CANDIDATES
+TITLE_CODES = {"Mr": 0.0, "Mrs": 1.0, "Miss": 2.0, "Master": 3.0}
+CABIN_DECKS = "ABCDEFGT"
+
+
+def engineer_candidate_features(df: pd.DataFrame, *, age_fill: float, fare_fill: float) -> pd.DataFrame:
+    """The demo's 8 features plus `EXTRA_CANDIDATES`, all as float columns.
+
+    Every column is a function of its own row only, so CV folds never see
+    statistics of held-out rows and a test row can be scored on its own.
+    """
+    base = engineer_features(df, age_fill=age_fill, fare_fill=fare_fill)
+    family_size = base["sibsp"] + base["parch"] + 1.0
+    title = df["Name"].fillna("").str.extract(r",\s*([^.]+)\.", expand=False).fillna("")
+    ticket = df["Ticket"].fillna("").astype(str)
+    cabin = df["Cabin"].fillna("").astype(str)
+
+    extras = pd.DataFrame(
+        {
+            "family_size": family_size,
+            "fare_per_person": base["fare"] / family_size,
+            "log_fare": np.log1p(base["fare"].clip(lower=0.0)),
+            "age_missing": df["Age"].isna().astype(float),
+            "is_child": (base["age"] < 16).astype(float),
+            "pclass_sex": (base["pclass"] * 2.0) + base["sex_male"],
+            "title": title.map(TITLE_CODES).fillna(float(len(TITLE_CODES))),
+            "name_length": df["Name"].fillna("").str.len().astype(float),
+            "cabin_known": (cabin != "").astype(float),
+            "cabin_deck": cabin.str[:1].map({deck: float(idx + 1) for idx, deck in enumerate(CABIN_DECKS)}).fillna(0.0),
+            "ticket_numeric": ticket.str.fullmatch(r"\d+").astype(float),
+        },
+        index=base.index,
+    )
+    return pd.concat([base, extras], axis=1)[CANDIDATE_NAMES]
+
+
+@dataclass(frozen=True)
+class Candidate:
+    mode: str
+    columns: tuple[int, ...]
+
+
+def fold_scores(
+    quantized: np.ndarray,
+    labels: np.ndarray,
+    fold_ids: np.ndarray,
+    columns: Iterable[int],
+    folds: Iterable[int],
+    trainer: str,
+    seed: int,
+) -> list[tuple[float, float]]:
+    """(accuracy, roc_auc) for each requested fold, training on the other folds.
+
+    Columns fill the first slots of an 8-byte feature vector; unused slots are 0.
+    """
+    columns = list(columns)
+    features = np.zeros((quantized.shape[0], FEATURE_VECTOR_BYTES), dtype=np.uint8)
+    features[:, : len(columns)] = quantized[:, columns]
+
+    scores = []
+    for fold in folds:
+        test = fold_ids == fold
+        train = ~test
+        if trainer == "native":
+            tree = fit_native_tree(features[train], labels[train])
+            predictions = tree.predict(features[test])
+            proba = tree.predict_proba(features[test])[:, list(tree.classes).index(1)]
+        else:
+            model = DecisionTreeClassifier(max_depth=TREE_DEPTH, random_state=seed)
+            model.fit(features[train], labels[train])
+            predictions = model.predict(features[test])
+            proba = model.predict_proba(features[test])[:, list(model.classes_).index(1)]
+        scores.append(
+            (float(accuracy_score(labels[test], predictions)), float(roc_auc_score(labels[test], proba)))
+        )
+    return scores
+
+
+class FoldCache:
+    """Per-fold (accuracy, roc_auc) keyed by a digest of everything the score depends on."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.entries: dict[str, list[float]] = {}
+        self.hits = 0
+        self.misses = 0
+        if path is not None and path.exists():
+            payload = json.loads(path.read_text())
+            if payload.get("version") == CACHE_VERSION:
+                self.entries = payload["entries"]
+
+    def get(self, key: str) -> tuple[float, float] | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def put(self, key: str, scores: tuple[float, float]) -> None:
+        self.entries[key] = [scores[0], scores[1]]
+
+    def save(self) -> None:
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"version": CACHE_VERSION, "entries": self.entries}))
+
+
+_WORKER: dict[str, Any] = {}
+
+
+def _attach_worker(specs: dict[str, tuple[str, tuple[int, ...], str]], trainer: str, seed: int) -> None:
+    arrays = {}
+    for key, (name, shape, dtype) in specs.items():
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+        except TypeError:
+            # Python < 3.13 has no `track`. Pool workers share the parent's resource
+            # tracker, so re-registering the name is harmless; the parent unlinks it.
+            block = shared_memory.SharedMemory(name=name)
+        arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        _WORKER.setdefault("blocks", []).append(block)
+    _WORKER.update(arrays=arrays, trainer=trainer, seed=seed)
+
+
+def _worker_scores(task: tuple[str, tuple[int, ...], tuple[int, ...]]) -> list[tuple[float, float]]:
+    mode, columns, folds = task
+    arrays = _WORKER["arrays"]
+    return fold_scores(
+        arrays[f"quantized_{mode}"], arrays["labels"], arrays["fold_ids"], columns, folds,
+        _WORKER["trainer"], _WORKER["seed"],
+    )
+
+
+def _rank(metrics: dict[str, float]) -> tuple[float, float]:
+    """Sort key putting higher mean CV accuracy, then higher mean AUC, first."""
+    return -metrics["cv_accuracy_mean"], -metrics["cv_roc_auc_mean"]
+
+
+class FeatureSearch:
+    """Scores `Candidate`s over shared-memory inputs, consulting a `FoldCache` first."""
+
+    def __init__(
+        self,
+        quantized: dict[str, np.ndarray],
+        labels: np.ndarray,
+        *,
+        trainer: str = "sklearn",
+        seed: int = 42,
+        workers: int | None = None,
+        cache: FoldCache | None = None,
+    ):
+        self.quantized = {mode: np.ascontiguousarray(array, dtype=np.uint8) for mode, array in quantized.items()}
+        self.labels = np.ascontiguousarray(labels, dtype=np.int64)
+        self.trainer = trainer
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache or FoldCache()
+        self.results: dict[Candidate, dict[str, float]] = {}
+
+        self.fold_ids = np.zeros(self.labels.shape[0], dtype=np.int8)
+        splitter = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=seed)
+        for fold, (_, test_idx) in enumerate(splitter.split(self.labels, self.labels)):
+            self.fold_ids[test_idx] = fold
+
+        digest = hashlib.sha256()
+        for part in (self.labels.tobytes(), self.fold_ids.tobytes(), f"{trainer}:{seed}".encode()):
+            digest.update(part)
+        self._base_digest = digest.hexdigest()
+        self._column_digests = {
+            mode: [hashlib.sha256(array[:, col].tobytes()).hexdigest() for col in range(array.shape[1])]
+            for mode, array in self.quantized.items()
+        }
+
+    def _fold_key(self, candidate: Candidate, fold: int) -> str:
+        columns = ",".join(self._column_digests[candidate.mode][col] for col in candidate.columns)
+        return hashlib.sha256(f"{self._base_digest}|{columns}|{fold}".encode()).hexdigest()
+
+    def evaluate(self, candidates: Iterable[Candidate]) -> dict[Candidate, dict[str, float]]:
+        """Score every candidate (cached folds are not recomputed) and return all results so far."""
+        pending: list[tuple[Candidate, tuple[int, ...]]] = []
+        partial: dict[Candidate, dict[int, tuple[float, float]]] = {}
+        for candidate in dict.fromkeys(candidates):
+            if candidate in self.results:
+                continue
+            scores = partial.setdefault(candidate, {})
+            missing = []
+            for fold in range(CV_FOLDS):
+                cached = self.cache.get(self._fold_key(candidate, fold))
+                if cached is None:
+                    missing.append(fold)
+                else:
+                    scores[fold] = cached
+            if missing:
+                pending.append((candidate, tuple(missing)))
+
+        tasks = [(candidate.mode, candidate.columns, folds) for candidate, folds in pending]
+        for (candidate, folds), fold_results in zip(pending, self._run(tasks), strict=True):
+            for fold, scores in zip(folds, fold_results, strict=True):
+                partial[candidate][fold] = scores
+                self.cache.put(self._fold_key(candidate, fold), scores)
+
+        for candidate, scores in partial.items():
+            accuracy = np.array([scores[fold][0] for fold in range(CV_FOLDS)])
+            auc = np.array([scores[fold][1] for fold in range(CV_FOLDS)])
+            self.results[candidate] = {
+                "cv_accuracy_mean": float(accuracy.mean()),
+                "cv_accuracy_std": float(accuracy.std()),
+                "cv_roc_auc_mean": float(auc.mean()),
+                "cv_roc_auc_std": float(auc.std()),
+            }
+        return self.results
+
+    def _run(self, tasks: list[tuple[str, tuple[int, ...], tuple[int, ...]]]) -> list[list[tuple[float, float]]]:
+        if not tasks:
+            return []
+        if self.workers <= 1 or len(tasks) == 1:
+            return [
+                fold_scores(self.quantized[mode], self.labels, self.fold_ids, columns, folds, self.trainer, self.seed)
+                for mode, columns, folds in tasks
+            ]
+
+        arrays = {f"quantized_{mode}": array for mode, array in self.quantized.items()}
+        arrays.update(labels=self.labels, fold_ids=self.fold_ids)
+        blocks: list[shared_memory.SharedMemory] = []
+        try:
+            specs = {}
+            for key, array in arrays.items():
+                block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+                blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                specs[key] = (block.name, array.shape, array.dtype.str)
+            workers = min(self.workers, len(tasks))
+            initargs = (specs, self.trainer, self.seed)
+            with ProcessPoolExecutor(workers, initializer=_attach_worker, initargs=initargs) as pool:
+                return list(pool.map(_worker_scores, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def best(self, top: int = 1, slots: int = FEATURE_VECTOR_BYTES) -> list[tuple[Candidate, dict[str, float]]]:
+        """Highest mean CV accuracy first; ties prefer higher AUC.
+
+        Only subsets that fill all `slots` are ranked; the smaller ones greedy
+        scores on its way there are intermediate steps, not deployable picks.
+        """
+        full = [item for item in self.results.items() if len(item[0].columns) == slots]
+        ranked = sorted(full, key=lambda item: (_rank(item[1]), item[0].mode, item[0].columns))
+        return ranked[:top]
+
+    def greedy(self, modes: Iterable[str], slots: int = FEATURE_VECTOR_BYTES) -> None:
+        num_columns = next(iter(self.quantized.values())).shape[1]
+        for mode in modes:
+            chosen: tuple[int, ...] = ()
+            while len(chosen) < slots:
+                options = {
+                    col: Candidate(mode, tuple(sorted(chosen + (col,))))
+                    for col in range(num_columns)
+                    if col not in chosen
+                }
+                results = self.evaluate(options.values())
+                # Same order as `best()`; remaining ties go to the lowest added column.
+                added = min(options, key=lambda col: (_rank(results[options[col]]), col))
+                chosen = options[added].columns
+
+    def random(self, modes: Iterable[str], samples: int, slots: int = FEATURE_VECTOR_BYTES) -> None:
+        num_columns = next(iter(self.quantized.values())).shape[1]
+        rng = np.random.default_rng(self.seed)
+        subsets = {tuple(sorted(rng.choice(num_columns, size=slots, replace=False).tolist())) for _ in range(samples)}
+        self.evaluate(Candidate(mode, subset) for mode in modes for subset in sorted(subsets))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Search feature subsets and quantization modes for the 8 TOPHAT feature slots.",
+    )
+    parser.add_argument("--data-dir", type=Path, default=Path("../titanic-xgboost/data/raw"))
+    parser.add_argument("--output-dir", type=Path, default=Path("outputs/titanic_feature_search"))
+    parser.add_argument("--strategy", choices=SEARCH_STRATEGIES, default="greedy")
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=DEFAULT_RANDOM_SAMPLES,
+        help=f"Random subsets per quantization mode for --strategy random (default: {DEFAULT_RANDOM_SAMPLES}).",
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=QUANTIZATION_MODES,
+        action="append",
+        help="Quantization mode to search; repeat for several (default: all).",
+    )
+    parser.add_argument("--trainer", choices=TRAINERS, default="sklearn")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--cache", type=Path, default=None, help="JSON fold-score cache reused across runs.")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Leaderboard size in the report.")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    modes = args.quantization or list(QUANTIZATION_MODES)
+
+    train_df = load_train_data(args.data_dir)
+    age_median = float(train_df["Age"].median())
+    fare_median = float(train_df["Fare"].median())
+    candidates = engineer_candidate_features(train_df, age_fill=age_median, fare_fill=fare_median)
+    labels = train_df["Survived"].to_numpy(dtype=np.int64)
+    quantizers = {mode: FeatureQuantizer.fit(candidates, CANDIDATE_NAMES, mode=mode) for mode in modes}
+    quantized = {mode: quantizer.transform(candidates) for mode, quantizer in quantizers.items()}
+
+    cache = FoldCache(args.cache)
+    search = FeatureSearch(quantized, labels, trainer=args.trainer, seed=args.seed, workers=args.workers, cache=cache)
+    baseline_columns = tuple(CANDIDATE_NAMES.index(name) for name in FEATURE_NAMES)
+    baselines = [Candidate(mode, baseline_columns) for mode in modes]
+    search.evaluate(baselines)
+    print(f"[search] {args.strategy} over {len(CANDIDATE_NAMES)} candidates, modes {', '.join(modes)}")
+    if args.strategy == "greedy":
+        search.greedy(modes)
+    else:
+        search.random(modes, args.samples)
+    cache.save()
+
+    (best, best_metrics), *_ = search.best()
+    names = [CANDIDATE_NAMES[col] for col in best.columns]
+    features_u8 = np.zeros((labels.shape[0], FEATURE_VECTOR_BYTES), dtype=np.uint8)
+    features_u8[:, : len(names)] = quantized[best.mode][:, list(best.columns)]
+    if args.trainer == "native":
+        model_bytes = fit_native_tree(features_u8, labels).model_bytes
+    else:
+        model = DecisionTreeClassifier(max_depth=TREE_DEPTH, random_state=args.seed).fit(features_u8, labels)
+        model_bytes = serialize_compact_tree(model)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    model_path = args.output_dir / "titanic_model_22b.bin"
+    scaler_path = args.output_dir / "feature_scaler.json"
+    report_path = args.output_dir / "search_report.json"
+    model_path.write_bytes(model_bytes)
+    FeatureQuantizer.fit(candidates[names], names, mode=best.mode).save(scaler_path)
+
+    def describe(candidate: Candidate, metrics: dict[str, float]) -> dict[str, Any]:
+        features = [CANDIDATE_NAMES[col] for col in candidate.columns]
+        return {"quantization": candidate.mode, "features": features, **metrics}
+
+    report = {
+        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
+        "data_dir": str(args.data_dir),
+        "strategy": args.strategy,
+        "trainer": args.trainer,
+        "seed": args.seed,
+        "candidates": CANDIDATE_NAMES,
+        "evaluated": len(search.results),
+        "fold_cache": {"hits": cache.hits, "misses": cache.misses, "path": str(args.cache) if args.cache else None},
+        "baseline": [describe(baseline, search.results[baseline]) for baseline in baselines],
+        "best": describe(best, best_metrics),
+        "leaderboard": [describe(candidate, metrics) for candidate, metrics in search.best(args.top)],
+        "artifacts": {"model_bytes": str(model_path), "feature_scaler": str(scaler_path), "report": str(report_path)},
+    }
+    report_path.write_text(json.dumps(report, indent=2))
+
+    print(f"[search] evaluated {len(search.results)} subsets (fold cache: {cache.hits} hits, {cache.misses} misses)")
+    print(f"[search] best: {best.mode} {names} cv accuracy {best_metrics['cv_accuracy_mean']:.4f}")
+    print(f"model bytes: {model_path} ({len(model_bytes)} bytes)")
+    print(f"report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
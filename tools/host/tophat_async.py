@@ -0,0 +1,267 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""asyncio flavour of the TOPHAT host client.
+
+`AsyncTophatClient` mirrors `TophatClient` method for method, but every call is
+a coroutine so a round trip to the board never blocks the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Any, Iterable, Protocol, Self
+
+from tools.host.tophat_host import (
+    DEFAULT_BATCH_ROWS,
+    FEATURE_VECTOR_BYTES,
+    MODEL_IMAGE_BYTES,
+    ProtocolError,
+    _check_response,
+    _decode_json_object,
+    _normalize_u8_vector,
+    _read_prediction,
+    _read_predictions,
+)
+
+# Fallback poll period when the port has no selectable file descriptor.
+DEFAULT_POLL_INTERVAL_S = 0.001
+
+
+class AsyncRequestTransport(Protocol):
+    async def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Send one request and return one response."""
+
+
+class AsyncJsonLineSerialTransport:
+    """Line-delimited JSON transport over USB serial (CDC) using non-blocking I/O.
+
+    The port is opened with `timeout=0`/`write_timeout=0`. Reads wait on the
+    event loop (`add_reader`) where the platform supports it and fall back to
+    short `asyncio.sleep` polls otherwise.
+    """
+
+    def __init__(
+        self,
+        port: str,
+        baud: int = 115200,
+        timeout_s: float = 2.0,
+        poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+    ):
+        self._port = port
+        self._baud = baud
+        self._timeout_s = timeout_s
+        self._poll_interval_s = poll_interval_s
+        self._serial: Any | None = None
+        self._rx = bytearray()
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> Self:
+        self._open()
+        return self
+
+    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> None:
+        self.close()
+
+    def _open(self) -> None:
+        if self._serial is not None:
+            return
+        try:
+            import serial  # type: ignore
+        except ImportError as exc:  # pragma: no cover - exercised only when pyserial is missing
+            raise RuntimeError(
+                "pyserial is required for serial transport; install with `pip install pyserial`"
+            ) from exc
+
+        self._serial = serial.Serial(self._port, self._baud, timeout=0, write_timeout=0)
+
+    def close(self) -> None:
+        if self._serial is not None:
+            self._serial.close()
+            self._serial = None
+        self._rx.clear()
+
+    async def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        # One request in flight per port; concurrent callers queue on the lock.
+        async with self._lock:
+            return await self._request_locked(payload)
+
+    async def _request_locked(self, payload: dict[str, Any]) -> dict[str, Any]:
+        self._open()
+        assert self._serial is not None
+
+        if hasattr(self._serial, "reset_input_buffer"):
+            self._serial.reset_input_buffer()
+        self._rx.clear()
+
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        await self._write_all(line.encode("utf-8"))
+
+        deadline = time.monotonic() + self._timeout_s
+        last_dict_without_ok: dict[str, Any] | None = None
+        last_unparseable_line: bytes | None = None
+
+        while True:
+            response_raw = await self._read_line(deadline)
+            if response_raw is None:
+                break
+
+            response = _decode_json_object(response_raw)
+            if response is None:
+                last_unparseable_line = response_raw
+                continue
+
+            ok = response.get("ok")
+            if isinstance(ok, bool):
+                return response
+
+            last_dict_without_ok = response
+
+        if last_dict_without_ok is not None:
+            raise ProtocolError(f"Missing boolean `ok` in response: {last_dict_without_ok!r}")
+        if last_unparseable_line is not None:
+            raise ProtocolError(f"Invalid JSON response: {last_unparseable_line!r}")
+        raise TimeoutError("Timeout waiting for board response")
+
+    async def _write_all(self, data: bytes) -> None:
+        assert self._serial is not None
+        view = memoryview(data)
+        deadline = time.monotonic() + self._timeout_s
+        while view:
+            written = self._serial.write(view)
+            view = view[written or 0 :]
+            if view:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("Timeout writing request to board")
+                await asyncio.sleep(self._poll_interval_s)
+        # No `flush()`: pyserial's flush is a blocking tcdrain that would stall the
+        # event loop until the UART drains. The kernel sends the queued bytes anyway.
+
+    async def _read_line(self, deadline: float) -> bytes | None:
+        assert self._serial is not None
+        while True:
+            newline = self._rx.find(b"\n")
+            if newline != -1:
+                line = bytes(self._rx[: newline + 1])
+                del self._rx[: newline + 1]
+                return line
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            chunk = self._serial.read(max(1, int(getattr(self._serial, "in_waiting", 0) or 0)))
+            if chunk:
+                self._rx.extend(chunk)
+                continue
+            await self._wait_readable(remaining)
+
+    async def _wait_readable(self, timeout_s: float) -> None:
+        assert self._serial is not None
+        loop = asyncio.get_running_loop()
+        fileno = _fileno_or_none(self._serial)
+        if fileno is not None:
+            ready = loop.create_future()
+            try:
+                loop.add_reader(fileno, _set_future_once, ready)
+            except (NotImplementedError, ValueError):
+                fileno = None
+            else:
+                try:
+                    await asyncio.wait_for(ready, timeout_s)
+                except TimeoutError:
+                    pass
+                finally:
+                    loop.remove_reader(fileno)
+                return
+        await asyncio.sleep(min(self._poll_interval_s, timeout_s))
+
+
+def _fileno_or_none(port: Any) -> int | None:
+    fileno = getattr(port, "fileno", None)
+    if fileno is None:
+        return None
+    try:
+        return int(fileno())
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _set_future_once(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AsyncTophatClient:
+    def __init__(self, transport: AsyncRequestTransport):
+        self._transport = transport
+        self._loaded_model: bytes | None = None
+
+    @property
+    def loaded_model(self) -> bytes | None:
+        return self._loaded_model
+
+    async def ping(self) -> dict[str, Any]:
+        return await self._request("ping")
+
+    async def clear(self) -> None:
+        self._loaded_model = None
+        await self._request("clear")
+
+    async def load_model(self, model_bytes: bytes | Iterable[int], force: bool = False) -> bool:
+        """See `TophatClient.load_model`."""
+        model = _normalize_u8_vector(model_bytes, MODEL_IMAGE_BYTES, label="model")
+        image = bytes(model)
+        if not force and image == self._loaded_model:
+            return True
+
+        self._loaded_model = None
+        if force:
+            response = await self._request("load_model", model=model, force=True)
+        else:
+            response = await self._request("load_model", model=model)
+        self._loaded_model = image
+        return response.get("cached") is True
+
+    async def load_features(self, feature_values: Iterable[int]) -> None:
+        features = _normalize_u8_vector(feature_values, FEATURE_VECTOR_BYTES, label="features")
+        await self._request("load_features", features=features)
+
+    async def run(self) -> int:
+        response = await self._request("run")
+        return _read_prediction(response)
+
+    async def predict(self, feature_values: Iterable[int]) -> int:
+        features = _normalize_u8_vector(feature_values, FEATURE_VECTOR_BYTES, label="features")
+        response = await self._request("predict", features=features)
+        return _read_prediction(response)
+
+    async def predict_batch(
+        self, rows: Iterable[bytes | Iterable[int]], batch_size: int = DEFAULT_BATCH_ROWS
+    ) -> list[int]:
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive (got {batch_size})")
+
+        normalized = [
+            _normalize_u8_vector(row, FEATURE_VECTOR_BYTES, label=f"rows[{idx}]")
+            for idx, row in enumerate(rows)
+        ]
+
+        predictions: list[int] = []
+        for start in range(0, len(normalized), batch_size):
+            chunk = normalized[start : start + batch_size]
+            response = await self._request("predict_batch", rows=chunk)
+            predictions.extend(_read_predictions(response, len(chunk)))
+        return predictions
+
+    async def _request(self, cmd: str, **fields: Any) -> dict[str, Any]:
+        payload = {"cmd": cmd}
+        payload.update(fields)
+        try:
+            response = await self._transport.request(payload)
+        except (TimeoutError, ProtocolError, OSError):
+            self._loaded_model = None
+            raise
+        return _check_response(response)
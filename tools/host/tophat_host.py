@@ -7,11 +7,50 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
+import sys
 import time
-from typing import Any, Iterable, Protocol
-
-MODEL_IMAGE_BYTES = 22
-FEATURE_VECTOR_BYTES = 8
+from typing import Any, Iterable, Protocol, Self, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.host.tophat_metrics import TophatMetrics, start_timer  # noqa: E402
+from tools.model.tophat_image import FEATURE_VECTOR_BYTES, MODEL_IMAGE_BYTES  # noqa: E402
+
+# Keep batches well under the bridge's MAX_BATCH_ROWS and USB CDC line buffers.
+DEFAULT_BATCH_ROWS = 64
+# Requests kept in flight by `JsonLineSerialTransport.request_many`.
+DEFAULT_PIPELINE_WINDOW = 4
+# Resident rows scored per run_rows request; keeps each reply well inside the
+# default 2 s serial timeout.
+DEFAULT_RUN_ROWS = 256
+
+# Binary framing (see docs/host-serial-rpc.md). Request frames are
+# MAGIC | opcode | u16le length | payload | u16le crc16, with every byte after
+# MAGIC escaped so 0x03 (Ctrl-C) never reaches the MicroPython USB console.
+# Response frames use the same layout with a status byte in place of opcode
+# and are not escaped.
+FRAME_MAGIC = 0xA5
+FRAME_ESCAPE = 0x7D
+FRAME_ESCAPE_XOR = 0x20
+FRAME_ESCAPED_BYTES = (0x03, FRAME_ESCAPE)
+FRAME_STATUS_OK = 0x00
+FRAME_STATUS_ERROR = 0x01
+FRAME_OPCODES = {
+    "ping": 0x01,
+    "clear": 0x02,
+    "load_model": 0x03,
+    "load_features": 0x04,
+    "run": 0x05,
+    "predict": 0x06,
+    "predict_batch": 0x07,
+    "upload_rows": 0x08,
+    "run_rows": 0x09,
+    "stats": 0x0A,
+}
+# run_rows count meaning "through the last resident row".
+FRAME_COUNT_ALL = 0xFFFF
 
 
 class ProtocolError(RuntimeError):
@@ -23,16 +62,31 @@ class RequestTransport(Protocol):
         """Send one request and return one response."""
 
 
-class JsonLineSerialTransport:
-    """Line-delimited JSON transport over USB serial (CDC)."""
+class PipelinedRequestTransport(RequestTransport, Protocol):
+    def request_many(self, payloads: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Send requests with several in flight and return responses in request order."""
+
 
-    def __init__(self, port: str, baud: int = 115200, timeout_s: float = 2.0):
+class _SerialPortTransport:
+    """Shared pyserial open/close handling for the USB serial (CDC) transports.
+
+    Pass `metrics` to record per-stage request timings (see tophat_metrics.py).
+    """
+
+    def __init__(
+        self,
+        port: str,
+        baud: int = 115200,
+        timeout_s: float = 2.0,
+        metrics: TophatMetrics | None = None,
+    ):
         self._port = port
         self._baud = baud
         self._timeout_s = timeout_s
+        self._metrics = metrics
         self._serial: Any | None = None
 
-    def __enter__(self) -> "JsonLineSerialTransport":
+    def __enter__(self) -> Self:
         self._open()
         return self
 
@@ -56,6 +110,24 @@ class JsonLineSerialTransport:
             self._serial.close()
             self._serial = None
 
+
+class JsonLineSerialTransport(_SerialPortTransport):
+    """Line-delimited JSON transport over USB serial (CDC)."""
+
+    def __init__(
+        self,
+        port: str,
+        baud: int = 115200,
+        timeout_s: float = 2.0,
+        pipeline_window: int = DEFAULT_PIPELINE_WINDOW,
+        metrics: TophatMetrics | None = None,
+    ):
+        super().__init__(port, baud=baud, timeout_s=timeout_s, metrics=metrics)
+        if pipeline_window <= 0:
+            raise ValueError(f"pipeline_window must be positive (got {pipeline_window})")
+        self._pipeline_window = pipeline_window
+        self._next_id = 1
+
     def request(self, payload: dict[str, Any]) -> dict[str, Any]:
         self._open()
         assert self._serial is not None
@@ -63,9 +135,12 @@ class JsonLineSerialTransport:
         if hasattr(self._serial, "reset_input_buffer"):
             self._serial.reset_input_buffer()
 
-        line = json.dumps(payload, separators=(",", ":")) + "\n"
-        self._serial.write(line.encode("utf-8"))
+        timer = start_timer(self._metrics, payload.get("cmd"))
+        line = (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+        timer.mark("encode")
+        self._serial.write(line)
         self._serial.flush()
+        timer.mark("write")
 
         deadline = time.monotonic() + self._timeout_s
         last_dict_without_ok: dict[str, Any] | None = None
@@ -73,16 +148,19 @@ class JsonLineSerialTransport:
 
         while time.monotonic() < deadline:
             response_raw = self._serial.readline()
+            timer.mark("read")
             if not response_raw:
                 continue
 
             response = _decode_json_object(response_raw)
+            timer.mark("decode")
             if response is None:
                 last_unparseable_line = response_raw
                 continue
 
             ok = response.get("ok")
             if isinstance(ok, bool):
+                timer.finish()
                 return response
 
             last_dict_without_ok = response
@@ -93,6 +171,68 @@ class JsonLineSerialTransport:
             raise ProtocolError(f"Invalid JSON response: {last_unparseable_line!r}")
         raise TimeoutError("Timeout waiting for board response")
 
+    def request_many(self, payloads: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Keep up to `pipeline_window` tagged requests in flight.
+
+        Each request carries an `id` that the bridge echoes back, so responses
+        are matched to their requests rather than assumed to arrive in order.
+        """
+        self._open()
+        assert self._serial is not None
+
+        if hasattr(self._serial, "reset_input_buffer"):
+            self._serial.reset_input_buffer()
+
+        responses: list[dict[str, Any] | None] = [None] * len(payloads)
+        outstanding: dict[int, int] = {}
+        # Stages overlap across in-flight requests, so only encode, write and
+        # total (write to matching response) are recorded per request.
+        timers: dict[int, Any] = {}
+        next_to_send = 0
+        remaining = len(payloads)
+        deadline = time.monotonic() + self._timeout_s
+
+        while remaining:
+            while next_to_send < len(payloads) and len(outstanding) < self._pipeline_window:
+                request_id = self._next_id
+                self._next_id += 1
+                tagged = dict(payloads[next_to_send])
+                tagged["id"] = request_id
+                timer = timers[request_id] = start_timer(self._metrics, tagged.get("cmd"))
+                line = (json.dumps(tagged, separators=(",", ":")) + "\n").encode("utf-8")
+                timer.mark("encode")
+                self._serial.write(line)
+                timer.mark("write")
+                outstanding[request_id] = next_to_send
+                next_to_send += 1
+            self._serial.flush()
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timeout waiting for board response ({len(outstanding)} in flight)")
+
+            response_raw = self._serial.readline()
+            if not response_raw:
+                continue
+            response = _decode_json_object(response_raw)
+            if response is None or not isinstance(response.get("ok"), bool):
+                # Echoed requests and log chatter carry no `ok`.
+                continue
+
+            request_id = response.pop("id", None)
+            if request_id is None:
+                raise ProtocolError(f"Missing `id` in pipelined response: {response!r}")
+            slot = outstanding.pop(request_id, None)
+            if slot is None:
+                # Stale response from an earlier, abandoned request.
+                continue
+
+            timers.pop(request_id).finish()
+            responses[slot] = response
+            remaining -= 1
+            deadline = time.monotonic() + self._timeout_s
+
+        return [response for response in responses if response is not None]
+
 
 def _decode_json_object(raw_line: bytes) -> dict[str, Any] | None:
     # Some firmware stacks may prepend logging/ANSI bytes before a JSON object.
@@ -119,19 +259,192 @@ def _decode_json_object(raw_line: bytes) -> dict[str, Any] | None:
     return None
 
 
+class BinaryFrameSerialTransport(_SerialPortTransport):
+    """Length-prefixed, CRC-checked binary transport over USB serial (CDC).
+
+    Accepts the same request dicts as `JsonLineSerialTransport` and returns the
+    same response dicts, so `TophatClient` works unchanged on either transport.
+    """
+
+    def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        self._open()
+        assert self._serial is not None
+
+        cmd = payload.get("cmd")
+        timer = start_timer(self._metrics, cmd)
+        opcode, body = _encode_frame_request(payload)
+        frame = _build_request_frame(opcode, body)
+        timer.mark("encode")
+
+        if hasattr(self._serial, "reset_input_buffer"):
+            self._serial.reset_input_buffer()
+
+        self._serial.write(frame)
+        self._serial.flush()
+        timer.mark("write")
+
+        deadline = time.monotonic() + self._timeout_s
+        status, response_body = self._read_response_frame(deadline)
+        timer.mark("read")
+        response = _decode_frame_response(str(cmd), status, response_body)
+        timer.mark("decode")
+        timer.finish()
+        return response
+
+    def _read_response_frame(self, deadline: float) -> tuple[int, bytes]:
+        # Skip echo/log bytes until the frame magic shows up.
+        while True:
+            magic = self._read_exact(1, deadline)
+            if magic[0] == FRAME_MAGIC:
+                break
+
+        header = self._read_exact(3, deadline)
+        length = header[1] | (header[2] << 8)
+        body = self._read_exact(length, deadline)
+        crc_raw = self._read_exact(2, deadline)
+
+        expected_crc = crc16_ccitt(header + body)
+        received_crc = crc_raw[0] | (crc_raw[1] << 8)
+        if received_crc != expected_crc:
+            raise ProtocolError(
+                f"Response frame CRC mismatch (got 0x{received_crc:04x}, expected 0x{expected_crc:04x})"
+            )
+        return header[0], body
+
+    def _read_exact(self, size: int, deadline: float) -> bytes:
+        assert self._serial is not None
+        out = bytearray()
+        while len(out) < size:
+            if time.monotonic() >= deadline:
+                raise TimeoutError("Timeout waiting for board response frame")
+            chunk = self._serial.read(size - len(out))
+            if chunk:
+                out.extend(chunk)
+        return bytes(out)
+
+
+def crc16_ccitt(data: bytes | bytearray, crc: int = 0xFFFF) -> int:
+    """CRC-16/CCITT-FALSE, shared with the RP2040 bridge."""
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+    return crc
+
+
+def _build_request_frame(opcode: int, body: bytes) -> bytes:
+    if len(body) > 0xFFFF:
+        raise ValueError(f"Frame payload too large ({len(body)} bytes)")
+    unescaped = bytes([opcode, len(body) & 0xFF, len(body) >> 8]) + body
+    crc = crc16_ccitt(unescaped)
+    unescaped += bytes([crc & 0xFF, crc >> 8])
+
+    frame = bytearray([FRAME_MAGIC])
+    for byte in unescaped:
+        if byte in FRAME_ESCAPED_BYTES:
+            frame.extend((FRAME_ESCAPE, byte ^ FRAME_ESCAPE_XOR))
+        else:
+            frame.append(byte)
+    return bytes(frame)
+
+
+def _encode_frame_request(payload: dict[str, Any]) -> tuple[int, bytes]:
+    cmd = payload.get("cmd")
+    opcode = FRAME_OPCODES.get(cmd) if isinstance(cmd, str) else None
+    if opcode is None:
+        raise ValueError(f"Command not supported by binary framing: {cmd!r}")
+
+    if cmd == "load_model":
+        flags = b"\x01" if payload.get("force") else b""
+        return opcode, bytes(payload["model"]) + flags
+    if cmd in ("load_features", "predict"):
+        return opcode, bytes(payload["features"])
+    if cmd == "predict_batch":
+        return opcode, b"".join(bytes(row) for row in payload["rows"])
+    if cmd == "upload_rows":
+        offset = payload.get("offset", 0).to_bytes(2, "little")
+        return opcode, offset + b"".join(bytes(row) for row in payload["rows"])
+    if cmd == "stats":
+        return opcode, b"\x01" if payload.get("reset") else b""
+    if cmd == "run_rows":
+        count = payload.get("count")
+        start = payload.get("start", 0).to_bytes(2, "little")
+        return opcode, start + (FRAME_COUNT_ALL if count is None else count).to_bytes(2, "little")
+    return opcode, b""
+
+
+def _decode_frame_response(cmd: str, status: int, body: bytes) -> dict[str, Any]:
+    if status == FRAME_STATUS_ERROR:
+        return {"ok": False, "error": body.decode("utf-8", errors="replace")}
+    if status != FRAME_STATUS_OK:
+        raise ProtocolError(f"Unknown response frame status 0x{status:02x}")
+
+    if cmd in ("ping", "stats"):
+        decoded = _decode_json_object(body)
+        if decoded is None:
+            raise ProtocolError(f"Invalid {cmd} frame body: {body!r}")
+        decoded["ok"] = True
+        return decoded
+    if cmd in ("run", "predict"):
+        if len(body) != 1:
+            raise ProtocolError(f"Expected 1 prediction byte, got {len(body)}")
+        return {"ok": True, "prediction": body[0]}
+    if cmd == "predict_batch":
+        return {"ok": True, "predictions": list(body)}
+    if cmd == "upload_rows":
+        if len(body) != 2:
+            raise ProtocolError(f"Expected 2-byte row count, got {len(body)} bytes")
+        return {"ok": True, "rows": body[0] | (body[1] << 8)}
+    if cmd == "run_rows":
+        return {"ok": True, "packed": body.hex()}
+    if cmd == "load_model" and body:
+        return {"ok": True, "cached": bool(body[0])}
+    return {"ok": True}
+
+
 class TophatClient:
-    def __init__(self, transport: RequestTransport):
+    def __init__(self, transport: RequestTransport, metrics: TophatMetrics | None = None):
         self._transport = transport
+        # Records one `call` sample per request or pipelined batch.
+        self._metrics = metrics
+        # Image this client last loaded successfully; None once it may be stale.
+        self._loaded_model: bytes | None = None
+        # Rows last uploaded with `upload_rows`; None when unknown.
+        self._resident_rows: int | None = None
+
+    @property
+    def loaded_model(self) -> bytes | None:
+        return self._loaded_model
 
     def ping(self) -> dict[str, Any]:
         return self._request("ping")
 
     def clear(self) -> None:
+        self._loaded_model = None
         self._request("clear")
 
-    def load_model(self, model_bytes: bytes | Iterable[int]) -> None:
+    def load_model(self, model_bytes: bytes | Iterable[int], force: bool = False) -> bool:
+        """Load a model image; return True if the transfer was skipped because it was already loaded.
+
+        The client skips the request when it last loaded the same image itself,
+        and the bridge does the same check against what the ASIC holds. Pass
+        `force=True` to always clock the bytes in.
+        """
         model = _normalize_u8_vector(model_bytes, MODEL_IMAGE_BYTES, label="model")
-        self._request("load_model", model=model)
+        image = bytes(model)
+        if not force and image == self._loaded_model:
+            return True
+
+        self._loaded_model = None
+        if force:
+            response = self._request("load_model", model=model, force=True)
+        else:
+            response = self._request("load_model", model=model)
+        self._loaded_model = image
+        return response.get("cached") is True
 
     def load_features(self, feature_values: Iterable[int]) -> None:
         features = _normalize_u8_vector(feature_values, FEATURE_VECTOR_BYTES, label="features")
@@ -146,18 +459,139 @@ class TophatClient:
         response = self._request("predict", features=features)
         return _read_prediction(response)
 
+    def predict_batch(
+        self, rows: Iterable[bytes | Iterable[int]], batch_size: int = DEFAULT_BATCH_ROWS
+    ) -> list[int]:
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive (got {batch_size})")
+
+        normalized = [
+            _normalize_u8_vector(row, FEATURE_VECTOR_BYTES, label=f"rows[{idx}]")
+            for idx, row in enumerate(rows)
+        ]
+
+        chunks = [normalized[start : start + batch_size] for start in range(0, len(normalized), batch_size)]
+        responses = self._request_many([{"cmd": "predict_batch", "rows": chunk} for chunk in chunks])
+
+        predictions: list[int] = []
+        for chunk, response in zip(chunks, responses, strict=True):
+            predictions.extend(_read_predictions(response, len(chunk)))
+        return predictions
+
+    def upload_rows(
+        self,
+        rows: Iterable[bytes | Iterable[int]],
+        offset: int = 0,
+        batch_size: int = DEFAULT_BATCH_ROWS,
+    ) -> int:
+        """Store feature rows in bridge RAM from row `offset`; return the resident row count.
+
+        Resident rows past the upload are dropped, so `offset=0` starts a new
+        dataset. Score them later with `run_rows` without resending them.
+        """
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive (got {batch_size})")
+
+        normalized = [
+            _normalize_u8_vector(row, FEATURE_VECTOR_BYTES, label=f"rows[{idx}]")
+            for idx, row in enumerate(rows)
+        ]
+        payloads = [
+            {"cmd": "upload_rows", "offset": offset + start, "rows": normalized[start : start + batch_size]}
+            for start in range(0, len(normalized), batch_size)
+        ] or [{"cmd": "upload_rows", "offset": offset, "rows": []}]
+
+        responses = self._request_many(payloads)
+        resident = responses[-1].get("rows")
+        if not isinstance(resident, int) or isinstance(resident, bool):
+            raise ProtocolError(f"Missing integer `rows` in response: {responses[-1]!r}")
+        self._resident_rows = resident
+        return resident
+
+    def run_rows(self, start: int = 0, count: int | None = None, chunk_rows: int = DEFAULT_RUN_ROWS) -> list[int]:
+        """Predict rows already resident on the bridge; defaults to every row from `start`."""
+        if chunk_rows <= 0:
+            raise ValueError(f"chunk_rows must be positive (got {chunk_rows})")
+        if count is None:
+            resident = self._resident_rows
+            if resident is None:
+                resident = int(self.ping().get("resident_rows", 0))
+            count = resident - start
+        if start < 0 or count < 0:
+            raise ValueError(f"start and count must be non-negative (got {start}, {count})")
+
+        payloads = [
+            {"cmd": "run_rows", "start": start + offset, "count": min(chunk_rows, count - offset)}
+            for offset in range(0, count, chunk_rows)
+        ]
+        predictions: list[int] = []
+        for payload, response in zip(payloads, self._request_many(payloads), strict=True):
+            predictions.extend(_read_packed(response, payload["count"]))
+        return predictions
+
+    def stats(self, reset: bool = False) -> dict[str, Any]:
+        """Bridge-side counters since boot or the last `reset=True` call."""
+        if reset:
+            response = self._request("stats", reset=True)
+        else:
+            response = self._request("stats")
+        response.pop("ok", None)
+        return response
+
+    def bench(self, num_bytes: int | None = None) -> dict[str, Any]:
+        """Run the bridge's pin-transfer microbenchmark (JSON framing only).
+
+        Clobbers any loaded feature vector on the board.
+        """
+        if num_bytes is None:
+            response = self._request("bench")
+        else:
+            response = self._request("bench", bytes=num_bytes)
+        response.pop("ok", None)
+        return response
+
     def _request(self, cmd: str, **fields: Any) -> dict[str, Any]:
         payload = {"cmd": cmd}
         payload.update(fields)
-        response = self._transport.request(payload)
-
-        ok = response.get("ok")
-        if not isinstance(ok, bool):
-            raise ProtocolError(f"Missing boolean `ok` in response: {response!r}")
-        if not ok:
-            error = response.get("error", "unknown error")
-            raise RuntimeError(f"Board error: {error}")
-        return response
+        timer = start_timer(self._metrics, cmd)
+        try:
+            response = self._transport.request(payload)
+        except (TimeoutError, ProtocolError, OSError):
+            # Lost sync with the board; it may have been reset since the last load.
+            self._forget_board_state()
+            raise
+        checked = _check_response(response)
+        timer.finish("call")
+        return checked
+
+    def _request_many(self, payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        timer = start_timer(self._metrics, payloads[0]["cmd"] if payloads else None)
+        try:
+            # Overlap host and board work when the transport can pipeline.
+            if len(payloads) > 1 and hasattr(self._transport, "request_many"):
+                responses = self._transport.request_many(payloads)
+            else:
+                responses = [self._transport.request(payload) for payload in payloads]
+        except (TimeoutError, ProtocolError, OSError):
+            self._forget_board_state()
+            raise
+        checked = [_check_response(response) for response in responses]
+        timer.finish("call")
+        return checked
+
+    def _forget_board_state(self) -> None:
+        self._loaded_model = None
+        self._resident_rows = None
+
+
+def _check_response(response: dict[str, Any]) -> dict[str, Any]:
+    ok = response.get("ok")
+    if not isinstance(ok, bool):
+        raise ProtocolError(f"Missing boolean `ok` in response: {response!r}")
+    if not ok:
+        error = response.get("error", "unknown error")
+        raise RuntimeError(f"Board error: {error}")
+    return response
 
 
 def _normalize_u8_vector(
@@ -184,6 +618,31 @@ def _read_prediction(response: dict[str, Any]) -> int:
     return prediction
 
 
+def _read_predictions(response: dict[str, Any], expected_len: int) -> list[int]:
+    predictions = response.get("predictions")
+    if not isinstance(predictions, list) or len(predictions) != expected_len:
+        raise ProtocolError(
+            f"Missing or invalid `predictions` list (expected {expected_len}) in response: {response!r}"
+        )
+    for prediction in predictions:
+        if not isinstance(prediction, int) or not (0 <= prediction <= 0xFF):
+            raise ProtocolError(f"Invalid prediction byte in `predictions`: {response!r}")
+    return predictions
+
+
+def _read_packed(response: dict[str, Any], expected_len: int) -> list[int]:
+    packed = response.get("packed")
+    if not isinstance(packed, str):
+        raise ProtocolError(f"Missing hex string `packed` in response: {response!r}")
+    try:
+        predictions = bytes.fromhex(packed)
+    except ValueError as exc:
+        raise ProtocolError(f"Invalid `packed` hex in response: {packed!r}") from exc
+    if len(predictions) != expected_len:
+        raise ProtocolError(f"Expected {expected_len} packed predictions, got {len(predictions)}")
+    return list(predictions)
+
+
 def _parse_feature_csv(csv_values: str) -> list[int]:
     parts = [p.strip() for p in csv_values.split(",") if p.strip() != ""]
     return _normalize_u8_vector([int(p, 0) for p in parts], FEATURE_VECTOR_BYTES, label="features")
@@ -199,6 +658,13 @@ def _load_feature_file(path: Path) -> list[int]:
     raise ValueError("Feature JSON must be either a list[8] or an object with feature_00..feature_07 keys")
 
 
+def _load_rows_file(path: Path) -> list[list[int]]:
+    data = json.loads(path.read_text())
+    if not isinstance(data, list):
+        raise ValueError("Rows JSON must be a list of list[8] feature vectors")
+    return [_normalize_u8_vector(row, FEATURE_VECTOR_BYTES, label=f"rows[{idx}]") for idx, row in enumerate(data)]
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Host utility for TOPHAT USB-serial RPC bridge")
 
@@ -211,6 +677,11 @@ def _build_parser() -> argparse.ArgumentParser:
     load_model = subparsers.add_parser("load-model", help="Load 22-byte model image")
     _add_transport_args(load_model)
     load_model.add_argument("--model", required=True, help="Path to 22-byte model binary")
+    load_model.add_argument(
+        "--force",
+        action="store_true",
+        help="Transfer the image even if the bridge reports it is already loaded",
+    )
 
     load_features = subparsers.add_parser("load-features", help="Load 8-byte feature vector")
     _add_transport_args(load_features)
@@ -222,11 +693,45 @@ def _build_parser() -> argparse.ArgumentParser:
     predict = subparsers.add_parser("predict", help="Load features then run predict")
     _add_transport_args(predict)
     _add_feature_args(predict)
+
+    predict_batch = subparsers.add_parser("predict-batch", help="Run predict on many feature vectors per request")
+    _add_transport_args(predict_batch)
+    predict_batch.add_argument("--rows-file", required=True, help="JSON file containing list of list[8] vectors")
+    predict_batch.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_ROWS,
+        help=f"Rows per predict_batch request (default: {DEFAULT_BATCH_ROWS})",
+    )
+
+    upload_rows = subparsers.add_parser("upload-rows", help="Store feature vectors in bridge RAM for run-rows")
+    _add_transport_args(upload_rows)
+    upload_rows.add_argument("--rows-file", required=True, help="JSON file containing list of list[8] vectors")
+    upload_rows.add_argument("--offset", type=int, default=0, help="First resident row to write (default: 0)")
+
+    run_rows = subparsers.add_parser("run-rows", help="Predict feature vectors already resident on the bridge")
+    _add_transport_args(run_rows)
+    run_rows.add_argument("--start", type=int, default=0, help="First resident row (default: 0)")
+    run_rows.add_argument("--count", type=int, default=None, help="Rows to run (default: through the last row)")
+
+    stats = subparsers.add_parser("stats", help="Show bridge-side request, cycle and timing counters")
+    _add_transport_args(stats)
+    stats.add_argument("--reset", action="store_true", help="Zero the counters after reading them")
+
+    bench = subparsers.add_parser("bench", help="Measure bridge pin-transfer cost in microseconds per byte")
+    _add_transport_args(bench)
+    bench.add_argument("--bytes", type=int, default=None, help="Feature bytes per path (default: bridge default)")
     return parser
 
 
 def _add_transport_args(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--port", required=True, help="Serial port, e.g. /dev/ttyACM0")
+    parser.add_argument(
+        "--framing",
+        choices=("json", "binary"),
+        default="json",
+        help="Wire framing: JSON lines (default) or compact binary frames",
+    )
 
 
 def _add_feature_args(parser: argparse.ArgumentParser) -> None:
@@ -242,7 +747,8 @@ def main() -> int:
     parser = _build_parser()
     args = parser.parse_args()
 
-    with JsonLineSerialTransport(args.port) as transport:
+    transport_cls = BinaryFrameSerialTransport if args.framing == "binary" else JsonLineSerialTransport
+    with transport_cls(args.port) as transport:
         client = TophatClient(transport)
 
         if args.subcmd == "ping":
@@ -257,8 +763,8 @@ def main() -> int:
 
         if args.subcmd == "load-model":
             model = Path(args.model).read_bytes()
-            client.load_model(model)
-            print(json.dumps({"ok": True, "cmd": "load-model", "bytes": len(model)}))
+            cached = client.load_model(model, force=args.force)
+            print(json.dumps({"ok": True, "cmd": "load-model", "bytes": len(model), "cached": cached}))
             return 0
 
         if args.subcmd in ("load-features", "predict"):
@@ -276,6 +782,32 @@ def main() -> int:
             print(json.dumps({"ok": True, "cmd": "predict", "prediction": prediction}))
             return 0
 
+        if args.subcmd == "predict-batch":
+            rows = _load_rows_file(Path(args.rows_file))
+            predictions = client.predict_batch(rows, batch_size=args.batch_size)
+            print(json.dumps({"ok": True, "cmd": "predict-batch", "predictions": predictions}))
+            return 0
+
+        if args.subcmd == "upload-rows":
+            rows = _load_rows_file(Path(args.rows_file))
+            resident = client.upload_rows(rows, offset=args.offset)
+            print(json.dumps({"ok": True, "cmd": "upload-rows", "rows": resident}))
+            return 0
+
+        if args.subcmd == "run-rows":
+            predictions = client.run_rows(start=args.start, count=args.count)
+            print(json.dumps({"ok": True, "cmd": "run-rows", "predictions": predictions}))
+            return 0
+
+        if args.subcmd == "stats":
+            print(json.dumps({"ok": True, "cmd": "stats", **client.stats(reset=args.reset)}, sort_keys=True))
+            return 0
+
+        if args.subcmd == "bench":
+            result = client.bench(args.bytes)
+            print(json.dumps({"ok": True, "cmd": "bench", **result}, sort_keys=True))
+            return 0
+
         if args.subcmd == "run":
             prediction = client.run()
             print(json.dumps({"ok": True, "cmd": "run", "prediction": prediction}))
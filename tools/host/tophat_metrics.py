@@ -0,0 +1,183 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Per-command, per-stage latency histograms for the TOPHAT host stack.
+
+Transports split each request into stages (`encode`, `write`, `read`,
+`decode`, `total`); `TophatClient` adds a `call` stage covering the whole
+client method. Each (command, stage) pair feeds a `LatencyHistogram`.
+
+`LatencyHistogram` uses HDR-style log-linear buckets: each power-of-two range
+is split into `2**sub_bucket_bits` linear buckets, so memory is fixed and the
+relative error stays under `2**-sub_bucket_bits` at any magnitude.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any
+
+STAGES = ("encode", "write", "read", "decode", "total", "call")
+DEFAULT_SUB_BUCKET_BITS = 5
+# Longer samples are clamped; a minute is far past any transport timeout.
+DEFAULT_MAX_VALUE_US = 60_000_000
+SNAPSHOT_PERCENTILES = (50.0, 90.0, 99.0)
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear histogram of durations in whole microseconds."""
+
+    __slots__ = ("_sub_bits", "_sub_count", "_max_value", "_counts", "count", "min_us", "max_us", "sum_us")
+
+    def __init__(
+        self,
+        sub_bucket_bits: int = DEFAULT_SUB_BUCKET_BITS,
+        max_value_us: int = DEFAULT_MAX_VALUE_US,
+    ):
+        if sub_bucket_bits < 1:
+            raise ValueError(f"sub_bucket_bits must be at least 1 (got {sub_bucket_bits})")
+        self._sub_bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._max_value = max_value_us
+        self._counts = [0] * (self._bucket_index(max_value_us) + 1)
+        self.count = 0
+        self.min_us = 0
+        self.max_us = 0
+        self.sum_us = 0
+
+    def _bucket_index(self, value: int) -> int:
+        # Values below 2 * sub_count land in exact buckets; above that each
+        # doubling keeps sub_bucket_bits + 1 significant bits.
+        shift = max(0, value.bit_length() - self._sub_bits - 1)
+        return (shift * self._sub_count) + (value >> shift)
+
+    def _bucket_upper(self, index: int) -> int:
+        if index < 2 * self._sub_count:
+            return index
+        shift = (index // self._sub_count) - 1
+        mantissa = index - (shift * self._sub_count)
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value_us: int) -> None:
+        value = min(max(int(value_us), 0), self._max_value)
+        self._counts[self._bucket_index(value)] += 1
+        if self.count == 0 or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+        self.count += 1
+        self.sum_us += value
+
+    def record_seconds(self, seconds: float) -> None:
+        self.record(round(seconds * 1_000_000))
+
+    def percentile(self, percent: float) -> int:
+        """Upper bound of the bucket holding the `percent`-th sample, capped at the max seen."""
+        if not 0.0 <= percent <= 100.0:
+            raise ValueError(f"percent must be in 0..100 (got {percent})")
+        if self.count == 0:
+            return 0
+
+        rank = max(1, math.ceil(self.count * percent / 100.0))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self._bucket_upper(index), self.max_us)
+        return self.max_us
+
+    def snapshot(self) -> dict[str, Any]:
+        summary: dict[str, Any] = {
+            "count": self.count,
+            "min_us": self.min_us,
+            "mean_us": (self.sum_us / self.count) if self.count else 0.0,
+            "max_us": self.max_us,
+        }
+        for percent in SNAPSHOT_PERCENTILES:
+            summary[f"p{percent:g}_us"] = self.percentile(percent)
+        return summary
+
+
+class TophatMetrics:
+    """Thread-safe collection of `LatencyHistogram`s keyed by (command, stage)."""
+
+    def __init__(self, sub_bucket_bits: int = DEFAULT_SUB_BUCKET_BITS):
+        self._sub_bucket_bits = sub_bucket_bits
+        self._histograms: dict[tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, cmd: str, stage: str, seconds: float) -> None:
+        key = (cmd, stage)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram(self._sub_bucket_bits)
+            histogram.record_seconds(seconds)
+
+    def histogram(self, cmd: str, stage: str) -> LatencyHistogram | None:
+        return self._histograms.get((cmd, stage))
+
+    def timer(self, cmd: str) -> StageTimer:
+        return StageTimer(self, cmd)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-ready `{"unit": "us", "commands": {cmd: {stage: summary}}}`."""
+        with self._lock:
+            commands: dict[str, dict[str, Any]] = {}
+            for (cmd, stage), histogram in sorted(self._histograms.items(), key=_snapshot_order):
+                commands.setdefault(cmd, {})[stage] = histogram.snapshot()
+        return {"unit": "us", "commands": commands}
+
+
+def _snapshot_order(item: tuple[tuple[str, str], LatencyHistogram]) -> tuple[str, int, str]:
+    cmd, stage = item[0]
+    return cmd, STAGES.index(stage) if stage in STAGES else len(STAGES), stage
+
+
+class StageTimer:
+    """Times consecutive stages of one request; `finish` records them and `total`."""
+
+    __slots__ = ("_metrics", "_cmd", "_start", "_last", "_stages")
+
+    def __init__(self, metrics: TophatMetrics, cmd: str):
+        self._metrics = metrics
+        self._cmd = cmd
+        self._start = self._last = time.perf_counter()
+        self._stages: dict[str, float] = {}
+
+    def mark(self, stage: str) -> None:
+        """Charge the time since the previous mark to `stage` (summed within a request)."""
+        now = time.perf_counter()
+        self._stages[stage] = self._stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def finish(self, total_stage: str = "total") -> None:
+        for stage, seconds in self._stages.items():
+            self._metrics.record(self._cmd, stage, seconds)
+        self._metrics.record(self._cmd, total_stage, time.perf_counter() - self._start)
+
+
+class _NullStageTimer:
+    __slots__ = ()
+
+    def mark(self, stage: str) -> None:
+        return None
+
+    def finish(self, total_stage: str = "total") -> None:
+        return None
+
+
+NULL_STAGE_TIMER = _NullStageTimer()
+
+
+def start_timer(metrics: TophatMetrics | None, cmd: Any) -> StageTimer | _NullStageTimer:
+    """`metrics.timer(cmd)`, or a no-op timer when instrumentation is off."""
+    if metrics is None:
+        return NULL_STAGE_TIMER
+    return metrics.timer(str(cmd))
@@ -0,0 +1,233 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Spread TOPHAT predictions across several demo boards.
+
+Every board in a `TophatPool` holds the same 22-byte model image. Single
+predictions go round-robin; batches are split into chunks that each board
+pulls from a shared queue on its own thread. A board that times out is
+reopened and reloaded, and dropped from the pool once it runs out of
+restarts.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import queue
+import threading
+from typing import Any, Callable, Iterable, Self
+
+from tools.host.tophat_host import (
+    DEFAULT_BATCH_ROWS,
+    FEATURE_VECTOR_BYTES,
+    MODEL_IMAGE_BYTES,
+    JsonLineSerialTransport,
+    ProtocolError,
+    RequestTransport,
+    TophatClient,
+    _normalize_u8_vector,
+)
+from tools.host.tophat_metrics import TophatMetrics
+
+# Errors that mean "this board stopped answering", as opposed to a board-side
+# rejection of the request itself.
+BOARD_FAILURES = (TimeoutError, ProtocolError, OSError)
+
+TransportFactory = Callable[[str], RequestTransport]
+
+
+@dataclass
+class BoardHealth:
+    port: str
+    healthy: bool = True
+    requests: int = 0
+    predictions: int = 0
+    failures: int = 0
+    restarts: int = 0
+    last_error: str | None = None
+
+
+class _Board:
+    def __init__(self, port: str, factory: TransportFactory, metrics: TophatMetrics | None):
+        self.port = port
+        self.health = BoardHealth(port=port)
+        self._factory = factory
+        self._metrics = metrics
+        self.transport = factory(port)
+        self.client = TophatClient(self.transport, metrics)
+
+    def reopen(self, model: bytes | None) -> None:
+        _close_transport(self.transport)
+        self.transport = self._factory(self.port)
+        self.client = TophatClient(self.transport, self._metrics)
+        self.client.clear()
+        if model is not None:
+            self.client.load_model(model)
+
+    def close(self) -> None:
+        _close_transport(self.transport)
+
+
+def _close_transport(transport: RequestTransport) -> None:
+    close = getattr(transport, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+class TophatPool:
+    def __init__(
+        self,
+        ports: Iterable[str],
+        transport_factory: TransportFactory = JsonLineSerialTransport,
+        max_restarts: int = 1,
+        metrics: TophatMetrics | None = None,
+    ):
+        # `metrics` collects client-level timings across all boards; give the
+        # factory's transports the same object for per-stage timings.
+        self._boards = [_Board(port, transport_factory, metrics) for port in ports]
+        if not self._boards:
+            raise ValueError("TophatPool needs at least one port")
+        self._max_restarts = max_restarts
+        self._model: bytes | None = None
+        self._next_board = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for board in self._boards:
+            board.close()
+
+    def health(self) -> list[dict[str, Any]]:
+        return [asdict(board.health) for board in self._boards]
+
+    def ping(self) -> dict[str, dict[str, Any]]:
+        return self._broadcast(lambda client: client.ping())
+
+    def clear(self) -> None:
+        self._model = None
+        self._broadcast(lambda client: client.clear())
+
+    def load_model(self, model_bytes: bytes | Iterable[int]) -> None:
+        model = bytes(_normalize_u8_vector(model_bytes, MODEL_IMAGE_BYTES, label="model"))
+        self._model = model
+        self._broadcast(lambda client: client.load_model(model))
+
+    def predict(self, feature_values: Iterable[int]) -> int:
+        features = _normalize_u8_vector(feature_values, FEATURE_VECTOR_BYTES, label="features")
+        while True:
+            board = self._pick_board()
+            try:
+                prediction = self._call_with_restart(board, lambda client: client.predict(features))
+            except BOARD_FAILURES:
+                continue
+            board.health.predictions += 1
+            return prediction
+
+    def predict_batch(
+        self, rows: Iterable[bytes | Iterable[int]], batch_size: int = DEFAULT_BATCH_ROWS
+    ) -> list[int]:
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive (got {batch_size})")
+
+        normalized = [
+            _normalize_u8_vector(row, FEATURE_VECTOR_BYTES, label=f"rows[{idx}]")
+            for idx, row in enumerate(rows)
+        ]
+        chunks: queue.Queue[tuple[int, list[list[int]]]] = queue.Queue()
+        for start in range(0, len(normalized), batch_size):
+            chunks.put((start, normalized[start : start + batch_size]))
+
+        results: list[int] = [0] * len(normalized)
+        board_errors: list[BaseException] = []
+
+        def worker(board: _Board) -> None:
+            while board.health.healthy:
+                try:
+                    start, chunk = chunks.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    predictions = self._call_with_restart(board, lambda client: client.predict_batch(chunk))
+                except BOARD_FAILURES:
+                    # Hand the chunk to the remaining boards.
+                    chunks.put((start, chunk))
+                    continue
+                except BaseException as exc:
+                    board_errors.append(exc)
+                    return
+                results[start : start + len(chunk)] = predictions
+                board.health.predictions += len(chunk)
+
+        # A board dropped late can requeue a chunk after its peers exited, so
+        # keep going until the queue drains or no board is left.
+        while not chunks.empty():
+            self._require_healthy()
+            threads = [threading.Thread(target=worker, args=(board,)) for board in self._healthy_boards()]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if board_errors:
+                raise board_errors[0]
+        return results
+
+    def _broadcast(self, fn: Callable[[TophatClient], Any]) -> dict[str, Any]:
+        results: dict[str, Any] = {}
+        for board in self._healthy_boards():
+            try:
+                results[board.port] = self._call_with_restart(board, fn)
+            except BOARD_FAILURES:
+                continue
+        self._require_healthy()
+        return results
+
+    def _healthy_boards(self) -> list[_Board]:
+        return [board for board in self._boards if board.health.healthy]
+
+    def _require_healthy(self) -> None:
+        if not self._healthy_boards():
+            errors = "; ".join(f"{board.port}: {board.health.last_error}" for board in self._boards)
+            raise RuntimeError(f"No healthy boards left in pool ({errors})")
+
+    def _pick_board(self) -> _Board:
+        self._require_healthy()
+        while True:
+            board = self._boards[self._next_board % len(self._boards)]
+            self._next_board += 1
+            if board.health.healthy:
+                return board
+
+    def _call(self, board: _Board, fn: Callable[[TophatClient], Any]) -> Any:
+        board.health.requests += 1
+        return fn(board.client)
+
+    def _call_with_restart(self, board: _Board, fn: Callable[[TophatClient], Any]) -> Any:
+        """Run `fn`, reopening the board after a failure; drop it when restarts run out."""
+        while True:
+            try:
+                return self._call(board, fn)
+            except BOARD_FAILURES as exc:
+                board.health.failures += 1
+                board.health.last_error = f"{type(exc).__name__}: {exc}"
+                if not self._restart(board):
+                    raise
+
+    def _restart(self, board: _Board) -> bool:
+        while board.health.restarts < self._max_restarts:
+            board.health.restarts += 1
+            try:
+                board.reopen(self._model)
+                return True
+            except BOARD_FAILURES as exc:
+                board.health.failures += 1
+                board.health.last_error = f"{type(exc).__name__}: {exc}"
+        board.health.healthy = False
+        board.close()
+        return False
@@ -0,0 +1,192 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Time-multiplex several model images on one TOPHAT board.
+
+Switching models costs a full 22-byte `load_model`, so `ModelScheduler` queues
+`predict` requests per model and serves them in per-model batches. Two knobs
+bound how long other models wait:
+
+- `quantum_rows`: rows served for one model in a row before any other model
+  with queued work gets a turn.
+- `max_wait_s`: a request queued longer than this preempts the current model
+  at the next batch boundary.
+
+Any number of threads may `submit`, `step`, or `predict` at once. Only one
+batch is on the board at a time: `step` holds a board lock from picking the
+batch until its predictions are back, so one thread's `load_model` can never
+land between another's `load_model` and `predict_batch`.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+import threading
+import time
+from typing import Any, Callable, Hashable, Iterable
+
+from tools.host.tophat_host import (
+    DEFAULT_BATCH_ROWS,
+    FEATURE_VECTOR_BYTES,
+    MODEL_IMAGE_BYTES,
+    TophatClient,
+    _normalize_u8_vector,
+)
+
+DEFAULT_QUANTUM_ROWS = DEFAULT_BATCH_ROWS * 4
+DEFAULT_MAX_WAIT_S = 0.05
+
+
+@dataclass
+class _Pending:
+    features: list[int]
+    submitted_at: float
+    future: Future[int]
+
+
+class ModelScheduler:
+    def __init__(
+        self,
+        client: TophatClient,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        quantum_rows: int = DEFAULT_QUANTUM_ROWS,
+        max_wait_s: float = DEFAULT_MAX_WAIT_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if batch_rows <= 0 or quantum_rows <= 0:
+            raise ValueError("batch_rows and quantum_rows must be positive")
+        self._client = client
+        self._batch_rows = batch_rows
+        self._quantum_rows = quantum_rows
+        self._max_wait_s = max_wait_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Serializes whole batches (pick, load, predict); `_lock` only guards queues and stats.
+        self._board_lock = threading.Lock()
+
+        self._models: dict[Hashable, bytes] = {}
+        self._queues: dict[Hashable, deque[_Pending]] = {}
+        self._served: dict[Hashable, int] = {}
+        self._current: Hashable | None = None
+        self._rows_this_turn = 0
+        self._switch_count = 0
+        self._loads_skipped = 0
+        self._batches = 0
+
+    def register_model(self, model_id: Hashable, model_bytes: bytes | Iterable[int]) -> None:
+        model = bytes(_normalize_u8_vector(model_bytes, MODEL_IMAGE_BYTES, label="model"))
+        with self._lock:
+            self._models[model_id] = model
+            self._queues.setdefault(model_id, deque())
+            self._served.setdefault(model_id, 0)
+
+    def submit(self, model_id: Hashable, feature_values: Iterable[int]) -> Future[int]:
+        features = _normalize_u8_vector(feature_values, FEATURE_VECTOR_BYTES, label="features")
+        future: Future[int] = Future()
+        with self._lock:
+            if model_id not in self._models:
+                raise KeyError(f"Unknown model id: {model_id!r}")
+            self._queues[model_id].append(_Pending(features, self._clock(), future))
+        return future
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def step(self) -> int:
+        """Serve one batch for the next model; return the number of rows served."""
+        with self._board_lock:
+            return self._serve_batch()
+
+    def _serve_batch(self) -> int:
+        with self._lock:
+            model_id = self._pick_model()
+            if model_id is None:
+                return 0
+            queue = self._queues[model_id]
+            batch = [queue.popleft() for _ in range(min(self._batch_rows, len(queue)))]
+            if model_id != self._current:
+                self._current = model_id
+                self._rows_this_turn = 0
+            self._rows_this_turn += len(batch)
+            model = self._models[model_id]
+
+        popped = len(batch)
+        batch = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+        if not batch:
+            return popped
+        try:
+            skipped = self._client.load_model(model)
+            predictions = self._client.predict_batch([pending.features for pending in batch])
+        except BaseException as exc:
+            with self._lock:
+                # The board state is unknown now; make the next batch reload.
+                self._current = None
+            for pending in batch:
+                pending.future.set_exception(exc)
+            return popped
+
+        with self._lock:
+            if skipped:
+                self._loads_skipped += 1
+            else:
+                self._switch_count += 1
+            self._served[model_id] += len(batch)
+            self._batches += 1
+        for pending, prediction in zip(batch, predictions, strict=True):
+            pending.future.set_result(prediction)
+        return popped
+
+    def run_pending(self) -> int:
+        served = 0
+        while True:
+            rows = self.step()
+            if rows == 0:
+                return served
+            served += rows
+
+    def predict(self, model_id: Hashable, feature_values: Iterable[int]) -> int:
+        future = self.submit(model_id, feature_values)
+        self.run_pending()
+        return future.result()
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            return {
+                "switch_count": self._switch_count,
+                "loads_skipped": self._loads_skipped,
+                "batches": self._batches,
+                "current_model": self._current,
+                "models": {
+                    model_id: {
+                        "queue_depth": len(queue),
+                        "served": self._served[model_id],
+                        "oldest_wait_s": (now - queue[0].submitted_at) if queue else 0.0,
+                    }
+                    for model_id, queue in self._queues.items()
+                },
+            }
+
+    def _pick_model(self) -> Hashable | None:
+        waiting = {model_id: queue for model_id, queue in self._queues.items() if queue}
+        if not waiting:
+            return None
+
+        now = self._clock()
+        others = {model_id: queue for model_id, queue in waiting.items() if model_id != self._current}
+        overdue = {
+            model_id: queue
+            for model_id, queue in others.items()
+            if now - queue[0].submitted_at > self._max_wait_s
+        }
+
+        if self._current in waiting and not overdue:
+            if not others or self._rows_this_turn < self._quantum_rows:
+                return self._current
+
+        # Earliest head-of-queue first; overdue models before everything else.
+        candidates = overdue or others or waiting
+        return min(candidates, key=lambda model_id: candidates[model_id][0].submitted_at)
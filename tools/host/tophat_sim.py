@@ -0,0 +1,527 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""In-process TOPHAT board simulator for tests and load runs without hardware.
+
+`SimulatedTophatTransport` implements `RequestTransport` and answers the RP2040
+bridge command set (see docs/host-serial-rpc.md), so `TophatClient`,
+`TophatPool` and `ModelScheduler` run unchanged on top of it. Two back ends:
+
+- `cycle`: `TophatRtlModel`, a cycle-accurate model of
+  `tt_um_pgfarley_tophat_top` (io_intf, model/feature loaders, tree core and
+  status bits), driven pin by pin the way the bridge drives the real chip.
+- `fast`: a behavioural board with the same command semantics that evaluates
+  batches with `CompiledModel` lookup tables.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from tools.model.tophat_image import (
+    FEATURE_IDX_MASK,
+    FEATURE_VECTOR_BYTES,
+    MODEL_IMAGE_BYTES,
+    NUM_INTERNAL,
+    NUM_LEAVES,
+    TREE_DEPTH,
+)
+from tools.model.tophat_reference import CompiledModel
+
+# Bridge limits and protocol constants; must match tools/rp2040/main.py.
+PROTOCOL_VERSION = 1
+MAX_BATCH_ROWS = 128
+MAX_RESIDENT_ROWS = 2048
+CMD_MODEL = 0b00
+CMD_FEATURE = 0b01
+CMD_CTRL = 0b10
+CTRL_RUN = 0x01
+CTRL_CLEAR = 0x02
+STATUS_READY = 0x08
+STATUS_BUSY = 0x10
+STATUS_PRED_VALID = 0x20
+STATUS_MODEL_LOADED = 0x40
+STATUS_ERROR_OR_MISSING_FEATURES = 0x80
+# Cycles after the 2-cycle send of `run` until pred_valid is visible.
+RUN_LATENCY_TICKS = 3
+# Polling budget before the simulated bridge reports a timeout.
+MAX_WAIT_TICKS = 64
+
+SIM_MODES = ("cycle", "fast")
+
+
+class TophatRtlModel:
+    """Cycle-accurate model of the TOPHAT RTL.
+
+    `clock()` applies one rising edge with the given pin values. Register
+    updates follow Verilog non-blocking semantics: every block reads the
+    values from before the edge. `uio_out`/`uo_out` are the combinational
+    outputs of tophat_result_if.v.
+    """
+
+    S_IDLE = 0
+    S_STEP = 1
+
+    def __init__(self) -> None:
+        self.cycles = 0
+        self.reset()
+
+    def reset(self) -> None:
+        # tophat_io_intf
+        self.model_byte_valid = False
+        self.model_byte = 0
+        self.feature_byte_valid = False
+        self.feature_byte = 0
+        self.run_cmd = False
+        self.clear_cmd = False
+        self._reset_model_loader()
+        self._reset_feature_loader()
+        self._reset_tree_core()
+
+    def _reset_model_loader(self) -> None:
+        self.model_byte_idx = 0
+        self.model_loaded = False
+        self.node_feature = [0] * NUM_INTERNAL
+        self.node_threshold = [0] * NUM_INTERNAL
+        self.leaf_value = [0] * NUM_LEAVES
+
+    def _reset_feature_loader(self) -> None:
+        self.feature_idx = 0
+        self.features_loaded = False
+        self.feature_vector = [0] * FEATURE_VECTOR_BYTES
+
+    def _reset_tree_core(self) -> None:
+        self.state = self.S_IDLE
+        self.depth = 0
+        self.current_node = 0
+        self.busy = False
+        self.pred_valid = False
+        self.pred_value = 0
+        self.error = False
+
+    @property
+    def uio_out(self) -> int:
+        status = STATUS_BUSY if self.busy else STATUS_READY
+        if self.pred_valid:
+            status |= STATUS_PRED_VALID
+        if self.model_loaded:
+            status |= STATUS_MODEL_LOADED
+        if self.error or not self.features_loaded:
+            status |= STATUS_ERROR_OR_MISSING_FEATURES
+        return status
+
+    @property
+    def uo_out(self) -> int:
+        return self.pred_value
+
+    def clock(self, ui_in: int = 0, uio_in: int = 0, rst_n: bool = True, ena: bool = True) -> None:
+        self.cycles += 1
+        if not rst_n:
+            self.reset()
+            return
+
+        # tophat_io_intf: sample pins while ready (io_ready = ~busy).
+        next_model_valid = next_feature_valid = next_run = next_clear = False
+        next_model_byte = self.model_byte
+        next_feature_byte = self.feature_byte
+        if ena and not self.busy and uio_in & 0x1:
+            cmd = (uio_in >> 1) & 0x3
+            if cmd == CMD_MODEL:
+                next_model_valid = True
+                next_model_byte = ui_in & 0xFF
+            elif cmd == CMD_FEATURE:
+                next_feature_valid = True
+                next_feature_byte = ui_in & 0xFF
+            elif cmd == CMD_CTRL:
+                next_run = bool(ui_in & CTRL_RUN)
+                next_clear = bool(ui_in & CTRL_CLEAR)
+
+        if self.clear_cmd:
+            self._reset_tree_core()
+            self._reset_feature_loader()
+            self._reset_model_loader()
+        else:
+            # Order matters only in that each block reads pre-edge state:
+            # the core reads the loaders before they update.
+            self._clock_tree_core()
+            self._clock_feature_loader()
+            self._clock_model_loader()
+
+        self.model_byte_valid = next_model_valid
+        self.model_byte = next_model_byte
+        self.feature_byte_valid = next_feature_valid
+        self.feature_byte = next_feature_byte
+        self.run_cmd = next_run
+        self.clear_cmd = next_clear
+
+    def _clock_tree_core(self) -> None:
+        self.pred_valid = False
+        if self.state == self.S_IDLE:
+            self.busy = False
+            if self.run_cmd:
+                if self.model_loaded and self.features_loaded:
+                    self.state = self.S_STEP
+                    self.depth = 0
+                    self.current_node = 0
+                    self.busy = True
+                    self.error = False
+                else:
+                    self.error = True
+            return
+
+        node = self.current_node
+        value = self.feature_vector[self.node_feature[node]]
+        next_child = (node * 2) + 1 + (value > self.node_threshold[node])
+        if self.depth == TREE_DEPTH - 1:
+            self.state = self.S_IDLE
+            self.busy = False
+            self.pred_valid = True
+            self.pred_value = self.leaf_value[next_child - NUM_INTERNAL]
+            self.error = False
+        else:
+            self.current_node = next_child
+            self.depth += 1
+
+    def _clock_feature_loader(self) -> None:
+        if self.run_cmd:
+            self.features_loaded = False
+        if not self.feature_byte_valid:
+            return
+        if self.feature_idx == 0:
+            self.features_loaded = False
+        self.feature_vector[self.feature_idx] = self.feature_byte
+        if self.feature_idx == FEATURE_VECTOR_BYTES - 1:
+            self.feature_idx = 0
+            self.features_loaded = True
+        else:
+            self.feature_idx += 1
+
+    def _clock_model_loader(self) -> None:
+        if not self.model_byte_valid:
+            return
+        idx = self.model_byte_idx
+        if idx == 0:
+            self.model_loaded = False
+        if idx < NUM_INTERNAL * 2:
+            if idx & 0x1:
+                self.node_threshold[idx >> 1] = self.model_byte
+            else:
+                self.node_feature[idx >> 1] = self.model_byte & FEATURE_IDX_MASK
+        else:
+            self.leaf_value[idx - (NUM_INTERNAL * 2)] = self.model_byte
+        if idx == MODEL_IMAGE_BYTES - 1:
+            self.model_byte_idx = 0
+            self.model_loaded = True
+        else:
+            self.model_byte_idx = idx + 1
+
+
+class _CycleBoard:
+    """Drives `TophatRtlModel` pins exactly like `TophatBridge` in tools/rp2040/main.py."""
+
+    def __init__(self) -> None:
+        self.rtl = TophatRtlModel()
+
+    @property
+    def ticks(self) -> int:
+        return self.rtl.cycles
+
+    def status(self) -> int:
+        return self.rtl.uio_out
+
+    def reset(self) -> None:
+        self.rtl.clock(rst_n=False)
+
+    def send(self, cmd: int, data: bytes) -> None:
+        rtl = self.rtl
+        self._wait(STATUS_READY, "ready")
+        strobe = ((cmd & 0x3) << 1) | 0x1
+        for byte in data:
+            rtl.clock(byte, strobe)
+            rtl.clock(0, 0)
+
+    def _wait(self, mask: int, label: str) -> None:
+        for _ in range(MAX_WAIT_TICKS):
+            if self.rtl.uio_out & mask:
+                return
+            self.rtl.clock()
+        raise RuntimeError(f"Timeout waiting for {label}")
+
+    def load_model(self, image: bytes) -> None:
+        self.send(CMD_MODEL, image)
+        self._wait(STATUS_MODEL_LOADED, "model_loaded")
+
+    def load_features(self, features: bytes) -> None:
+        self.send(CMD_FEATURE, features)
+
+    def clear(self) -> None:
+        self.send(CMD_CTRL, bytes([CTRL_CLEAR]))
+
+    def run(self) -> int:
+        rtl = self.rtl
+        self.send(CMD_CTRL, bytes([CTRL_RUN]))
+        for _ in range(MAX_WAIT_TICKS):
+            status = rtl.uio_out
+            if status & STATUS_PRED_VALID:
+                return rtl.uo_out
+            if not status & STATUS_BUSY and status & STATUS_ERROR_OR_MISSING_FEATURES:
+                raise RuntimeError("Run rejected (missing model/features or core error)")
+            rtl.clock()
+        raise RuntimeError("Timeout waiting for prediction")
+
+    def predict_rows(self, rows: np.ndarray) -> bytes:
+        out = bytearray(rows.shape[0])
+        for idx, row in enumerate(rows):
+            self.load_features(row.tobytes())
+            out[idx] = self.run()
+        return bytes(out)
+
+
+class _FastBoard:
+    """Behavioural board: same observable state as `_CycleBoard`, batched evaluation.
+
+    Tick counts are the ones the cycle-accurate bridge would spend (two per
+    byte sent, three more per run) so `stats` stays comparable.
+    """
+
+    def __init__(self) -> None:
+        self.ticks = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self._image = bytearray(MODEL_IMAGE_BYTES)
+        self._model_idx = 0
+        self._model_loaded = False
+        self._compiled: CompiledModel | None = None
+        self._features = bytearray(FEATURE_VECTOR_BYTES)
+        self._feature_idx = 0
+        self._features_loaded = False
+        self._error = False
+        self._pred_value = 0
+
+    def status(self) -> int:
+        status = STATUS_READY
+        if self._model_loaded:
+            status |= STATUS_MODEL_LOADED
+        if self._error or not self._features_loaded:
+            status |= STATUS_ERROR_OR_MISSING_FEATURES
+        return status
+
+    def load_model(self, image: bytes) -> None:
+        self.ticks += 2 * len(image)
+        for byte in image:
+            if self._model_idx == 0:
+                self._model_loaded = False
+            self._image[self._model_idx] = byte
+            self._model_idx += 1
+            if self._model_idx == MODEL_IMAGE_BYTES:
+                self._model_idx = 0
+                self._model_loaded = True
+        self._compiled = CompiledModel(bytes(self._image)) if self._model_loaded else None
+        if not self._model_loaded:
+            raise RuntimeError("Timeout waiting for model_loaded")
+
+    def load_features(self, features: bytes) -> None:
+        self.ticks += 2 * len(features)
+        for byte in features:
+            if self._feature_idx == 0:
+                self._features_loaded = False
+            self._features[self._feature_idx] = byte
+            self._feature_idx += 1
+            if self._feature_idx == FEATURE_VECTOR_BYTES:
+                self._feature_idx = 0
+                self._features_loaded = True
+
+    def clear(self) -> None:
+        self.ticks += 2
+        self.reset()
+
+    def run(self) -> int:
+        self.ticks += 2
+        # Every run consumes the feature vector, accepted or not (`consume_i = run_cmd` in the RTL).
+        features_loaded, self._features_loaded = self._features_loaded, False
+        if not (self._model_loaded and features_loaded):
+            self._error = True
+            raise RuntimeError("Run rejected (missing model/features or core error)")
+        assert self._compiled is not None
+        self.ticks += RUN_LATENCY_TICKS
+        self._error = False
+        self._pred_value = self._compiled.predict_row(bytes(self._features))
+        return self._pred_value
+
+    def predict_rows(self, rows: np.ndarray) -> bytes:
+        if rows.shape[0] == 0:
+            return b""
+        if self._feature_idx != 0 or not self._model_loaded:
+            # Misaligned or missing state: take the per-row path for exact semantics.
+            return bytes(self._predict_row(row) for row in rows)
+
+        assert self._compiled is not None
+        predictions = self._compiled.predict(rows)
+        self.ticks += rows.shape[0] * ((2 * (FEATURE_VECTOR_BYTES + 1)) + RUN_LATENCY_TICKS)
+        self._features[:] = rows[-1].tobytes()
+        self._features_loaded = False
+        self._error = False
+        self._pred_value = int(predictions[-1])
+        return predictions.tobytes()
+
+    def _predict_row(self, row: np.ndarray) -> int:
+        self.load_features(row.tobytes())
+        return self.run()
+
+
+class SimulatedTophatTransport:
+    """`RequestTransport` backed by a simulated bridge and ASIC.
+
+    Errors come back as `{"ok": false, "error": ...}` responses with the
+    bridge's wording, so `TophatClient` raises the same exceptions it would
+    against a real board.
+    """
+
+    def __init__(self, mode: str = "fast"):
+        if mode not in SIM_MODES:
+            raise ValueError(f"mode must be one of {SIM_MODES} (got {mode!r})")
+        self.mode = mode
+        self.board: _CycleBoard | _FastBoard = _CycleBoard() if mode == "cycle" else _FastBoard()
+        self.requests: dict[str, int] = {}
+        self.runs = 0
+        self._loaded_model: bytes | None = None
+        self._resident = np.zeros((MAX_RESIDENT_ROWS, FEATURE_VECTOR_BYTES), dtype=np.uint8)
+        self._resident_rows = 0
+
+    def __enter__(self) -> SimulatedTophatTransport:
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        return None
+
+    def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        cmd = payload.get("cmd")
+        try:
+            if not isinstance(cmd, str):
+                raise ValueError("Missing string `cmd`")
+            self.requests[cmd] = self.requests.get(cmd, 0) + 1
+            response = self._dispatch(cmd, payload)
+        except (ValueError, RuntimeError) as exc:
+            response = {"ok": False, "error": str(exc)}
+        if "id" in payload:
+            response["id"] = payload["id"]
+        return response
+
+    def _dispatch(self, cmd: str, req: dict[str, Any]) -> dict[str, Any]:
+        board = self.board
+        if cmd == "ping":
+            return {
+                "ok": True,
+                "protocol_version": PROTOCOL_VERSION,
+                "project_enabled": "SIM:tt_um_pgfarley_tophat_top",
+                "mode": f"SIM_{self.mode.upper()}",
+                "io_engine": "sim",
+                "resident_rows": self._resident_rows,
+                "request_count": sum(self.requests.values()),
+            }
+
+        if cmd == "clear":
+            self._loaded_model = None
+            board.clear()
+            return {"ok": True}
+
+        if cmd == "load_model":
+            image = _validate_u8_list(req.get("model"), MODEL_IMAGE_BYTES, "model")
+            force = req.get("force", False)
+            if not isinstance(force, bool):
+                raise ValueError("force must be a boolean")
+            if not force and image == self._loaded_model and board.status() & STATUS_MODEL_LOADED:
+                return {"ok": True, "cached": True}
+            self._loaded_model = None
+            board.load_model(image)
+            self._loaded_model = image
+            return {"ok": True, "cached": False}
+
+        if cmd == "load_features":
+            board.load_features(_validate_u8_list(req.get("features"), FEATURE_VECTOR_BYTES, "features"))
+            return {"ok": True}
+
+        if cmd == "run":
+            self.runs += 1
+            return {"ok": True, "prediction": board.run()}
+
+        if cmd == "predict":
+            features = _validate_u8_list(req.get("features"), FEATURE_VECTOR_BYTES, "features")
+            board.load_features(features)
+            self.runs += 1
+            return {"ok": True, "prediction": board.run()}
+
+        if cmd == "predict_batch":
+            rows = _validate_u8_rows(req.get("rows"), MAX_BATCH_ROWS)
+            self.runs += rows.shape[0]
+            return {"ok": True, "predictions": list(board.predict_rows(rows))}
+
+        if cmd == "upload_rows":
+            offset = req.get("offset", 0)
+            if not isinstance(offset, int) or offset < 0 or offset > self._resident_rows:
+                raise ValueError(f"offset {offset} must be in 0..{self._resident_rows} (resident rows)")
+            rows = _validate_u8_rows(req.get("rows"), MAX_BATCH_ROWS)
+            end = offset + rows.shape[0]
+            if end > MAX_RESIDENT_ROWS:
+                raise ValueError(f"upload ends at row {end}, past MAX_RESIDENT_ROWS={MAX_RESIDENT_ROWS}")
+            self._resident[offset:end] = rows
+            self._resident_rows = end
+            return {"ok": True, "rows": end}
+
+        if cmd == "run_rows":
+            start = req.get("start", 0)
+            count = req.get("count")
+            if not isinstance(start, int) or (count is not None and not isinstance(count, int)):
+                raise ValueError("start and count must be ints")
+            if count is None:
+                count = self._resident_rows - start
+            if start < 0 or count < 0 or start + count > self._resident_rows:
+                raise ValueError(
+                    f"rows {start}..{start + count} out of range (resident rows: {self._resident_rows})"
+                )
+            self.runs += count
+            return {"ok": True, "packed": board.predict_rows(self._resident[start : start + count]).hex()}
+
+        if cmd == "stats":
+            reset = req.get("reset", False)
+            if not isinstance(reset, bool):
+                raise ValueError("reset must be a boolean")
+            payload = {"ok": True, "requests": dict(self.requests), "ticks": board.ticks, "runs": self.runs}
+            if reset:
+                self.requests = {}
+                self.runs = 0
+            return payload
+
+        return {"ok": False, "error": f"Unsupported command: {cmd}"}
+
+
+def _validate_u8_list(values: Any, expected_len: int, label: str) -> bytes:
+    if not isinstance(values, list):
+        raise ValueError(f"{label} must be a list of {expected_len} bytes")
+    if len(values) != expected_len:
+        raise ValueError(f"{label} must contain exactly {expected_len} bytes (got {len(values)})")
+    for idx, value in enumerate(values):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"{label}[{idx}] must be an int (got {value!r})")
+        if value < 0 or value > 0xFF:
+            raise ValueError(f"{label}[{idx}] must be in 0..255 (got {value!r})")
+    return bytes(values)
+
+
+def _validate_u8_rows(values: Any, max_rows: int) -> np.ndarray:
+    if not isinstance(values, list):
+        raise ValueError(f"rows must be a list of {FEATURE_VECTOR_BYTES}-byte lists")
+    if len(values) > max_rows:
+        raise ValueError(f"rows must contain at most {max_rows} rows (got {len(values)})")
+    if not values:
+        return np.zeros((0, FEATURE_VECTOR_BYTES), dtype=np.uint8)
+    return np.frombuffer(
+        b"".join(_validate_u8_list(row, FEATURE_VECTOR_BYTES, f"rows[{idx}]") for idx, row in enumerate(values)),
+        dtype=np.uint8,
+    ).reshape(-1, FEATURE_VECTOR_BYTES)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare row-wise, vectorized, and compiled TOPHAT reference evaluators.
+
+Usage: python tools/model/bench_tophat_reference.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.host.tophat_host import FEATURE_VECTOR_BYTES, MODEL_IMAGE_BYTES  # noqa: E402
+from tools.model.tophat_reference import (  # noqa: E402
+    compile_model,
+    predict_model_batch,
+    predict_model_rowwise,
+)
+
+
+def _time_rows_per_s(fn: Callable[[bytes, np.ndarray], np.ndarray], model: bytes, rows: np.ndarray) -> tuple[float, np.ndarray]:
+    start = time.perf_counter()
+    preds = fn(model, rows)
+    elapsed = time.perf_counter() - start
+    return rows.shape[0] / elapsed, preds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows for the vectorized evaluator")
+    parser.add_argument(
+        "--rowwise-rows",
+        type=int,
+        default=20_000,
+        help="Rows for the row-wise evaluator (it is much slower)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    model = rng.integers(0, 256, MODEL_IMAGE_BYTES, dtype=np.uint8).tobytes()
+    rows = rng.integers(0, 256, (args.rows, FEATURE_VECTOR_BYTES), dtype=np.uint8)
+
+    batch_rate, batch_preds = _time_rows_per_s(predict_model_batch, model, rows)
+    sample = rows[: args.rowwise_rows]
+    rowwise_rate, rowwise_preds = _time_rows_per_s(predict_model_rowwise, model, sample)
+    compiled = compile_model(model)
+    compiled_rate, compiled_preds = _time_rows_per_s(lambda _model, x: compiled.predict(x), model, rows)
+
+    if not np.array_equal(batch_preds[: sample.shape[0]], rowwise_preds):
+        raise SystemExit("Vectorized and row-wise evaluators disagree")
+    if not np.array_equal(batch_preds, compiled_preds):
+        raise SystemExit("Vectorized and compiled evaluators disagree")
+
+    print(
+        json.dumps(
+            {
+                "rows": args.rows,
+                "rowwise_rows_per_s": round(rowwise_rate),
+                "batch_rows_per_s": round(batch_rate),
+                "compiled_rows_per_s": round(compiled_rate),
+                "batch_speedup": round(batch_rate / rowwise_rate, 1),
+                "compiled_speedup": round(compiled_rate / rowwise_rate, 1),
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""The TOPHAT 22-byte model image.
+
+Layout (see docs/info.md and tophat_model_loader.v):
+
+- bytes 0..13: 7 internal nodes as [feature_id, threshold] pairs
+- bytes 14..21: 8 leaf values
+
+`ModelImage` wraps the raw bytes without copying; its field views are strided
+`memoryview` slices of the same buffer.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from tools.model.tophat_reference import CompiledModel
+
+TREE_DEPTH = 3
+NUM_INTERNAL = (1 << TREE_DEPTH) - 1
+NUM_LEAVES = 1 << TREE_DEPTH
+FEATURE_VECTOR_BYTES = 8
+MODEL_IMAGE_BYTES = (NUM_INTERNAL * 2) + NUM_LEAVES
+# tophat_model_loader.v keeps only the low FEATURE_IDX_W=3 bits of feature_id.
+FEATURE_IDX_MASK = FEATURE_VECTOR_BYTES - 1
+
+
+class ModelImage:
+    __slots__ = ("buffer", "node_features", "node_thresholds", "leaf_values")
+
+    def __init__(self, buffer: bytes | bytearray | memoryview):
+        view = memoryview(buffer).cast("B")
+        if len(view) != MODEL_IMAGE_BYTES:
+            raise ValueError(f"model image must be exactly {MODEL_IMAGE_BYTES} bytes (got {len(view)})")
+
+        self.buffer = view.toreadonly()
+        self.node_features = self.buffer[0 : NUM_INTERNAL * 2 : 2]
+        self.node_thresholds = self.buffer[1 : NUM_INTERNAL * 2 : 2]
+        self.leaf_values = self.buffer[NUM_INTERNAL * 2 :]
+
+    @classmethod
+    def from_bytes(cls, data: bytes | bytearray | memoryview, validate: bool = True) -> ModelImage:
+        image = cls(data)
+        if validate:
+            image.validate()
+        return image
+
+    @classmethod
+    def from_fields(
+        cls,
+        node_features: Iterable[int],
+        node_thresholds: Iterable[int],
+        leaf_values: Iterable[int],
+    ) -> ModelImage:
+        features = [int(v) for v in node_features]
+        thresholds = [int(v) for v in node_thresholds]
+        leaves = [int(v) for v in leaf_values]
+        if len(features) != NUM_INTERNAL or len(thresholds) != NUM_INTERNAL:
+            raise ValueError(f"expected {NUM_INTERNAL} node features and thresholds")
+        if len(leaves) != NUM_LEAVES:
+            raise ValueError(f"expected {NUM_LEAVES} leaf values")
+
+        data = bytearray(MODEL_IMAGE_BYTES)
+        try:
+            data[0 : NUM_INTERNAL * 2 : 2] = bytes(features)
+            data[1 : NUM_INTERNAL * 2 : 2] = bytes(thresholds)
+            data[NUM_INTERNAL * 2 :] = bytes(leaves)
+        except ValueError as exc:
+            raise ValueError(f"model fields must be in 0..255: {exc}") from exc
+        return cls.from_bytes(data)
+
+    def validate(self) -> None:
+        for node, feature in enumerate(self.node_features):
+            if feature > FEATURE_IDX_MASK:
+                raise ValueError(f"node {node} feature {feature} out of range 0..{FEATURE_IDX_MASK}")
+
+    def to_bytes(self) -> bytes:
+        return self.buffer.tobytes()
+
+    def __bytes__(self) -> bytes:
+        return self.to_bytes()
+
+    def __len__(self) -> int:
+        return MODEL_IMAGE_BYTES
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.buffer)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ModelImage):
+            return self.buffer == other.buffer
+        if isinstance(other, (bytes, bytearray, memoryview)):
+            return self.buffer == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.to_bytes())
+
+    def __repr__(self) -> str:
+        return f"ModelImage({self.buffer.hex(' ')})"
+
+    def predict_row(self, feature_values: bytes | Iterable[int]) -> int:
+        row = bytes(feature_values)
+        node = 0
+        for _ in range(TREE_DEPTH):
+            value = row[self.node_features[node] & FEATURE_IDX_MASK]
+            node = (node * 2) + 1 + (value > self.node_thresholds[node])
+        return self.leaf_values[node - NUM_INTERNAL]
+
+    def predict(self, features_u8: np.ndarray) -> np.ndarray:
+        """Batched emulator; see `tools.model.tophat_reference.predict_model_batch`."""
+        from tools.model.tophat_reference import predict_model_batch
+
+        return predict_model_batch(self, features_u8)
+
+    def compile(self) -> CompiledModel:
+        from tools.model.tophat_reference import CompiledModel
+
+        return CompiledModel(self)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "node_features": self.node_features.tolist(),
+            "node_thresholds": self.node_thresholds.tolist(),
+            "leaf_values": self.leaf_values.tolist(),
+        }
@@ -0,0 +1,185 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Feature quantization to the uint8 bytes the TOPHAT core compares.
+
+`FeatureQuantizer` has two modes:
+
+- `minmax`: one `[minimum, maximum]` range per feature; each value maps to
+  `round((x - minimum) * 255 / (maximum - minimum))`, clipped to 0..255 (0 for
+  constant features). Skewed columns end up in a handful of codes.
+- `quantile`: per-feature sorted breakpoints; a value's code is the number of
+  breakpoints at or below it (`np.searchsorted`). Columns with at most 256
+  distinct values get the midpoints between them, the candidate splits a
+  decision tree trainer considers, so no split is lost. Wider columns get
+  breakpoints at 255 evenly spaced quantiles.
+
+Missing values (NaN) are ignored when fitting and quantize to code 0 in both
+modes.
+
+Fitting takes one vectorized pass, quantization writes straight into a
+caller-owned uint8 buffer, and both modes round-trip through the demo's
+`feature_scaler.json` (quantile mode adds a `breakpoints` list per feature):
+
+    {"<feature>": {"minimum": <float>, "maximum": <float>}, ...}
+
+Only numpy is needed; pandas DataFrames are accepted but not required.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+# Rows per pass through the float64 scratch buffer; bounds temporary memory.
+DEFAULT_BLOCK_ROWS = 1 << 16
+QUANTIZATION_MODES = ("minmax", "quantile")
+MAX_CODES = 256
+
+
+class FeatureQuantizer:
+    def __init__(
+        self,
+        feature_names: Sequence[str],
+        minimum: Any,
+        maximum: Any,
+        breakpoints: Sequence[Any] | None = None,
+    ):
+        self.feature_names = tuple(feature_names)
+        self.minimum = np.array(minimum, dtype=np.float64).reshape(-1)
+        self.maximum = np.array(maximum, dtype=np.float64).reshape(-1)
+        if not (len(self.feature_names) == self.minimum.size == self.maximum.size):
+            raise ValueError(
+                f"expected one minimum/maximum per feature ({len(self.feature_names)} features, "
+                f"got {self.minimum.size}/{self.maximum.size})"
+            )
+        self._span = self.maximum - self.minimum
+        self._constant = self._span <= 0
+        # Constant columns divide by 1 and are zeroed afterwards.
+        self._span[self._constant] = 1.0
+
+        self.breakpoints: tuple[np.ndarray, ...] | None = None
+        if breakpoints is not None:
+            self.breakpoints = tuple(np.array(bp, dtype=np.float64).reshape(-1) for bp in breakpoints)
+            if len(self.breakpoints) != len(self.feature_names):
+                raise ValueError(f"expected breakpoints for {len(self.feature_names)} features")
+            for name, bp in zip(self.feature_names, self.breakpoints):
+                if bp.size >= MAX_CODES or np.any(np.diff(bp) <= 0):
+                    raise ValueError(f"{name}: breakpoints must be strictly increasing, at most {MAX_CODES - 1}")
+
+    @property
+    def mode(self) -> str:
+        return "minmax" if self.breakpoints is None else "quantile"
+
+    @classmethod
+    def fit(cls, features: Any, feature_names: Sequence[str], mode: str = "minmax") -> FeatureQuantizer:
+        """Fit `mode` to `features` (NaNs ignored); ranges come from one pass over the matrix."""
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"mode must be one of {QUANTIZATION_MODES} (got {mode!r})")
+        matrix = _as_float_matrix(features, feature_names)
+        minimum, maximum = np.nanmin(matrix, axis=0), np.nanmax(matrix, axis=0)
+        if mode == "minmax":
+            return cls(feature_names, minimum, maximum)
+        return cls(feature_names, minimum, maximum, [_fit_breakpoints(column) for column in matrix.T])
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, dict[str, Any]]) -> FeatureQuantizer:
+        names = list(payload)
+        breakpoints = None
+        if any("breakpoints" in payload[name] for name in names):
+            breakpoints = [payload[name].get("breakpoints", []) for name in names]
+        return cls(
+            names,
+            [float(payload[name]["minimum"]) for name in names],
+            [float(payload[name]["maximum"]) for name in names],
+            breakpoints,
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> FeatureQuantizer:
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        payload: dict[str, dict[str, Any]] = {
+            name: {"minimum": float(lo), "maximum": float(hi)}
+            for name, lo, hi in zip(self.feature_names, self.minimum.tolist(), self.maximum.tolist())
+        }
+        if self.breakpoints is not None:
+            for name, bp in zip(self.feature_names, self.breakpoints):
+                payload[name]["breakpoints"] = bp.tolist()
+        return payload
+
+    def save(self, path: Path | str) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2))
+
+    def transform(
+        self,
+        features: Any,
+        out: np.ndarray | None = None,
+        block_rows: int = DEFAULT_BLOCK_ROWS,
+    ) -> np.ndarray:
+        """Quantize `(rows, features)` values into `out` (allocated when omitted) and return it.
+
+        `out` must be a C-contiguous uint8 array of matching shape. Min/max
+        mode fills it block by block through one reused float64 scratch
+        buffer; quantile mode runs one `np.searchsorted` per column. NaN
+        becomes 0 in either mode.
+        """
+        matrix = _as_float_matrix(features, self.feature_names)
+        rows = matrix.shape[0]
+        if out is None:
+            out = np.empty((rows, len(self.feature_names)), dtype=np.uint8)
+        elif out.dtype != np.uint8 or out.shape != (rows, len(self.feature_names)) or not out.flags.c_contiguous:
+            raise ValueError(
+                f"out must be a C-contiguous uint8 array of shape {(rows, len(self.feature_names))} "
+                f"(got {out.dtype} {out.shape})"
+            )
+        if block_rows <= 0:
+            raise ValueError(f"block_rows must be positive (got {block_rows})")
+
+        if self.breakpoints is not None:
+            for idx, bp in enumerate(self.breakpoints):
+                column = matrix[:, idx]
+                out[:, idx] = np.searchsorted(bp, column, side="right")
+                # searchsorted sorts NaN past every breakpoint; pin it to 0 like minmax mode.
+                out[np.isnan(column), idx] = 0
+            return out
+
+        scratch = np.empty((min(rows, block_rows), len(self.feature_names)), dtype=np.float64)
+        for start in range(0, rows, block_rows):
+            stop = min(start + block_rows, rows)
+            block = scratch[: stop - start]
+            # Same operation order as the original per-column formula, so
+            # results round identically: ((x - lo) * 255) / (hi - lo).
+            np.subtract(matrix[start:stop], self.minimum, out=block)
+            np.multiply(block, 255.0, out=block)
+            np.divide(block, self._span, out=block)
+            np.rint(block, out=block)
+            # fmax (not clip) so NaN becomes 0 instead of an undefined uint8 cast.
+            np.fmax(block, 0.0, out=block)
+            np.minimum(block, 255.0, out=block)
+            np.copyto(out[start:stop], block, casting="unsafe")
+        out[:, self._constant] = 0
+        return out
+
+
+def _fit_breakpoints(column: np.ndarray) -> np.ndarray:
+    finite = column[~np.isnan(column)]
+    values = np.unique(finite)
+    if values.size <= MAX_CODES:
+        # Midpoints between distinct values: one code per value.
+        return (values[:-1] + values[1:]) / 2.0
+    return np.unique(np.quantile(finite, np.linspace(0.0, 1.0, MAX_CODES + 1)[1:-1]))
+
+
+def _as_float_matrix(features: Any, feature_names: Sequence[str]) -> np.ndarray:
+    if hasattr(features, "columns"):
+        # DataFrame-like: select by name so column order never matters.
+        features = features[list(feature_names)].to_numpy(dtype=np.float64)
+    matrix = np.asarray(features, dtype=np.float64)
+    if matrix.ndim != 2 or matrix.shape[1] != len(feature_names):
+        raise ValueError(f"features must have shape (rows, {len(feature_names)}) (got {matrix.shape})")
+    return matrix
@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Software reference evaluators for the TOPHAT 22-byte model image.
+
+All evaluators match `tophat_tree_core.v` bit for bit: only the low 3 bits of
+each node's feature byte select a feature (as `tophat_model_loader.v` stores
+them), and `feature <= threshold` takes the left child.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from tools.model.tophat_image import (
+    FEATURE_IDX_MASK,
+    FEATURE_VECTOR_BYTES,
+    NUM_INTERNAL,
+    TREE_DEPTH,
+    ModelImage,
+)
+
+ModelLike = bytes | bytearray | memoryview | ModelImage
+
+
+def _split_image(model: ModelLike) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if not isinstance(model, ModelImage):
+        model = ModelImage(model)
+    # Zero-copy view over the image buffer.
+    image = np.frombuffer(model.buffer, dtype=np.uint8)
+    node_feature = image[0 : NUM_INTERNAL * 2 : 2] & FEATURE_IDX_MASK
+    node_threshold = image[1 : NUM_INTERNAL * 2 : 2]
+    leaf_values = image[NUM_INTERNAL * 2 :]
+    return node_feature, node_threshold, leaf_values
+
+
+def _as_feature_matrix(features_u8: np.ndarray) -> np.ndarray:
+    features = np.asarray(features_u8)
+    if features.ndim != 2 or features.shape[1] != FEATURE_VECTOR_BYTES:
+        raise ValueError(f"features_u8 must have shape (rows, {FEATURE_VECTOR_BYTES}) (got {features.shape})")
+    if features.dtype != np.uint8:
+        raise ValueError(f"features_u8 must be uint8 (got {features.dtype})")
+    return features
+
+
+def leaf_indices(model_bytes: ModelLike, features_u8: np.ndarray) -> np.ndarray:
+    """Return the leaf index (0..7) each row lands in, one tree level per pass."""
+    node_feature, node_threshold, _ = _split_image(model_bytes)
+    features = _as_feature_matrix(features_u8)
+
+    rows = np.arange(features.shape[0])
+    node = np.zeros(features.shape[0], dtype=np.intp)
+    for _ in range(TREE_DEPTH):
+        values = features[rows, node_feature[node]]
+        node = (node * 2) + 1 + (values > node_threshold[node])
+    return node - NUM_INTERNAL
+
+
+def predict_model_batch(model_bytes: ModelLike, features_u8: np.ndarray) -> np.ndarray:
+    """Evaluate every row of a `(rows, 8)` uint8 matrix at once."""
+    _, _, leaf_values = _split_image(model_bytes)
+    return leaf_values[leaf_indices(model_bytes, features_u8)]
+
+
+def predict_model_rowwise(model_bytes: ModelLike, features_u8: np.ndarray) -> np.ndarray:
+    """Row-at-a-time walk of the tree; the baseline for `predict_model_batch`."""
+    node_feature, node_threshold, leaf_values = _split_image(model_bytes)
+    features = _as_feature_matrix(features_u8)
+
+    preds = np.zeros(features.shape[0], dtype=np.uint8)
+    for row_idx, row in enumerate(features):
+        node = 0
+        for _ in range(TREE_DEPTH):
+            branch_right = 1 if int(row[int(node_feature[node])]) > int(node_threshold[node]) else 0
+            node = (node * 2) + 1 + branch_right
+        preds[row_idx] = leaf_values[node - NUM_INTERNAL]
+    return preds
+
+
+class CompiledModel:
+    """A model image precompiled into per-feature lookup tables.
+
+    Each internal node's comparison depends on one feature byte, so for every
+    feature the 256 possible byte values map to a 7-bit mask of the nodes that
+    branch right. OR-ing the masks of the features the tree reads gives the
+    full branch pattern, and a 128-entry table maps that pattern to the leaf
+    value. Evaluation is then a few table gathers per row with no branching.
+    """
+
+    def __init__(self, model_bytes: ModelLike):
+        node_feature, node_threshold, leaf_values = _split_image(model_bytes)
+        self.model_bytes = bytes(model_bytes)
+
+        values = np.arange(256, dtype=np.uint16)
+        masks = np.zeros((FEATURE_VECTOR_BYTES, 256), dtype=np.uint8)
+        for node in range(NUM_INTERNAL):
+            go_right = values > int(node_threshold[node])
+            masks[int(node_feature[node])] |= (go_right.astype(np.uint8) << node)
+        self.feature_masks = masks
+        self.used_features = tuple(sorted({int(feature) for feature in node_feature}))
+
+        leaf_table = np.zeros(1 << NUM_INTERNAL, dtype=np.uint8)
+        for pattern in range(1 << NUM_INTERNAL):
+            node = 0
+            for _ in range(TREE_DEPTH):
+                node = (node * 2) + 1 + ((pattern >> node) & 0x1)
+            leaf_table[pattern] = leaf_values[node - NUM_INTERNAL]
+        self.leaf_table = leaf_table
+
+    def predict(self, features_u8: np.ndarray) -> np.ndarray:
+        features = _as_feature_matrix(features_u8)
+        pattern = np.zeros(features.shape[0], dtype=np.uint8)
+        for feature in self.used_features:
+            pattern |= self.feature_masks[feature][features[:, feature]]
+        return self.leaf_table[pattern]
+
+    def predict_row(self, feature_values: bytes | list[int]) -> int:
+        pattern = 0
+        for feature in self.used_features:
+            pattern |= int(self.feature_masks[feature, feature_values[feature]])
+        return int(self.leaf_table[pattern])
+
+
+def compile_model(model_bytes: ModelLike) -> CompiledModel:
+    return CompiledModel(model_bytes)
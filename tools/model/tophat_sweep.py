@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Boundary-value feature sweeps for checking a model image against the RTL.
+
+Every comparison in `tophat_tree_core.v` is `feature > threshold`, so the
+interesting inputs for a node are `threshold - 1`, `threshold`, `threshold + 1`
+plus the byte extremes 0 and 255. Two sweep modes build vectors from those:
+
+- `paths`: one base vector per reachable root-to-leaf path, then each used
+  feature swept over its boundary values with the others held at the base.
+  Small (hundreds of rows) and hits every boundary on every path.
+- `exhaustive`: the cartesian product of boundary values over the used
+  features. Grows as (values per feature) ** (used features).
+
+`path_coverage` reports which reachable leaves a set of vectors reached.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+import numpy as np
+
+from tools.model.tophat_image import FEATURE_VECTOR_BYTES, NUM_LEAVES, TREE_DEPTH
+from tools.model.tophat_reference import ModelLike, _split_image, leaf_indices
+
+SWEEP_MODES = ("paths", "exhaustive")
+DEFAULT_CHUNK_ROWS = 4096
+DEFAULT_MAX_VECTORS = 1 << 20
+
+
+def boundary_values(model: ModelLike, feature: int) -> np.ndarray:
+    """Sorted boundary bytes for `feature`: 0, 255 and every threshold ±1 it is compared against."""
+    node_feature, node_threshold, _ = _split_image(model)
+    values = {0, 0xFF}
+    for threshold in node_threshold[node_feature == feature].tolist():
+        values.update(value for value in (threshold - 1, threshold, threshold + 1) if 0 <= value <= 0xFF)
+    return np.array(sorted(values), dtype=np.uint8)
+
+
+def used_features(model: ModelLike) -> tuple[int, ...]:
+    node_feature, _, _ = _split_image(model)
+    return tuple(sorted(set(node_feature.tolist())))
+
+
+def path_bounds(model: ModelLike) -> np.ndarray:
+    """Inclusive `[lo, hi]` per feature that routes a row to each leaf; shape `(8, 8, 2)`.
+
+    A leaf whose bounds have `lo > hi` for some feature cannot be reached: the
+    thresholds along its path contradict each other.
+    """
+    node_feature, node_threshold, _ = _split_image(model)
+    bounds = np.zeros((NUM_LEAVES, FEATURE_VECTOR_BYTES, 2), dtype=np.int16)
+    bounds[:, :, 1] = 0xFF
+    for leaf in range(NUM_LEAVES):
+        node = 0
+        for level in range(TREE_DEPTH):
+            feature = int(node_feature[node])
+            threshold = int(node_threshold[node])
+            go_right = (leaf >> (TREE_DEPTH - 1 - level)) & 0x1
+            if go_right:
+                bounds[leaf, feature, 0] = max(bounds[leaf, feature, 0], threshold + 1)
+            else:
+                bounds[leaf, feature, 1] = min(bounds[leaf, feature, 1], threshold)
+            node = (node * 2) + 1 + go_right
+    return bounds
+
+
+def reachable_leaves(model: ModelLike) -> np.ndarray:
+    bounds = path_bounds(model)
+    return np.all(bounds[:, :, 0] <= bounds[:, :, 1], axis=1)
+
+
+def boundary_vectors(
+    model: ModelLike,
+    mode: str = "paths",
+    max_vectors: int = DEFAULT_MAX_VECTORS,
+) -> np.ndarray:
+    """Deduplicated `(rows, 8)` uint8 sweep vectors for `model` (see module docstring)."""
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"mode must be one of {SWEEP_MODES} (got {mode!r})")
+    features = used_features(model)
+    sweeps = {feature: boundary_values(model, feature) for feature in features}
+
+    if mode == "exhaustive":
+        total = int(np.prod([len(values) for values in sweeps.values()], dtype=np.int64))
+        if total > max_vectors:
+            raise ValueError(f"exhaustive sweep needs {total} vectors, more than max_vectors={max_vectors}")
+        vectors = np.zeros((total, FEATURE_VECTOR_BYTES), dtype=np.uint8)
+        grids = np.meshgrid(*sweeps.values(), indexing="ij")
+        for feature, grid in zip(features, grids):
+            vectors[:, feature] = grid.reshape(-1)
+        return vectors
+
+    bounds = path_bounds(model)
+    bases = bounds[reachable_leaves(model), :, 0].astype(np.uint8)
+    blocks = [bases]
+    for feature, values in sweeps.items():
+        block = np.repeat(bases, len(values), axis=0)
+        block[:, feature] = np.tile(values, len(bases))
+        blocks.append(block)
+    vectors = np.unique(np.concatenate(blocks), axis=0)
+    if vectors.shape[0] > max_vectors:
+        raise ValueError(f"path sweep needs {vectors.shape[0]} vectors, more than max_vectors={max_vectors}")
+    return vectors
+
+
+def iter_chunks(vectors: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[np.ndarray]:
+    if chunk_rows <= 0:
+        raise ValueError(f"chunk_rows must be positive (got {chunk_rows})")
+    for start in range(0, vectors.shape[0], chunk_rows):
+        yield vectors[start : start + chunk_rows]
+
+
+def path_coverage(model: ModelLike, features_u8: np.ndarray) -> dict[str, Any]:
+    """JSON-ready hit counts per leaf, plus which reachable leaves were never hit."""
+    hits = np.bincount(leaf_indices(model, features_u8), minlength=NUM_LEAVES)
+    reachable = reachable_leaves(model)
+    return {
+        "rows": int(features_u8.shape[0]),
+        "leaf_hits": hits.tolist(),
+        "reachable": np.flatnonzero(reachable).tolist(),
+        "covered": np.flatnonzero(hits > 0).tolist(),
+        "missing": np.flatnonzero(reachable & (hits == 0)).tolist(),
+        "paths": f"{int(np.count_nonzero(reachable & (hits > 0)))}/{int(np.count_nonzero(reachable))}",
+    }
+
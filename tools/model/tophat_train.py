@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: © 2026
+# SPDX-License-Identifier: Apache-2.0
+
+"""Train TOPHAT trees directly in uint8 feature space.
+
+`fit_native_tree` grows the full depth-3 tree the hardware evaluates, one
+level at a time. It builds 256-bin class histograms for every node at a level
+with one `np.bincount` per feature, turns them into left/right class
+counts with a cumulative sum, and picks the split with the lowest weighted Gini
+impurity. Every threshold is an integer byte compared exactly as
+`tophat_tree_core.v` does (`feature <= threshold` goes left), so the trained
+tree *is* the deployed 22-byte image; nothing is floored or re-encoded.
+
+Split choice follows sklearn's `DecisionTreeClassifier` with the Gini
+criterion: a node splits while it is impure and has at least
+`min_samples_split` rows. The threshold sits halfway between the two byte
+values either side of the cut, rounded down, which is where sklearn's midpoint
+lands after the usual flooring. A node that does not split gets feature 0 /
+threshold 255, so all of its rows take the left branch, and an empty leaf
+takes the majority class of its nearest non-empty ancestor.
+
+Ties between equally good splits are broken deterministically: lowest feature
+index, then lowest threshold. sklearn breaks them by its random feature order,
+so the two trees are byte-identical only when no node has a tie. Ties are rare
+on wide-range data but common on small-range uint8 columns. Every split is
+still a best split for its node, but the two greedy trees can then diverge
+below the tie, and either may end up with purer leaves.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from tools.model.tophat_image import (
+    FEATURE_VECTOR_BYTES,
+    NUM_INTERNAL,
+    NUM_LEAVES,
+    TREE_DEPTH,
+    ModelImage,
+)
+from tools.model.tophat_reference import _as_feature_matrix, leaf_indices
+
+PAD_FEATURE = 0
+PAD_THRESHOLD = 0xFF
+NUM_BINS = 256
+
+
+@dataclass(frozen=True)
+class NativeTree:
+    """A trained tree: its 22-byte image plus per-leaf training class counts."""
+
+    model_bytes: bytes
+    classes: np.ndarray
+    # (NUM_LEAVES, len(classes)); empty leaves carry their nearest non-empty ancestor's counts.
+    leaf_counts: np.ndarray
+
+    def predict(self, features_u8: np.ndarray) -> np.ndarray:
+        return ModelImage.from_bytes(self.model_bytes).predict(features_u8)
+
+    def predict_proba(self, features_u8: np.ndarray) -> np.ndarray:
+        """Per-class training fractions of each row's leaf, like sklearn's `predict_proba`."""
+        counts = self.leaf_counts.astype(np.float64)
+        proba = counts / counts.sum(axis=1, keepdims=True)
+        return proba[leaf_indices(self.model_bytes, features_u8)]
+
+
+def fit_native_tree(features_u8: np.ndarray, labels: np.ndarray, min_samples_split: int = 2) -> NativeTree:
+    """Fit a depth-3 Gini tree on a `(rows, 8)` uint8 matrix; labels must be ints in 0..255.
+
+    Equal-Gini splits resolve to the lowest feature index, then the lowest threshold.
+    """
+    features = _as_feature_matrix(features_u8)
+    classes, y = np.unique(np.asarray(labels), return_inverse=True)
+    if features.shape[0] == 0 or y.shape[0] != features.shape[0]:
+        raise ValueError(
+            f"need one label per row and at least one row (got {y.shape[0]} labels, {features.shape[0]} rows)"
+        )
+    if not np.issubdtype(classes.dtype, np.integer) or classes.min() < 0 or classes.max() > 0xFF:
+        raise ValueError("labels must be integers in 0..255 (they become leaf bytes)")
+    num_classes = len(classes)
+
+    node_feature = np.zeros(NUM_INTERNAL, dtype=np.uint8)
+    node_threshold = np.zeros(NUM_INTERNAL, dtype=np.uint8)
+    node_counts = np.zeros((NUM_INTERNAL + NUM_LEAVES, num_classes), dtype=np.int64)
+    node = np.zeros(features.shape[0], dtype=np.intp)
+
+    for depth in range(TREE_DEPTH):
+        first = (1 << depth) - 1
+        width = 1 << depth
+        hist = _level_histograms(features, y, node - first, width, num_classes)
+        left = hist.cumsum(axis=2)
+        totals = left[:, 0, -1, :]
+        node_counts[first : first + width] = totals
+        score = _split_scores(left, totals)
+
+        for local in range(width):
+            heap = first + local
+            count = int(totals[local].sum())
+            impure = count > 0 and int(totals[local].max()) < count
+            if not impure or count < min_samples_split or not np.isfinite(score[local]).any():
+                node_feature[heap] = PAD_FEATURE
+                node_threshold[heap] = PAD_THRESHOLD
+                continue
+            feature, low = np.unravel_index(int(np.argmax(score[local])), score[local].shape)
+            present = np.flatnonzero(hist[local, feature, low + 1 :].sum(axis=1)) + low + 1
+            node_feature[heap] = feature
+            node_threshold[heap] = (int(low) + int(present[0])) // 2
+
+        rows = np.arange(features.shape[0])
+        values = features[rows, node_feature[node]]
+        node = (node * 2) + 1 + (values > node_threshold[node])
+
+    leaf = node - NUM_INTERNAL
+    node_counts[NUM_INTERNAL:] = np.bincount(
+        (leaf * num_classes) + y, minlength=NUM_LEAVES * num_classes
+    ).reshape(NUM_LEAVES, num_classes)
+
+    leaf_counts = np.zeros((NUM_LEAVES, num_classes), dtype=np.int64)
+    leaf_values = np.zeros(NUM_LEAVES, dtype=np.uint8)
+    for idx in range(NUM_LEAVES):
+        heap = NUM_INTERNAL + idx
+        while heap > 0 and node_counts[heap].sum() == 0:
+            heap = (heap - 1) // 2
+        leaf_counts[idx] = node_counts[heap]
+        leaf_values[idx] = classes[int(np.argmax(node_counts[heap]))]
+
+    image = ModelImage.from_fields(node_feature, node_threshold, leaf_values)
+    return NativeTree(model_bytes=image.to_bytes(), classes=classes, leaf_counts=leaf_counts)
+
+
+def _level_histograms(
+    features: np.ndarray, y: np.ndarray, local: np.ndarray, width: int, num_classes: int
+) -> np.ndarray:
+    """Class counts per (node, feature, byte value): shape `(width, 8, 256, classes)`."""
+    hist = np.empty((width, FEATURE_VECTOR_BYTES, NUM_BINS, num_classes), dtype=np.int64)
+    base = (local * NUM_BINS * num_classes) + y
+    size = width * NUM_BINS * num_classes
+    for feature in range(FEATURE_VECTOR_BYTES):
+        index = base + (features[:, feature].astype(np.intp) * num_classes)
+        hist[:, feature] = np.bincount(index, minlength=size).reshape(width, NUM_BINS, num_classes)
+    return hist
+
+
+def _split_scores(left: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Gini proxy `sum(L^2)/nL + sum(R^2)/nR` per (node, feature, threshold); higher is purer.
+
+    Thresholds that leave one side empty score -inf.
+    """
+    right = totals[:, None, None, :] - left
+    n_left = left.sum(axis=-1)
+    n_right = right.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = ((left * left).sum(axis=-1) / n_left) + ((right * right).sum(axis=-1) / n_right)
+    score[(n_left == 0) | (n_right == 0)] = -np.inf
+    return score
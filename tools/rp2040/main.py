@@ -14,6 +14,11 @@ try:
 except ImportError:
     import json
 
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
 import sys
 import time
 import builtins
@@ -28,6 +33,10 @@ PROJECT_NAME = "tt_um_pgfarley_tophat_top"
 
 MODEL_IMAGE_BYTES = 22
 FEATURE_VECTOR_BYTES = 8
+# Bound per-request RAM; the host splits larger batches across requests.
+MAX_BATCH_ROWS = 128
+# Feature rows kept in RAM by `upload_rows` for `run_rows` (16 KiB).
+MAX_RESIDENT_ROWS = 2048
 
 CMD_MODEL = 0b00
 CMD_FEATURE = 0b01
@@ -36,9 +45,84 @@ CMD_CTRL = 0b10
 CTRL_RUN = 0x01
 CTRL_CLEAR = 0x02
 
+# uio_out status bits (see tophat_result_if.v).
+STATUS_READY = 0x08
+STATUS_BUSY = 0x10
+STATUS_PRED_VALID = 0x20
+STATUS_MODEL_LOADED = 0x40
+STATUS_ERROR_OR_MISSING_FEATURES = 0x80
+
+# Cycles after a command's two send cycles until the RTL shows its result:
+# io_intf registers `run`, tree_core takes one cycle to start and one per
+# level, and pred_valid is up after the third. model_loaded needs no extra
+# wait: it is set on the cycle that consumes the last model byte, so it is
+# already valid when that byte's two-cycle send returns.
+RUN_LATENCY_TICKS = 3
+
+DEFAULT_BENCH_BYTES = 256
+MAX_BENCH_BYTES = 4096
+BENCH_RUNS = 16
+
 PROTOCOL_VERSION = 1
 BOOT_LOG_PATH = "tophat_boot.log"
 
+# Binary framing; must match tools/host/tophat_host.py.
+FRAME_MAGIC = 0xA5
+FRAME_ESCAPE = 0x7D
+FRAME_ESCAPE_XOR = 0x20
+FRAME_STATUS_OK = 0x00
+FRAME_STATUS_ERROR = 0x01
+# upload_rows prefixes its rows with a u16 offset.
+FRAME_MAX_PAYLOAD = 2 + MAX_BATCH_ROWS * FEATURE_VECTOR_BYTES
+# run_rows count meaning "through the last resident row".
+FRAME_COUNT_ALL = 0xFFFF
+FRAME_COMMANDS = {
+    0x01: "ping",
+    0x02: "clear",
+    0x03: "load_model",
+    0x04: "load_features",
+    0x05: "run",
+    0x06: "predict",
+    0x07: "predict_batch",
+    0x08: "upload_rows",
+    0x09: "run_rows",
+    0x0A: "stats",
+}
+
+
+# Byte streaming loop for `TophatBridge._send_burst`, compiled with the native
+# emitter. Kept as source and compiled at import so firmware built without
+# native code support falls back to the interpreted loop instead of failing to
+# load main.py.
+_STREAM_ENGINE_SRC = """
+@micropython.native
+def stream_bytes(data, strobe, ui_in, uio_in, clock):
+    for byte in data:
+        ui_in.value = byte
+        uio_in.value = strobe
+        clock()
+        uio_in.value = 0
+        ui_in.value = 0
+        clock()
+"""
+
+
+def _compile_stream_engine():
+    try:
+        import micropython
+    except ImportError:
+        return None
+
+    scope = {}
+    try:
+        exec(_STREAM_ENGINE_SRC, {"micropython": micropython}, scope)
+    except Exception:
+        return None
+    return scope.get("stream_bytes")
+
+
+_STREAM_ENGINE = _compile_stream_engine()
+
 
 def _ticks_deadline(timeout_ms):
     return time.ticks_add(time.ticks_ms(), timeout_ms)
@@ -64,14 +148,198 @@ def _send_response(obj):
         return
 
 
+def _crc16_ccitt(data, crc=0xFFFF):
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+    return crc
+
+
+def _send_frame(status, body):
+    header = bytes((status, len(body) & 0xFF, len(body) >> 8))
+    crc = _crc16_ccitt(body, _crc16_ccitt(header))
+    try:
+        out = sys.stdout.buffer
+        out.write(bytes((FRAME_MAGIC,)) + header + body + bytes((crc & 0xFF, crc >> 8)))
+        if hasattr(out, "flush"):
+            out.flush()
+    except Exception:
+        # Serial may disappear during USB reconnect; keep main loop alive.
+        return
+
+
+def _read_unescaped(stream, size):
+    out = bytearray()
+    escaped = False
+    while len(out) < size:
+        # Escapes only ever add bytes, so this never reads past the frame.
+        chunk = stream.read(size - len(out))
+        if not chunk:
+            raise ValueError("Truncated frame")
+        for byte in chunk:
+            if escaped:
+                out.append(byte ^ FRAME_ESCAPE_XOR)
+                escaped = False
+            elif byte == FRAME_ESCAPE:
+                escaped = True
+            else:
+                out.append(byte)
+    return out
+
+
+def _read_frame_request(stream):
+    header = _read_unescaped(stream, 3)
+    length = header[1] | (header[2] << 8)
+    if length > FRAME_MAX_PAYLOAD:
+        raise ValueError("Frame payload too large (%d bytes)" % length)
+    body = _read_unescaped(stream, length)
+    crc_raw = _read_unescaped(stream, 2)
+    if (crc_raw[0] | (crc_raw[1] << 8)) != _crc16_ccitt(body, _crc16_ccitt(header)):
+        raise ValueError("Request frame CRC mismatch")
+    return _frame_to_request(header[0], bytes(body))
+
+
+def _frame_to_request(opcode, body):
+    cmd = FRAME_COMMANDS.get(opcode)
+    if cmd is None:
+        raise ValueError("Unsupported frame opcode: 0x%02x" % opcode)
+
+    req = {"cmd": cmd}
+    if cmd == "load_model":
+        # Optional trailing flags byte: bit0 = force.
+        req["model"] = list(body[:MODEL_IMAGE_BYTES])
+        req["force"] = len(body) > MODEL_IMAGE_BYTES and bool(body[MODEL_IMAGE_BYTES] & 0x1)
+    elif cmd in ("load_features", "predict"):
+        req["features"] = list(body)
+    elif cmd == "predict_batch":
+        req["rows"] = _frame_rows(cmd, body)
+    elif cmd == "upload_rows":
+        if len(body) < 2:
+            raise ValueError("upload_rows frame is missing its offset")
+        req["offset"] = body[0] | (body[1] << 8)
+        req["rows"] = _frame_rows(cmd, body[2:])
+    elif cmd == "stats":
+        # Optional flags byte: bit0 = reset.
+        req["reset"] = len(body) > 0 and bool(body[0] & 0x1)
+    elif cmd == "run_rows":
+        if len(body) != 4:
+            raise ValueError("run_rows frame must be 4 bytes (start, count)")
+        req["start"] = body[0] | (body[1] << 8)
+        count = body[2] | (body[3] << 8)
+        if count != FRAME_COUNT_ALL:
+            req["count"] = count
+    return req
+
+
+def _frame_rows(cmd, body):
+    if len(body) % FEATURE_VECTOR_BYTES:
+        raise ValueError("%s frame must be a multiple of %d bytes" % (cmd, FEATURE_VECTOR_BYTES))
+    return [
+        list(body[idx : idx + FEATURE_VECTOR_BYTES])
+        for idx in range(0, len(body), FEATURE_VECTOR_BYTES)
+    ]
+
+
+def _response_to_frame_body(cmd, resp):
+    if cmd in ("ping", "stats"):
+        return json.dumps(resp).encode()
+    if "prediction" in resp:
+        return bytes((resp["prediction"],))
+    if "predictions" in resp:
+        return bytes(resp["predictions"])
+    if "packed" in resp:
+        return binascii.unhexlify(resp["packed"])
+    if cmd == "upload_rows":
+        return bytes((resp["rows"] & 0xFF, resp["rows"] >> 8))
+    if "cached" in resp:
+        return bytes((1 if resp["cached"] else 0,))
+    return b""
+
+
+def _serve_frame(bridge, stream):
+    try:
+        req = _read_frame_request(stream)
+    except Exception:
+        bridge.stats.frame_errors += 1
+        raise
+    resp = _handle_request(bridge, req)
+    if not resp.get("ok"):
+        _send_frame(FRAME_STATUS_ERROR, str(resp.get("error", "unknown error")).encode())
+        return
+    _send_frame(FRAME_STATUS_OK, _response_to_frame_body(req["cmd"], resp))
+
+
+class BridgeStats:
+    """Cheap counters for the `stats` command; times come from `time.ticks_us`."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started_ms = time.ticks_ms()
+        self.requests = {}
+        self.request_us = {}
+        self.errors = 0
+        self.parse_failures = 0
+        self.frame_errors = 0
+        # Project clock cycles, by cause.
+        self.ticks = 0
+        self.wait_ticks = 0
+        self.exact_misses = 0
+        self.runs = 0
+        self.run_ticks = 0
+        self.run_ticks_max = 0
+        self.stage_us = {"send": 0, "wait": 0, "run": 0}
+
+    def count_request(self, cmd, elapsed_us):
+        self.requests[cmd] = self.requests.get(cmd, 0) + 1
+        self.request_us[cmd] = self.request_us.get(cmd, 0) + elapsed_us
+
+    def request_count(self):
+        total = 0
+        for count in self.requests.values():
+            total += count
+        return total
+
+    def count_run(self, ticks):
+        self.runs += 1
+        self.run_ticks += ticks
+        if ticks > self.run_ticks_max:
+            self.run_ticks_max = ticks
+
+    def snapshot(self):
+        return {
+            "window_ms": time.ticks_diff(time.ticks_ms(), self.started_ms),
+            "requests": dict(self.requests),
+            "request_us": dict(self.request_us),
+            "errors": self.errors,
+            "parse_failures": self.parse_failures,
+            "frame_errors": self.frame_errors,
+            "ticks": self.ticks,
+            "wait_ticks": self.wait_ticks,
+            "exact_misses": self.exact_misses,
+            "runs": self.runs,
+            "run_ticks": self.run_ticks,
+            "run_ticks_max": self.run_ticks_max,
+            "stage_us": dict(self.stage_us),
+        }
+
+
 def _ok(**fields):
     payload = {"ok": True}
     payload.update(fields)
     _send_response(payload)
 
 
-def _err(message):
-    _send_response({"ok": False, "error": str(message)})
+def _err(message, req_id=None):
+    payload = {"ok": False, "error": str(message)}
+    if req_id is not None:
+        payload["id"] = req_id
+    _send_response(payload)
 
 
 def _validate_u8_list(values, expected_len, label):
@@ -92,12 +360,40 @@ def _validate_u8_list(values, expected_len, label):
     return out
 
 
+def _validate_u8_rows(values, expected_len, max_rows, label):
+    if not isinstance(values, list):
+        raise ValueError("%s must be a list of %d-byte lists" % (label, expected_len))
+    if len(values) > max_rows:
+        raise ValueError("%s must contain at most %d rows (got %d)" % (label, max_rows, len(values)))
+
+    out = []
+    idx = 0
+    for row in values:
+        out.append(_validate_u8_list(row, expected_len, "%s[%d]" % (label, idx)))
+        idx += 1
+    return out
+
+
 class TophatBridge:
     def __init__(self):
         self.tt = None
         self._ready = False
         self._init_error = ""
         self._project_enabled = ""
+        # Last image known to be in the ASIC, or None after clear/reset/failure.
+        self._loaded_model = None
+        # Burst transfers check `ready` once per burst instead of once per byte.
+        self.fast_io = True
+        # Native streaming loop for bursts, or None to use the interpreted one.
+        self.stream_engine = _STREAM_ENGINE
+        # Clock the documented latency and check once; poll only on a miss.
+        self.exact_timing = True
+        self.last_run_timing = None
+        # Board-resident dataset for run_rows; allocated on first upload.
+        self._resident = None
+        self._resident_rows = 0
+        self.stats = BridgeStats()
+        self._clock = None
         try:
             DemoboardDetect.probe()
             self.tt = DemoBoard.get()
@@ -118,9 +414,11 @@ class TophatBridge:
 
         enabled = getattr(self.tt.shuttle, "enabled", None)
         self._project_enabled = str(enabled) if enabled is not None else ""
+        self._clock = self._resolve_clock()
         self._pulse_reset()
 
     def _pulse_reset(self):
+        self._loaded_model = None
         # Use the default TT firmware reset path.
         self.tt.reset_project(True)
         time.sleep_ms(1)
@@ -135,6 +433,14 @@ class TophatBridge:
     def project_enabled(self):
         return self._project_enabled
 
+    def resident_rows(self):
+        return self._resident_rows
+
+    def io_engine(self):
+        if not self.fast_io:
+            return "per_byte"
+        return "native" if self.stream_engine is not None else "burst"
+
     def mode(self):
         try:
             return self.tt.mode_str
@@ -145,21 +451,31 @@ class TophatBridge:
         if not self._ready:
             raise RuntimeError("Bridge not ready: %s" % self._init_error)
 
-    def _tick(self):
+    def _resolve_clock(self):
+        # Looked up once so the per-cycle cost is a single bound-method call.
         if hasattr(self.tt, "clock_project_once"):
-            self.tt.clock_project_once()
-            return
+            return self.tt.clock_project_once
 
         if hasattr(self.tt, "clk"):
-            self.tt.clk.value = 1
-            time.sleep_us(2)
-            self.tt.clk.value = 0
-            time.sleep_us(2)
-            return
+            clk = self.tt.clk
+            sleep_us = time.sleep_us
+
+            def _toggle_clk():
+                clk.value = 1
+                sleep_us(2)
+                clk.value = 0
+                sleep_us(2)
+
+            return _toggle_clk
 
         raise RuntimeError("No project clock method available (expected clock_project_once or clk pin)")
 
+    def _tick(self):
+        self.stats.ticks += 1
+        self._clock()
+
     def _reset(self):
+        self._loaded_model = None
         self.tt.rst_n.value = 0
         for _ in range(10):
             self._tick()
@@ -167,8 +483,11 @@ class TophatBridge:
         for _ in range(2):
             self._tick()
 
+    def _status_bits(self):
+        return int(self.tt.uio_out.value)
+
     def _status(self):
-        raw = int(self.tt.uio_out.value)
+        raw = self._status_bits()
         return {
             "ready": (raw >> 3) & 0x1,
             "busy": (raw >> 4) & 0x1,
@@ -178,12 +497,23 @@ class TophatBridge:
         }
 
     def _wait_until(self, predicate, timeout_ms, label):
+        stats = self.stats
+        start = time.ticks_us()
         deadline = _ticks_deadline(timeout_ms)
-        while _before_deadline(deadline):
-            if predicate():
-                return
-            self._tick()
-        raise RuntimeError("Timeout waiting for %s" % label)
+        try:
+            while _before_deadline(deadline):
+                if predicate():
+                    return
+                stats.wait_ticks += 1
+                self._tick()
+            raise RuntimeError("Timeout waiting for %s" % label)
+        finally:
+            stats.stage_us["wait"] += time.ticks_diff(time.ticks_us(), start)
+
+    def _wait_status(self, mask, timeout_ms, label):
+        if self._status_bits() & mask:
+            return
+        self._wait_until(lambda: self._status_bits() & mask, timeout_ms, label)
 
     def _send_cmd_byte(self, cmd, payload):
         self._wait_until(lambda: self._status()["ready"] == 1, 150, "ready")
@@ -196,41 +526,205 @@ class TophatBridge:
         self.tt.ui_in.value = 0
         self._tick()
 
+    def _send_burst(self, cmd, data):
+        """Same pin sequence as `_send_cmd_byte` per byte, without per-byte status polling.
+
+        `busy` is only ever raised by a run, and `run()` returns after
+        `pred_valid`, when `busy` has already dropped. Model and feature
+        bytes therefore cannot make the core busy mid-burst, so one `ready`
+        check up front covers the whole burst.
+        """
+        self._wait_status(STATUS_READY, 150, "ready")
+
+        ui_in = self.tt.ui_in
+        uio_in = self.tt.uio_in
+        clock = self._clock
+        strobe = ((cmd & 0x3) << 1) | 0x1
+        self.stats.ticks += 2 * len(data)
+        if self.stream_engine is not None:
+            self.stream_engine(bytes(data), strobe, ui_in, uio_in, clock)
+            return
+
+        for byte in data:
+            ui_in.value = byte & 0xFF
+            uio_in.value = strobe
+            clock()
+            uio_in.value = 0
+            ui_in.value = 0
+            clock()
+
+    def _send_bytes(self, cmd, data):
+        start = time.ticks_us()
+        if self.fast_io:
+            self._send_burst(cmd, data)
+        else:
+            for byte in data:
+                self._send_cmd_byte(cmd, byte)
+        self.stats.stage_us["send"] += time.ticks_diff(time.ticks_us(), start)
+
     def clear(self):
         self._require_ready()
+        self._loaded_model = None
         self._send_cmd_byte(CMD_CTRL, CTRL_CLEAR)
 
-    def load_model(self, model):
+    def load_model(self, model, force=False):
+        """Load a model image; return True if the ASIC already held it and the transfer was skipped."""
         self._require_ready()
-        for byte in model:
-            self._send_cmd_byte(CMD_MODEL, byte)
-
-        self._wait_until(lambda: self._status()["model_loaded"] == 1, 250, "model_loaded")
+        image = bytes(model)
+        # A 22-byte compare is cheaper than hashing on the RP2040. model_loaded
+        # guards against the ASIC having been reset behind our back.
+        if not force and image == self._loaded_model and self._status_bits() & STATUS_MODEL_LOADED:
+            return True
+
+        self._loaded_model = None
+        self._send_bytes(CMD_MODEL, image)
+        # model_loaded is valid as soon as the last byte's send returns, so the
+        # first status check passes; the timeout only covers a missing ASIC.
+        self._wait_status(STATUS_MODEL_LOADED, 250, "model_loaded")
+        self._loaded_model = image
+        return False
 
     def load_features(self, features):
         self._require_ready()
-        for byte in features:
-            self._send_cmd_byte(CMD_FEATURE, byte)
+        self._send_bytes(CMD_FEATURE, features)
 
     def run(self):
         self._require_ready()
-        self._send_cmd_byte(CMD_CTRL, CTRL_RUN)
-
-        deadline = _ticks_deadline(300)
-        while _before_deadline(deadline):
-            status = self._status()
-            if status["pred_valid"] == 1:
-                return int(self.tt.uo_out.value) & 0xFF
-            if status["busy"] == 0 and status["error_or_missing_features"] == 1:
-                raise RuntimeError("Run rejected (missing model/features or core error)")
-            self._tick()
-
-        raise RuntimeError("Timeout waiting for prediction")
+        stats = self.stats
+        start = time.ticks_us()
+        if self.fast_io:
+            self._send_burst(CMD_CTRL, (CTRL_RUN,))
+        else:
+            self._send_cmd_byte(CMD_CTRL, CTRL_RUN)
+
+        uio_out = self.tt.uio_out
+        waited = 0
+        try:
+            if self.exact_timing:
+                clock = self._clock
+                for _ in range(RUN_LATENCY_TICKS):
+                    clock()
+                waited = RUN_LATENCY_TICKS
+                if int(uio_out.value) & STATUS_PRED_VALID:
+                    self.last_run_timing = "exact"
+                    return int(self.tt.uo_out.value) & 0xFF
+                # Slower than the RTL promises (or a rejected run): poll instead.
+                stats.exact_misses += 1
+
+            self.last_run_timing = "poll"
+            deadline = _ticks_deadline(300)
+            while _before_deadline(deadline):
+                raw = int(uio_out.value)
+                if raw & STATUS_PRED_VALID:
+                    return int(self.tt.uo_out.value) & 0xFF
+                if not raw & STATUS_BUSY and raw & STATUS_ERROR_OR_MISSING_FEATURES:
+                    raise RuntimeError("Run rejected (missing model/features or core error)")
+                waited += 1
+                self._clock()
+
+            raise RuntimeError("Timeout waiting for prediction")
+        finally:
+            # Two cycles clock the run command in, the rest wait for pred_valid.
+            stats.ticks += waited
+            stats.count_run(2 + waited)
+            stats.stage_us["run"] += time.ticks_diff(time.ticks_us(), start)
 
     def predict(self, features):
         self.load_features(features)
         return self.run()
 
+    def predict_batch(self, rows):
+        predictions = []
+        for features in rows:
+            predictions.append(self.predict(features))
+        return predictions
+
+    def upload_rows(self, offset, data):
+        """Store feature rows at row `offset`; rows past the upload are dropped.
+
+        Returns the resident row count. Does not touch the ASIC, so the data
+        survives `clear` and reset.
+        """
+        if offset < 0 or offset > self._resident_rows:
+            raise ValueError("offset %d must be in 0..%d (resident rows)" % (offset, self._resident_rows))
+        end = offset + len(data) // FEATURE_VECTOR_BYTES
+        if end > MAX_RESIDENT_ROWS:
+            raise ValueError("upload ends at row %d, past MAX_RESIDENT_ROWS=%d" % (end, MAX_RESIDENT_ROWS))
+
+        if self._resident is None:
+            self._resident = bytearray(MAX_RESIDENT_ROWS * FEATURE_VECTOR_BYTES)
+        self._resident[offset * FEATURE_VECTOR_BYTES : end * FEATURE_VECTOR_BYTES] = data
+        self._resident_rows = end
+        return end
+
+    def run_rows(self, start, count=None):
+        """Predict resident rows `start..start+count`; return one packed byte per row."""
+        self._require_ready()
+        if count is None:
+            count = self._resident_rows - start
+        if start < 0 or count < 0 or start + count > self._resident_rows:
+            raise ValueError(
+                "rows %d..%d out of range (resident rows: %d)" % (start, start + count, self._resident_rows)
+            )
+
+        out = bytearray(count)
+        if not count:
+            return out
+        view = memoryview(self._resident)
+        row = start * FEATURE_VECTOR_BYTES
+        for idx in range(count):
+            out[idx] = self.predict(view[row : row + FEATURE_VECTOR_BYTES])
+            row += FEATURE_VECTOR_BYTES
+        return out
+
+    def bench(self, count):
+        """Time `count` feature bytes through the per-byte and burst paths.
+
+        Overwrites any loaded feature vector; `count` is rounded up to whole
+        vectors so the feature loader ends aligned.
+        """
+        self._require_ready()
+        count = ((count + FEATURE_VECTOR_BYTES - 1) // FEATURE_VECTOR_BYTES) * FEATURE_VECTOR_BYTES
+        data = bytes(count)
+
+        start = time.ticks_us()
+        for byte in data:
+            self._send_cmd_byte(CMD_FEATURE, byte)
+        legacy_us = time.ticks_diff(time.ticks_us(), start)
+
+        start = time.ticks_us()
+        self._send_burst(CMD_FEATURE, data)
+        fast_us = time.ticks_diff(time.ticks_us(), start)
+
+        result = {
+            "bytes": count,
+            "engine": "native" if self.stream_engine is not None else "burst",
+            "legacy_us_per_byte": legacy_us / count,
+            "fast_us_per_byte": fast_us / count,
+        }
+        if self._status_bits() & STATUS_MODEL_LOADED:
+            poll_us = self._bench_runs(False)
+            exact_us = self._bench_runs(True)
+            result["run_poll_us"] = poll_us
+            result["run_exact_us"] = exact_us
+            result["run_saved_us"] = poll_us - exact_us
+        return result
+
+    def _bench_runs(self, exact):
+        """Average `run` time over BENCH_RUNS predictions with the given timing mode."""
+        saved = self.exact_timing
+        self.exact_timing = exact
+        total_us = 0
+        try:
+            for _ in range(BENCH_RUNS):
+                self._send_burst(CMD_FEATURE, bytes(FEATURE_VECTOR_BYTES))
+                start = time.ticks_us()
+                self.run()
+                total_us += time.ticks_diff(time.ticks_us(), start)
+        finally:
+            self.exact_timing = saved
+        return total_us / BENCH_RUNS
+
 
 def _handle_request(bridge, req):
     if not isinstance(req, dict):
@@ -240,12 +734,36 @@ def _handle_request(bridge, req):
     if not isinstance(cmd, str):
         raise ValueError("Missing string `cmd`")
 
+    start = time.ticks_us()
+    try:
+        resp = _dispatch_request(bridge, cmd, req)
+    except Exception:
+        bridge.stats.errors += 1
+        raise
+    finally:
+        bridge.stats.count_request(cmd, time.ticks_diff(time.ticks_us(), start))
+    # Echo the host's tag so pipelined requests can be matched to responses.
+    if "id" in req:
+        resp["id"] = req["id"]
+    return resp
+
+
+def _request_id(req):
+    if isinstance(req, dict):
+        return req.get("id")
+    return None
+
+
+def _dispatch_request(bridge, cmd, req):
     if cmd == "ping":
         payload = {
             "ok": True,
             "protocol_version": PROTOCOL_VERSION,
             "project_enabled": bridge.project_enabled(),
             "mode": bridge.mode(),
+            "io_engine": bridge.io_engine(),
+            "resident_rows": bridge.resident_rows(),
+            "request_count": bridge.stats.request_count(),
         }
         if not bridge.ready():
             payload["init_error"] = bridge.init_error()
@@ -257,8 +775,11 @@ def _handle_request(bridge, req):
 
     if cmd == "load_model":
         model = _validate_u8_list(req.get("model"), MODEL_IMAGE_BYTES, "model")
-        bridge.load_model(model)
-        return {"ok": True}
+        force = req.get("force", False)
+        if not isinstance(force, bool):
+            raise ValueError("force must be a boolean")
+        cached = bridge.load_model(model, force)
+        return {"ok": True, "cached": cached}
 
     if cmd == "load_features":
         features = _validate_u8_list(req.get("features"), FEATURE_VECTOR_BYTES, "features")
@@ -266,14 +787,57 @@ def _handle_request(bridge, req):
         return {"ok": True}
 
     if cmd == "run":
+        start = time.ticks_us()
         prediction = bridge.run()
-        return {"ok": True, "prediction": prediction}
+        run_us = time.ticks_diff(time.ticks_us(), start)
+        return {"ok": True, "prediction": prediction, "run_us": run_us, "timing": bridge.last_run_timing}
 
     if cmd == "predict":
         features = _validate_u8_list(req.get("features"), FEATURE_VECTOR_BYTES, "features")
         prediction = bridge.predict(features)
         return {"ok": True, "prediction": prediction}
 
+    if cmd == "predict_batch":
+        rows = _validate_u8_rows(req.get("rows"), FEATURE_VECTOR_BYTES, MAX_BATCH_ROWS, "rows")
+        predictions = bridge.predict_batch(rows)
+        return {"ok": True, "predictions": predictions}
+
+    if cmd == "upload_rows":
+        offset = req.get("offset", 0)
+        if not isinstance(offset, int):
+            raise ValueError("offset must be an int")
+        rows = _validate_u8_rows(req.get("rows"), FEATURE_VECTOR_BYTES, MAX_BATCH_ROWS, "rows")
+        data = bytearray()
+        for row in rows:
+            data.extend(bytes(row))
+        return {"ok": True, "rows": bridge.upload_rows(offset, data)}
+
+    if cmd == "run_rows":
+        start = req.get("start", 0)
+        count = req.get("count")
+        if not isinstance(start, int) or (count is not None and not isinstance(count, int)):
+            raise ValueError("start and count must be ints")
+        packed = bridge.run_rows(start, count)
+        return {"ok": True, "packed": binascii.hexlify(packed).decode()}
+
+    if cmd == "stats":
+        reset = req.get("reset", False)
+        if not isinstance(reset, bool):
+            raise ValueError("reset must be a boolean")
+        payload = {"ok": True}
+        payload.update(bridge.stats.snapshot())
+        if reset:
+            bridge.stats.reset()
+        return payload
+
+    if cmd == "bench":
+        count = req.get("bytes", DEFAULT_BENCH_BYTES)
+        if not isinstance(count, int) or count <= 0 or count > MAX_BENCH_BYTES:
+            raise ValueError("bytes must be an int in 1..%d" % MAX_BENCH_BYTES)
+        payload = {"ok": True}
+        payload.update(bridge.bench(count))
+        return payload
+
     return {"ok": False, "error": "Unsupported command: %s" % cmd}
 
 
@@ -323,15 +887,23 @@ def _boot_bridge_with_log():
 
 def main():
     bridge = _boot_bridge_with_log()
+    stream = sys.stdin.buffer
 
     while True:
         try:
-            line = sys.stdin.readline()
-            if not line:
+            first = stream.read(1)
+            if not first:
                 time.sleep_ms(10)
                 continue
 
-            line = line.strip()
+            if first[0] == FRAME_MAGIC:
+                try:
+                    _serve_frame(bridge, stream)
+                except Exception as exc:
+                    _send_frame(FRAME_STATUS_ERROR, str(exc).encode())
+                continue
+
+            line = (first + stream.readline()).strip()
             if not line:
                 continue
 
@@ -339,12 +911,13 @@ def main():
                 req = json.loads(line)
             except Exception:
                 # Ignore serial noise so host RPC stays request/response aligned.
+                bridge.stats.parse_failures += 1
                 continue
 
             try:
                 resp = _handle_request(bridge, req)
             except Exception as exc:
-                _err(exc)
+                _err(exc, _request_id(req))
                 continue
 
             _send_response(resp)